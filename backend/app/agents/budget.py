@@ -0,0 +1,77 @@
+"""
+Latency budgets for swarm runs.
+
+A request starts with a deadline (`begin_request`). Each predictive node may
+run until NODE_DEADLINE_SECONDS, or until only BLUEPRINT_RESERVE_SECONDS of
+the request budget is left, whichever comes first. An agent that misses it is
+recorded as `{"status": "missing"}`; it is not given a made-up score. The
+blueprint then runs on whatever arrived, and gets the rest of the budget. If
+it cannot finish either, the fail-safe blueprint is returned. Slow fan-out
+edges therefore cap the blueprint's latency instead of stalling it.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from app.agents.predictive.blueprint import fallback_blueprint, finalize_blueprint
+from app.core.config import settings
+from app.core.context import remaining_budget
+
+logger = logging.getLogger(__name__)
+
+MISSING = "missing"
+
+
+def missing_entry(reason: str = "deadline") -> Dict[str, Any]:
+    return {"status": MISSING, "reason": reason}
+
+
+def _timeout(node_limit: float, reserve: float = 0.0) -> Optional[float]:
+    """Seconds this node may run, or None if neither limit applies."""
+    limits = []
+    if node_limit:
+        limits.append(node_limit)
+    remaining = remaining_budget()
+    if remaining is not None:
+        limits.append(remaining - reserve)
+    return max(0.0, min(limits)) if limits else None
+
+
+def budgeted_node(name: str, node, agents: Optional[Iterable[str]] = None):
+    """
+    Wrap a predictive node so it is cut off at its budget. `agents` are the
+    analysis keys the node produces (the batched node produces every selected agent's).
+    """
+    agents = tuple(agents or (name,))
+
+    async def run(state):
+        timeout = _timeout(settings.NODE_DEADLINE_SECONDS, settings.BLUEPRINT_RESERVE_SECONDS)
+        if timeout is None:
+            return await node(state)
+        try:
+            return await asyncio.wait_for(node(state), timeout)
+        except asyncio.TimeoutError:
+            late = [agent for agent in agents if agent in (state.get("agents") or agents)]
+            logger.warning("%s missed its %.1fs budget; reporting %s as missing", name, timeout, ", ".join(late))
+            reuse = state.get("reuse") or {}
+            return {"analysis": {agent: reuse.get(agent) or missing_entry() for agent in late}}
+
+    run.__name__ = getattr(node, "__name__", name)
+    return run
+
+
+def budgeted_blueprint(node):
+    """Give the blueprint whatever is left of the request budget, then fall back."""
+    async def run(state):
+        timeout = _timeout(0.0)
+        if timeout is None:
+            return await node(state)
+        analysis = state.get("analysis", {})
+        try:
+            return await asyncio.wait_for(node(state), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Blueprint missed the request budget after %.1fs; returning the fail-safe blueprint", timeout)
+            return {"blueprint": finalize_blueprint(fallback_blueprint(analysis), analysis)}
+
+    run.__name__ = getattr(node, "__name__", "blueprint")
+    return run
@@ -0,0 +1,200 @@
+import copy
+import datetime
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.agents.routing import model_for
+from app.core import db as db_module
+from app.core.config import settings
+from app.core.shared import shared_state
+
+logger = logging.getLogger(__name__)
+
+NOT_APPLICABLE = "not_applicable"
+
+
+def normalize_idea(text: str) -> str:
+    """Case/whitespace-insensitive form of an idea so retries hash identically."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for agent outputs.
+
+    Keys hash the normalized idea, the node name, the prompt version and the
+    model, so editing a prompt or switching models never serves stale answers.
+    Tier 1 is an in-process LRU with TTL. With a shared SHARED_STATE_URL
+    backend (``app.core.shared``), its entries are shared by all workers.
+    The last tier is an optional Mongo collection (``llm_cache``) with a TTL
+    index.
+    """
+
+    COLLECTION = "llm_cache"
+
+    def __init__(self, max_entries: int, ttl_seconds: float, mongo_enabled: bool = False):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.mongo_enabled = mongo_enabled
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"memory_hits": 0, "shared_hits": 0, "mongo_hits": 0, "misses": 0})
+        self._indexes_ready = False
+
+    def make_key(self, idea: str, node: str, extra: str = "") -> str:
+        raw = "\x1f".join([normalize_idea(idea), node, settings.PROMPT_VERSION, model_for(node), extra])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _collection(self):
+        if not self.mongo_enabled or db_module.db is None:
+            return None
+        return db_module.db[self.COLLECTION]
+
+    async def _ensure_indexes(self, collection):
+        if not self._indexes_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexes_ready = True
+
+    def _remember(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str, node: str) -> Optional[Any]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats[node]["memory_hits"] += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+
+        if shared_state.shared:
+            try:
+                entry = await shared_state.get(f"cache:{key}")
+            except Exception as e:
+                logger.warning("Shared cache lookup failed for %s: %s", node, e)
+                entry = None
+            if entry is not None and entry["expires_at"] > now:
+                self._remember(key, entry["value"], entry["expires_at"])
+                self._stats[node]["shared_hits"] += 1
+                return copy.deepcopy(entry["value"])
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = await collection.find_one({"_id": key})
+            except Exception as e:
+                logger.warning("Cache lookup failed for %s: %s", node, e)
+                doc = None
+            remaining = (doc["expires_at"] - datetime.datetime.utcnow()).total_seconds() if doc else 0
+            if remaining > 0:
+                self._remember(key, doc["value"], now + remaining)
+                self._stats[node]["mongo_hits"] += 1
+                return copy.deepcopy(doc["value"])
+
+        self._stats[node]["misses"] += 1
+        return None
+
+    async def set(self, key: str, node: str, value: Any):
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, copy.deepcopy(value), expires_at)
+
+        if shared_state.shared:
+            try:
+                await shared_state.set(f"cache:{key}", {"value": value, "expires_at": expires_at}, self.ttl_seconds)
+            except Exception as e:
+                logger.warning("Shared cache write failed for %s: %s", node, e)
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                await self._ensure_indexes(collection)
+                await collection.replace_one(
+                    {"_id": key},
+                    {"node": node, "value": value, "expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=self.ttl_seconds)},
+                    upsert=True,
+                )
+            except Exception as e:
+                logger.warning("Cache write failed for %s: %s", node, e)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        nodes = {node: dict(counts) for node, counts in self._stats.items()}
+        hits = sum(c["memory_hits"] + c["shared_hits"] + c["mongo_hits"] for c in nodes.values())
+        misses = sum(c["misses"] for c in nodes.values())
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "nodes": nodes,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+    mongo_enabled=settings.CACHE_MONGO_ENABLED,
+)
+
+
+def is_not_applicable(entry: Any) -> bool:
+    """An agent the relevance gate skipped for this idea; it has no score and is not reused."""
+    return isinstance(entry, dict) and entry.get("status") == NOT_APPLICABLE
+
+
+def is_degraded_entry(entry: Any) -> bool:
+    """A canned fallback score, an agent that missed its deadline, or a blueprint built without some agents."""
+    return isinstance(entry, dict) and bool(
+        entry.get("fallback") or entry.get("status") == "missing" or entry.get("degradedAgents")
+    )
+
+
+def is_degraded(update: Dict[str, Any]) -> bool:
+    """True if a node update carries a degraded entry; those are never cached."""
+    entries = list((update.get("analysis") or {}).values()) + [update.get("blueprint") or {}]
+    return any(is_degraded_entry(entry) for entry in entries)
+
+
+def cached_node(name: str, node: Callable[[Any], Awaitable[Dict[str, Any]]], depends_on_analysis: bool = False,
+                depends_on_agents: bool = False):
+    """
+    Wrap a graph node so its state update is served from ``response_cache``.
+
+    Each node is cached on its own, so a partially warm idea only pays for the
+    nodes that miss. The blueprint also depends on the predictive scores, so
+    ``depends_on_analysis`` folds them into its key; the batched node depends
+    on which agents the relevance gate selected (``depends_on_agents``).
+    """
+    if not settings.CACHE_ENABLED:
+        return node
+
+    async def run(state):
+        extra = ""
+        if depends_on_analysis:
+            analysis = json.dumps(state.get("analysis", {}), sort_keys=True, default=str)
+            extra = hashlib.sha256(analysis.encode("utf-8")).hexdigest()
+        elif depends_on_agents:
+            extra = ",".join(state.get("agents") or [])
+        key = response_cache.make_key(state["business_idea"], name, extra)
+        update = await response_cache.get(key, name)
+        if update is not None:
+            return update
+        update = await node(state)
+        if not is_degraded(update):
+            await response_cache.set(key, name, update)
+        return update
+
+    run.__name__ = getattr(node, "__name__", name)
+    return run
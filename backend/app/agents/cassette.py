@@ -0,0 +1,237 @@
+"""
+Record/replay of LLM calls ("cassettes") for offline regression and latency runs.
+
+With LLM_CASSETTE_MODE set, `llm.get_structural_llm`/`get_discovery_llm`
+hand out a `CassetteChatModel` in place of the bare ChatGroq client. It is a
+LangChain chat model itself, so `.bind()` (JSON mode), token streaming,
+usage metadata and the scheduler behave as with the real client:
+
+  record   every call goes to Groq; the response and its timing are appended
+           to the cassette
+  replay   calls are answered from the cassette only; a prompt that was never
+           recorded raises CassetteMiss. No network, no API key needed
+  auto     replay what is recorded, record the rest (after a prompt change
+           only the changed prompts cost a Groq call)
+
+Entries are keyed by a hash of model, temperature, call options and the
+messages. A prompt recorded more than once (temperature 0.7 discovery) is
+replayed in recorded order per process. Replays wait the recorded time to
+first token and total latency times LLM_CASSETTE_LATENCY_SCALE (1 =
+recorded speed, 0 = as fast as possible), so `startup_agent` and the API
+layer can be profiled without the provider's latency or variance. Sync
+`invoke` is supported too and replays without waiting.
+
+A cassette is a JSON-lines file (LLM_CASSETTE_PATH): one line per response
+with its content, token usage and timings. Prompts are not stored.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.core.config import settings
+from app.core.context import current_node_run
+from app.core.metrics import registry
+
+RECORD, REPLAY, AUTO = "record", "replay", "auto"
+
+calls = registry.counter("llm_cassette_calls_total", "Cassette lookups by result (hit, miss, recorded)", ("result",))
+
+
+class CassetteMiss(LookupError):
+    """Replay asked for a prompt the cassette has no recording of."""
+
+
+def prompt_key(model: str, temperature: float, messages: List[BaseMessage], stop: Optional[List[str]],
+               options: Dict[str, Any]) -> str:
+    canonical = json.dumps({
+        "model": model,
+        "temperature": temperature,
+        "stop": stop,
+        "options": options,
+        "messages": [[message.type, message.content] for message in messages],
+    }, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._played: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._load().values())
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._entries is None:
+            entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            entries[entry["key"]].append(entry)
+            self._entries = entries
+        return self._entries
+
+    def take(self, key: str) -> Optional[Dict[str, Any]]:
+        """Next recording of `key`, cycling when it is asked for more often than recorded."""
+        recordings = self._load().get(key)
+        if not recordings:
+            return None
+        played = self._played[key]
+        self._played[key] += 1
+        return recordings[played % len(recordings)]
+
+    def give_back(self, key: str):
+        """Undo a `take` whose call was cancelled (a hedge that lost), so replay order stays stable."""
+        if self._played.get(key):
+            self._played[key] -= 1
+
+    def record(self, key: str, entry: Dict[str, Any]):
+        entry = {"key": key, **entry}
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._load()[key].append(entry)
+            self._played[key] += 1  # a later identical call in this process replays the next recording
+
+
+_cassettes: Dict[str, Cassette] = {}
+
+
+def get_cassette(path: Optional[str] = None) -> Cassette:
+    path = path or settings.LLM_CASSETTE_PATH
+    if path not in _cassettes:
+        _cassettes[path] = Cassette(path)
+    return _cassettes[path]
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that answers from a cassette and/or records `inner` (the real client) into it."""
+
+    model_name: str
+    temperature: float
+    mode: str
+    cassette_path: str
+    inner: Optional[BaseChatModel] = None  # None when replaying only
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+        return prompt_key(self.model_name, self.temperature, messages, stop, kwargs)
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.mode == RECORD:
+            return None
+        entry = get_cassette(self.cassette_path).take(key)
+        if entry is None and (self.mode == REPLAY or self.inner is None):
+            calls.inc("miss")
+            raise CassetteMiss(f"no recording for {self.model_name} prompt {key} in {self.cassette_path}")
+        if entry is not None:
+            calls.inc("hit")
+        return entry
+
+    def _record(self, key: str, message: BaseMessage, started: float, first_token: Optional[float], chunks: int):
+        run = current_node_run()
+        latency = time.perf_counter() - started
+        get_cassette(self.cassette_path).record(key, {
+            "model": self.model_name,
+            "node": run.node if run is not None else None,
+            "content": message.content,
+            "usage": getattr(message, "usage_metadata", None),
+            "ttft": round((first_token if first_token is not None else latency), 4),
+            "latency": round(latency, 4),
+            "chunks": chunks,
+        })
+        calls.inc("recorded")
+
+    @staticmethod
+    def _message(entry: Dict[str, Any], chunk: bool = False):
+        cls = AIMessageChunk if chunk else AIMessage
+        fields: Dict[str, Any] = {"content": entry["content"], "response_metadata": {"model_name": entry["model"]}}
+        if entry.get("usage"):
+            fields["usage_metadata"] = entry["usage"]
+        return cls(**fields)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        """Sync `invoke`: the same lookup as `_agenerate`, replayed without the recorded latency."""
+        key = self._key(messages, stop, kwargs)
+        entry = self._lookup(key)
+        if entry is not None:
+            return ChatResult(generations=[ChatGeneration(message=self._message(entry))])
+        started = time.perf_counter()
+        message = self.inner.invoke(messages, stop=stop, config={"callbacks": []}, **kwargs)
+        self._record(key, message, started, None, 1)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        entry = self._lookup(key)
+        if entry is not None:
+            try:
+                await asyncio.sleep(entry["latency"] * settings.LLM_CASSETTE_LATENCY_SCALE)
+            except asyncio.CancelledError:
+                get_cassette(self.cassette_path).give_back(key)
+                raise
+            return ChatResult(generations=[ChatGeneration(message=self._message(entry))])
+        started = time.perf_counter()
+        message = await self.inner.ainvoke(messages, stop=stop, config={"callbacks": []}, **kwargs)
+        self._record(key, message, started, None, 1)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        key = self._key(messages, stop, kwargs)
+        entry = self._lookup(key)
+        if entry is not None:
+            async for chunk in self._replay_stream(key, entry):
+                yield chunk
+            return
+        started, first_token, received = time.perf_counter(), None, []
+        # No callbacks on the inner call: token events come from this model's own chunks
+        async for chunk in self.inner.astream(messages, stop=stop, config={"callbacks": []}, **kwargs):
+            if first_token is None and chunk.content:
+                first_token = time.perf_counter() - started
+            received.append(chunk)
+            yield ChatGenerationChunk(message=chunk)
+        if received:
+            message = received[0]
+            for chunk in received[1:]:
+                message = message + chunk
+            self._record(key, message, started, first_token, len(received))
+
+    async def _replay_stream(self, key: str, entry: Dict[str, Any]) -> AsyncIterator[ChatGenerationChunk]:
+        """The recorded content in the recorded number of chunks, spread from first token to the end."""
+        scale = settings.LLM_CASSETTE_LATENCY_SCALE
+        content = entry["content"]
+        count = max(1, min(entry.get("chunks") or 1, len(content) or 1))
+        size = -(-len(content) // count) or 1
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        gap = (entry["latency"] - entry["ttft"]) / max(1, len(pieces) - 1)
+        try:
+            await asyncio.sleep(entry["ttft"] * scale)
+            for i, piece in enumerate(pieces):
+                if i:
+                    await asyncio.sleep(gap * scale)
+                last = i == len(pieces) - 1
+                message = self._message({**entry, "content": piece, "usage": entry.get("usage") if last else None},
+                                        chunk=True)
+                yield ChatGenerationChunk(message=message)
+        except asyncio.CancelledError:
+            get_cassette(self.cassette_path).give_back(key)
+            raise
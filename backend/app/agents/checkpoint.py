@@ -0,0 +1,202 @@
+"""
+Durable LangGraph checkpoints in MongoDB, so an interrupted swarm resumes.
+
+The swarm is compiled with `MongoCheckpointSaver`. Every super-step writes a
+checkpoint, and every finished node writes its output as a pending write. If
+one agent raises (e.g. the provider is still down after the scheduler's
+retries) or the process dies mid-run, the next attempt on the same thread
+and idea resumes from the last checkpoint. Only the nodes without a saved
+write execute again.
+
+Checkpoints are scratch state. A successful run deletes its own, and a TTL
+index removes abandoned ones after CHECKPOINT_TTL_SECONDS.
+"""
+import datetime
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from pymongo import UpdateOne
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from app.agents.cache import normalize_idea
+from app.core import db as db_module
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS = "checkpoints"
+WRITES = "checkpoint_writes"
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver):
+    """
+    Async-only checkpointer on the app's Motor database.
+
+    A checkpoint document holds the whole serialized checkpoint (the swarm's
+    state is a few KB), and each pending write is one document keyed by
+    (checkpoint, task, index). With no database connected, it stores
+    nothing and every run starts fresh.
+    """
+
+    @property
+    def db(self):
+        return db_module.db
+
+    def _load(self, doc: Dict[str, Any]) -> Any:
+        return self.serde.loads_typed((doc["type"], doc["value"]))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        if self.db is None:
+            return None
+        configurable = config["configurable"]
+        query = {"thread_id": configurable["thread_id"], "checkpoint_ns": configurable.get("checkpoint_ns", "")}
+        if checkpoint_id := get_checkpoint_id(config):
+            query["checkpoint_id"] = checkpoint_id
+        doc = await self.db[CHECKPOINTS].find_one(query, sort=[("checkpoint_id", -1)])
+        return await self._to_tuple(doc) if doc else None
+
+    async def _to_tuple(self, doc: Dict[str, Any]) -> CheckpointTuple:
+        key = {"thread_id": doc["thread_id"], "checkpoint_ns": doc["checkpoint_ns"]}
+        writes = await self.db[WRITES].find({**key, "checkpoint_id": doc["checkpoint_id"]}) \
+            .sort([("task_id", 1), ("idx", 1)]).to_list(None)
+        return CheckpointTuple(
+            config={"configurable": {**key, "checkpoint_id": doc["checkpoint_id"]}},
+            checkpoint=self._load(doc),
+            metadata=self.serde.loads_typed((doc["metadata_type"], doc["metadata"])),
+            parent_config=(
+                {"configurable": {**key, "checkpoint_id": doc["parent_checkpoint_id"]}}
+                if doc.get("parent_checkpoint_id") else None
+            ),
+            pending_writes=[(w["task_id"], w["channel"], self._load(w)) for w in writes],
+        )
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        if self.db is None:
+            return
+        query: Dict[str, Any] = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if (ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query["checkpoint_ns"] = ns
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        returned = 0
+        async for doc in self.db[CHECKPOINTS].find(query).sort([("checkpoint_id", -1)]):
+            item = await self._to_tuple(doc)
+            if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            yield item
+            returned += 1
+            if limit and returned >= limit:
+                return
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        configurable = config["configurable"]
+        key = {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": checkpoint["id"],
+        }
+        if self.db is not None:
+            type_, value = self.serde.dumps_typed(checkpoint)
+            metadata_type, metadata_value = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+            await self.db[CHECKPOINTS].update_one(key, {"$set": {
+                **key,
+                "parent_checkpoint_id": configurable.get("checkpoint_id"),
+                "type": type_,
+                "value": value,
+                "metadata_type": metadata_type,
+                "metadata": metadata_value,
+                "created_at": datetime.datetime.utcnow(),
+            }}, upsert=True)
+        return {"configurable": key}
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        if self.db is None:
+            return
+        configurable = config["configurable"]
+        key = {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": configurable["checkpoint_id"],
+            "task_id": task_id,
+        }
+        now = datetime.datetime.utcnow()
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, blob = self.serde.dumps_typed(value)
+            fields = {**key, "idx": idx, "channel": channel, "type": type_, "value": blob,
+                      "task_path": task_path, "created_at": now}
+            # Regular writes are idempotent (first one wins); special channels (errors, interrupts) overwrite
+            update = {"$setOnInsert": fields} if idx >= 0 else {"$set": fields}
+            operations.append(UpdateOne({**key, "idx": idx}, update, upsert=True))
+        if operations:
+            await self.db[WRITES].bulk_write(operations, ordered=False)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        if self.db is None:
+            return
+        await self.db[CHECKPOINTS].delete_many({"thread_id": thread_id})
+        await self.db[WRITES].delete_many({"thread_id": thread_id})
+
+
+mongo_checkpointer = MongoCheckpointSaver()
+
+
+def checkpoint_config(thread_id: str, message: str, mode: Optional[str], job_id: Optional[str] = None) -> RunnableConfig:
+    """
+    Checkpoint thread for one swarm run. The chat thread alone is not enough,
+    because a thread asks for several blueprints. Keying on the idea and mode
+    too means only a retry of the same request resumes. A background job adds
+    its id: single-flight does not cover jobs, so a job and a /chat request
+    for the same idea could otherwise resume and write the same checkpoint.
+    A requeued job keeps its id and still resumes its own run.
+    """
+    digest = hashlib.sha256(normalize_idea(message).encode()).hexdigest()[:16]
+    key = f"{thread_id}:{mode or settings.SWARM_MODE}:{digest}"
+    return {"configurable": {"thread_id": f"{key}:job:{job_id}" if job_id else key}}
+
+
+async def prepare_run(swarm, config: RunnableConfig, inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Graph input for this attempt: None to resume an interrupted run from its
+    checkpoint, else `inputs` for a fresh run.
+    """
+    if swarm.checkpointer is None:
+        return inputs
+    snapshot = await swarm.aget_state(config)
+    if snapshot.next:
+        logger.info("Resuming swarm run %s at %s", config["configurable"]["thread_id"], list(snapshot.next))
+        return None
+    if snapshot.values:
+        # A finished run whose cleanup did not happen; start over rather than append to it
+        await swarm.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+    return inputs
+
+
+async def finish_run(swarm, config: RunnableConfig):
+    """Drop a completed run's checkpoints; the result lives in `analyses` from here on."""
+    if swarm.checkpointer is None:
+        return
+    try:
+        await swarm.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+    except Exception as e:
+        logger.warning("Checkpoint cleanup failed (TTL will remove it): %s", e)
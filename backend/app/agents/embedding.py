@@ -0,0 +1,63 @@
+"""
+Cheap local text embeddings: hashed word + character-trigram features.
+
+No model download and no network call; good enough to tell "the same text,
+lightly edited" from "different text". Hashing uses crc32 so vectors are
+stable across processes (Python's own `hash()` is salted per process).
+"""
+import re
+import zlib
+
+import numpy as np
+
+DIM = 4096
+_WORD = re.compile(r"[a-z0-9]+")
+# Words that carry no meaning in a pitch; dropped by `content_words`
+_STOPWORDS = frozenset(
+    "a an and app apps are as at based be by for from i in is it my of on or our platform service "
+    "startup that the their this to using via we which who with your".split()
+)
+_SUFFIXES = ("ings", "ing", "ers", "ies", "er", "es", "ed", "ly", "s")
+
+
+def _features(text: str):
+    words = _WORD.findall(text.lower())
+    for word in words:
+        yield "w:" + word
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield "c:" + padded[i:i + 3]
+    for a, b in zip(words, words[1:]):
+        yield f"b:{a} {b}"
+
+
+def content_words(text: str) -> str:
+    """
+    Lower-cased text without stopwords and with common suffixes cut off, so
+    "an app for walking dogs" and "dog walker" share their features.
+    """
+    words = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+        words.append(word)
+    return " ".join(words)
+
+
+def embed(text: str, dim: int = DIM) -> np.ndarray:
+    """L2-normalised float32 vector of length ``dim``."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def similarity(a: str, b: str) -> float:
+    """Cosine similarity of two texts, in [-1, 1] (1 for identical text)."""
+    return float(embed(a) @ embed(b))
@@ -0,0 +1,143 @@
+"""
+Incremental re-analysis for iterative sessions on the same thread.
+
+Blueprint messages are split into sections (the raw idea plus one section
+per wizard answer). When a thread asks for another blueprint, each section
+is compared with the previous run using local embeddings; only the agents
+that depend on a materially changed section are re-run, the rest reuse
+their score from the thread's last `analyses` record.
+"""
+import logging
+import re
+from typing import Any, Dict, Optional, Set
+
+from app.agents.cache import is_degraded_entry, is_not_applicable
+from app.agents.embedding import similarity
+from app.agents.predictive.registry import PREDICTIVE_AGENTS
+from app.agents.prompts import STRUCTURED_MARKER, TEMPLATE_PREFIX
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDEA_SECTION = "idea"
+ALL_AGENTS = tuple(PREDICTIVE_AGENTS)
+
+# Wizard sections (see QUESTIONS in client/src/app/architect/page.tsx) and the agents that read them
+SECTION_AGENTS = {
+    "the core blueprint": set(ALL_AGENTS),
+    "market domain": {"market", "competition", "pmf", "gtm", "economics", "funding", "legal", "impact"},
+    "defensibility moat": {"competition", "funding", "tech", "data_ai"},
+    "builder profile": {"execution", "tech", "funding"},
+    "traction pulse": {"pmf", "market", "funding", "execution"},
+}
+
+# Topics mentioned in an edited section pull in the agents that care about them
+TOPIC_AGENTS = {
+    r"pric|cost|margin|revenue|ltv|cac|burn|subscription|fee": {"economics", "funding", "gtm"},
+    r"customer|user|persona|segment|b2b|b2c|consumer|enterprise": {"market", "pmf", "gtm"},
+    r"compet|moat|patent|ip\b|network effect|switching": {"competition", "funding"},
+    r"team|founder|hire|hiring|engineer|cto": {"execution", "tech"},
+    r"tech|stack|platform|app\b|api|cloud|infra": {"tech", "scalability"},
+    r"\bai\b|model|data|ml\b|llm": {"data_ai", "tech"},
+    r"privacy|regulat|complian|licen|legal|gdpr|dpdp": {"legal"},
+    r"supply|vendor|logistic|inventory|warehouse|deliver|manufactur": {"supply_chain", "scalability"},
+    r"climate|carbon|esg|social|sustainab|rural|impact": {"impact"},
+    r"scale|city|cities|countr|expan|international": {"scalability", "market"},
+    r"fund|invest|raise|seed|grant|valuation": {"funding"},
+    r"channel|marketing|sales|viral|partnership|distribution": {"gtm"},
+}
+
+
+def split_sections(message: str) -> Dict[str, str]:
+    """
+    Split a blueprint request into {"idea": ..., "<wizard title>": ...}.
+    Messages without wizard answers become a single "idea" section.
+    """
+    head, _, structured = message.partition(STRUCTURED_MARKER)
+    sections = {IDEA_SECTION: head.strip()}
+    for line in structured.splitlines():
+        title, sep, body = line.partition(":")
+        title = title.strip().lower().replace(".", "_").lstrip("$")  # usable as a Mongo field name
+        if sep and title:
+            sections[title] = body.strip()
+    return sections
+
+
+def idea_text(message: str) -> str:
+    """The idea of a blueprint request, without the message template around it."""
+    return TEMPLATE_PREFIX.sub("", split_sections(message)[IDEA_SECTION])
+
+
+def _agents_for_section(title: str, old: str, new: str) -> Optional[Set[str]]:
+    """Agents affected by an edit to one section; None means 'cannot tell, rerun all'."""
+    agents = set(SECTION_AGENTS.get(title, set()))
+    text = f"{old} {new}".lower()
+    for pattern, topic_agents in TOPIC_AGENTS.items():
+        if re.search(pattern, text):
+            agents |= topic_agents
+    return agents or None
+
+
+def affected_agents(previous: Dict[str, str], current: Dict[str, str]) -> Set[str]:
+    changed = [
+        title for title in previous.keys() | current.keys()
+        if previous.get(title) != current.get(title)
+        and similarity(previous.get(title, ""), current.get(title, "")) < settings.INCREMENTAL_SECTION_THRESHOLD
+    ]
+    if IDEA_SECTION in changed:
+        return set(ALL_AGENTS)
+
+    agents: Set[str] = set()
+    for title in changed:
+        section_agents = _agents_for_section(title, previous.get(title, ""), current.get(title, ""))
+        if section_agents is None:
+            return set(ALL_AGENTS)
+        agents |= section_agents
+    return agents
+
+
+async def plan_reuse(db, thread_id: Optional[str], message: str) -> Dict[str, Any]:
+    """
+    Analysis entries from the thread's last blueprint that are still valid for
+    `message`. The swarm skips those agents (see `reusable_node`).
+    """
+    if not settings.INCREMENTAL_ENABLED or not thread_id or db is None:
+        return {}
+    try:
+        previous = await db.analyses.find_one(
+            {"thread_id": thread_id, "type": "blueprint", "analysis": {"$exists": True}, "sections": {"$exists": True}},
+            {"analysis": 1, "sections": 1},
+            sort=[("created_at", -1)],
+        )
+    except Exception as e:
+        logger.warning("Incremental lookup failed: %s", e)
+        return {}
+    if not previous:
+        return {}
+
+    rerun = affected_agents(previous["sections"], split_sections(message))
+    return {
+        name: result for name, result in previous["analysis"].items()
+        if name in ALL_AGENTS and name not in rerun and not is_degraded_entry(result) and not is_not_applicable(result)
+    }
+
+
+def record_fields(message: str, result: Dict[str, Any], reuse: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-node inputs/outputs stored on the `analyses` record for the next incremental run."""
+    return {
+        "analysis": result.get("analysis", {}),
+        "sections": split_sections(message),
+        "reused": sorted(reuse),
+    }
+
+
+def reusable_node(name: str, node):
+    """Wrap a predictive node so it returns the reused analysis entry instead of calling the LLM."""
+    async def run(state):
+        reuse = state.get("reuse") or {}
+        if name in reuse:
+            return {"analysis": {name: reuse[name]}}
+        return await node(state)
+
+    run.__name__ = getattr(node, "__name__", name)
+    return run
@@ -0,0 +1,295 @@
+"""
+Background blueprint jobs.
+
+A blueprint request can be queued instead of holding the HTTP connection
+open for the whole swarm run. Job state lives on the blueprint's own record
+in the `analyses` collection (`job_id`, `status`, and the blueprint once
+done, stored as in `app.agents.records`), so history reads see
+queued/running/done records alike. With a shared SHARED_STATE_URL backend
+each status change is also published there (`job:<id>`), so /jobs/{id}/events
+polls it instead of reading Mongo every second on every worker.
+
+Workers claim jobs atomically from Mongo and renew the lease while the run
+lasts; a job whose lease lapses (its worker died) is claimed again. The same
+code runs in-process (started from the app lifespan) or as a separate worker
+process:
+
+    python -m app.agents.jobs
+"""
+import asyncio
+import datetime
+import hashlib
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.agents.cache import normalize_idea
+from app.agents.incremental import plan_reuse, record_fields
+from app.agents.records import hydrate, pack_blueprint, save_scores
+from app.core import db as db_module
+from app.core.config import settings
+from app.core.context import begin_request, request_id_var
+from app.core.shared import shared_state
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+TERMINAL = (DONE, FAILED)
+STATUS_TTL_SECONDS = 24 * 3600
+
+
+def dedupe_key(thread_id: str, message: str, mode: Optional[str]) -> str:
+    raw = "\x1f".join([thread_id, normalize_idea(message), mode or settings.SWARM_MODE])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JobManager:
+    """Bounded pool of workers draining blueprint jobs from `analyses`."""
+
+    def __init__(self, concurrency: int, lease_seconds: float, poll_interval: float):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = uuid.uuid4().hex
+        self._wakeup = asyncio.Event()
+        self._workers = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._accepting = False
+
+    @property
+    def collection(self):
+        if db_module.db is None:
+            raise RuntimeError("Database not initialized. Is MongoDB running?")
+        return db_module.db.analyses
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("job_id", unique=True, sparse=True)
+        await self.collection.create_index([("status", 1), ("created_at", 1)])
+        # Only one queued/running job per (thread, idea, mode)
+        await self.collection.create_index(
+            "dedupe_key", unique=True, partialFilterExpression={"active": True}
+        )
+
+    async def start(self):
+        await self.ensure_indexes()
+        self._accepting = True
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.concurrency)]
+
+    async def shutdown(self, timeout: float):
+        """
+        Stop claiming new jobs and give running ones `timeout` seconds to
+        finish. Anything still running is put back to `queued` so the next
+        worker to start picks it up again.
+        """
+        self._accepting = False
+        self._wakeup.set()
+        if self._running:
+            await asyncio.wait(list(self._running.values()), timeout=timeout)
+        for job_id, task in list(self._running.items()):
+            task.cancel()
+            await self.collection.update_one(
+                {"job_id": job_id, "status": RUNNING},
+                {"$set": {"status": QUEUED, "worker_id": None, "lease_expires_at": None}},
+            )
+            await self._publish(job_id, QUEUED)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # -- producer side -----------------------------------------------------
+
+    async def submit(self, thread_id: str, message: str, mode: Optional[str]) -> Dict[str, Any]:
+        key = dedupe_key(thread_id, message, mode)
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "thread_id": thread_id,
+            "type": "blueprint",
+            "status": QUEUED,
+            "active": True,
+            "dedupe_key": key,
+            "message": message,
+            "mode": mode,
+            "created_at": datetime.datetime.utcnow(),
+        }
+        try:
+            await self.collection.insert_one(job)
+        except DuplicateKeyError:
+            existing = await self.collection.find_one({"dedupe_key": key, "active": True})
+            if existing is not None:
+                return existing
+            await self.collection.insert_one(job)
+        await self._publish(job["job_id"], QUEUED)
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return hydrate(await self.collection.find_one({"job_id": job_id}))
+
+    async def _publish(self, job_id: str, status: str):
+        """Publish a status change after it is in Mongo, so a reader that sees it also finds the record."""
+        if not shared_state.shared:
+            return
+        try:
+            await shared_state.set(f"job:{job_id}", status, STATUS_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("Publishing job %s status failed: %s", job_id, e)
+
+    async def status(self, job_id: str) -> Optional[str]:
+        """A job's status: from the shared state when it has it, else from Mongo."""
+        if shared_state.shared:
+            try:
+                status = await shared_state.get(f"job:{job_id}")
+                if status is not None:
+                    return status
+            except Exception as e:
+                logger.warning("Shared job status lookup failed: %s", e)
+        job = await self.collection.find_one({"job_id": job_id}, {"status": 1})
+        return job["status"] if job else None
+
+    # -- consumer side -----------------------------------------------------
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "active": True,
+                "$or": [
+                    {"status": QUEUED},
+                    # a worker died mid-run without a graceful shutdown
+                    {"status": RUNNING, "lease_expires_at": {"$lt": now}},
+                ],
+            },
+            {"$set": {
+                "status": RUNNING,
+                "worker_id": self.worker_id,
+                "started_at": now,
+                "lease_expires_at": now + datetime.timedelta(seconds=self.lease_seconds),
+            }},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _worker_loop(self):
+        while self._accepting:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.warning("Job claim failed: %s", e)
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._publish(job["job_id"], RUNNING)
+            task = asyncio.create_task(self._run(job))
+            heartbeat = asyncio.create_task(self._renew(job["job_id"]))
+            self._running[job["job_id"]] = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.done():
+                    raise
+            finally:
+                heartbeat.cancel()
+                self._running.pop(job["job_id"], None)
+
+    async def _renew(self, job_id: str):
+        """Keep extending the lease of a running job, so no worker reclaims it mid-run."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                expires = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.lease_seconds)
+                result = await self.collection.update_one(
+                    {"job_id": job_id, "worker_id": self.worker_id, "status": RUNNING},
+                    {"$set": {"lease_expires_at": expires}},
+                )
+                if result.matched_count == 0:
+                    logger.warning("Blueprint job %s lease lost to another worker", job_id)
+                    return
+            except Exception as e:
+                logger.warning("Job lease renewal failed: %s", e)
+
+    async def _run(self, job: Dict[str, Any]):
+        from app.agents.startup_swarm import get_startup_agent, build_swarm_inputs
+        from app.agents.checkpoint import checkpoint_config, prepare_run, finish_run
+        from app.agents.semantic import semantic_cache, seeded_reuse, SERVE
+
+        begin_request(job["thread_id"])
+        request_id_var.set(job["job_id"])  # log lines of the run carry the job id
+        swarm = get_startup_agent(job.get("mode"))
+        # A job requeued after a crash or shutdown resumes from its checkpoint
+        config = checkpoint_config(job["thread_id"], job["message"], job.get("mode"), job["job_id"])
+        match = None
+        try:
+            reuse = await plan_reuse(db_module.db, job["thread_id"], job["message"])
+            match = await semantic_cache.lookup(db_module.db, job["message"])
+            if match is not None and match.action == SERVE:
+                result = {"blueprint": match.blueprint, "analysis": match.analysis}
+                reuse = match.analysis
+            else:
+                reuse = seeded_reuse(match, reuse)
+                result = await swarm.ainvoke(await prepare_run(swarm, config, build_swarm_inputs(job["message"], reuse)), config)
+            blueprint = result.get("blueprint", {})
+            update = {"status": DONE, **pack_blueprint(blueprint), **record_fields(job["message"], result, reuse)}
+            if match is not None:
+                update["semantic_match"] = match.record()
+        except Exception as e:
+            logger.exception("Blueprint job %s failed: %s", job["job_id"], e)
+            update = {"status": FAILED, "error": str(e)}
+
+        update["finished_at"] = datetime.datetime.utcnow()
+        written = await self.collection.update_one(
+            {"job_id": job["job_id"], "worker_id": self.worker_id},
+            {"$set": update, "$unset": {"active": "", "lease_expires_at": ""}},
+        )
+        if written.matched_count != 1:
+            # The lease lapsed and another worker owns the job now: its run writes the scores and checkpoint
+            logger.warning("Blueprint job %s was reclaimed by another worker; dropping this result", job["job_id"])
+            return
+        await self._publish(job["job_id"], update["status"])
+        if update["status"] == DONE:
+            await save_scores(db_module.db, {**job, **update})
+            await finish_run(swarm, config)
+            if match is None:
+                await semantic_cache.remember(db_module.db, job["message"], job["_id"], update["analysis"], blueprint)
+
+
+job_manager = JobManager(
+    concurrency=settings.JOB_WORKERS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+)
+
+
+async def _run_worker_process():
+    import signal
+    from app.core.db import connect_to_db, close_db_connection
+    from app.agents.llm import close_llm_clients
+    from app.core.log import configure_logging, shutdown_logging
+
+    configure_logging()
+    await connect_to_db()
+    await job_manager.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info("Blueprint worker %s running with %d slots", job_manager.worker_id, job_manager.concurrency)
+    await stop.wait()
+    await job_manager.shutdown(timeout=settings.JOB_SHUTDOWN_TIMEOUT)
+    await close_llm_clients()
+    await close_db_connection()
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run_worker_process())
@@ -1,9 +1,206 @@
-from langchain_groq import ChatGroq
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+import httpx
 from app.core.config import settings
+from app.agents.scheduler import Priority, llm_scheduler
+from app.core.context import current_node_run
+from app.core.metrics import registry
 
-def get_structural_llm():
+if TYPE_CHECKING:  # runtime imports are deferred: both pull in langchain's tracing stack
+    from langchain_core.messages import BaseMessage
+    from langchain_core.runnables import Runnable
+    from langchain_groq import ChatGroq
+
+# Process-wide clients. Every node shares one ChatGroq per (model, temperature)
+# and all of them share one bounded, keep-alive HTTP pool, so a swarm fan-out
+# reuses sockets instead of building 14 clients per request. langchain_groq is
+# imported with the first client (see app.agents.warmup), not with this module.
+_http_client: Optional[httpx.AsyncClient] = None
+_llms: Dict[Tuple[str, float], "ChatGroq"] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+            ),
+            # Waiting for a free socket counts against the pool timeout, so
+            # saturation queues requests instead of failing them immediately.
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=10.0),
+        )
+    return _http_client
+
+
+def _get_llm(temperature: float, model: Optional[str] = None) -> "ChatGroq":
+    model = model or settings.LLM_MODEL
+    llm = _llms.get((model, temperature))
+    if llm is None:
+        llm = _new_llm(temperature, model)
+        if settings.LLM_CASSETTE_MODE != "off":
+            from app.agents.cassette import CassetteChatModel
+
+            llm = CassetteChatModel(model_name=model, temperature=temperature, mode=settings.LLM_CASSETTE_MODE,
+                                    cassette_path=settings.LLM_CASSETTE_PATH, inner=llm)
+        _llms[(model, temperature)] = llm
+    return llm
+
+
+def _new_llm(temperature: float, model: str) -> Optional["ChatGroq"]:
+    if settings.LLM_CASSETTE_MODE == "replay":
+        return None  # offline: no client, no API key
+    from langchain_groq import ChatGroq
+
+    kwargs = {}
+    if settings.GROQ_BASE_URL:
+        kwargs["base_url"] = settings.GROQ_BASE_URL
     return ChatGroq(
         api_key=settings.GROQ_API_KEY,
-        model="llama-3.3-70b-versatile",
-        temperature=0.1  # Lower temperature for structural data
+        model=model,
+        temperature=temperature,
+        timeout=settings.LLM_TIMEOUT,
+        max_retries=0,  # retries are owned by the scheduler so they respect the shared rate limit
+        http_async_client=get_http_client(),
+        **kwargs,
     )
+
+
+def get_structural_llm(model: Optional[str] = None) -> "ChatGroq":
+    return _get_llm(0.1, model)  # Lower temperature for structural data
+
+
+def get_discovery_llm(model: Optional[str] = None) -> "ChatGroq":
+    return _get_llm(0.7, model)
+
+
+def model_name(llm: "Runnable") -> str:
+    """Model behind a client, also through `.bind()`/`.with_config()` wrappers."""
+    while not hasattr(llm, "model_name") and hasattr(llm, "bound"):
+        llm = llm.bound
+    return getattr(llm, "model_name", settings.LLM_MODEL)
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    if model == settings.LLM_SMALL_MODEL:
+        prices = settings.LLM_SMALL_INPUT_COST_PER_MTOK, settings.LLM_SMALL_OUTPUT_COST_PER_MTOK
+    else:
+        prices = settings.LLM_INPUT_COST_PER_MTOK, settings.LLM_OUTPUT_COST_PER_MTOK
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def estimate_tokens(messages: List["BaseMessage"], expected_completion_tokens: int) -> int:
+    """Cheap pre-call estimate (~4 chars/token); corrected from usage metadata afterwards."""
+    prompt_chars = sum(len(str(m.content)) for m in messages)
+    return prompt_chars // 4 + expected_completion_tokens
+
+
+class LatencyTracker:
+    """Recent provider call latencies per node, for picking hedge delays."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def observe(self, key: str, seconds: float):
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+call_latency = LatencyTracker()
+hedged_calls = registry.counter("llm_hedged_calls_total", "Hedged LLM calls by which request answered first", ("winner",))
+
+
+async def _hedged(attempt, delay: float):
+    """
+    Run `attempt()`; if it has not answered after `delay`, start a duplicate
+    and return whichever succeeds first (the other is cancelled).
+    """
+    primary = asyncio.ensure_future(attempt())
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or llm_scheduler.queue_depth:
+            # Answered in time, or the scheduler is backed up and a duplicate would only add load
+            return await primary
+        run = current_node_run()
+        if run is not None:
+            run.hedges += 1
+        tasks.append(asyncio.ensure_future(attempt()))
+        pending, error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is None:
+                    hedged_calls.inc("primary" if task is primary else "hedge")
+                    return task.result()
+                error = task.exception()
+        # Both attempts failed: the last real error (an attempt cancelled from outside has none)
+        raise error if error is not None else asyncio.CancelledError()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def invoke_llm(llm: "Runnable", messages: List["BaseMessage"], priority: Priority = Priority.BLUEPRINT,
+                     expected_completion_tokens: Optional[int] = None, hedge: bool = False):
+    """
+    Every LLM call goes through here so the process-wide scheduler can pace it.
+    With `hedge`, a call slower than the node's usual tail latency gets a
+    duplicate request (see HEDGE_* settings).
+    """
+    if expected_completion_tokens is None:
+        expected_completion_tokens = settings.LLM_EXPECTED_COMPLETION_TOKENS
+    run = current_node_run()
+    model = model_name(llm)
+    # Small and large models have different latency profiles; hedge delays are kept per model
+    key = f"{run.node if run is not None else 'default'}:{model}"
+
+    async def call():
+        started = time.perf_counter()
+        response = await llm.ainvoke(messages)
+        call_latency.observe(key, time.perf_counter() - started)
+        return response
+
+    def attempt():
+        return llm_scheduler.run(
+            call,
+            priority=priority,
+            estimated_tokens=estimate_tokens(messages, expected_completion_tokens),
+        )
+
+    delay = call_latency.percentile(key, settings.HEDGE_PERCENTILE) if hedge and settings.HEDGE_ENABLED else None
+    if delay is None:
+        response = await attempt()
+    else:
+        response = await _hedged(attempt, max(delay, settings.HEDGE_MIN_DELAY))
+
+    if run is not None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        run.llm_calls += 1
+        run.model = model
+        run.prompt_tokens += usage.get("input_tokens", 0)
+        run.completion_tokens += usage.get("output_tokens", 0)
+        run.cost_usd += cost_usd(model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+    return response
+
+
+async def close_llm_clients():
+    """Release the shared HTTP pool (called from the app lifespan on shutdown)."""
+    global _http_client
+    _llms.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+from app.agents.prompts import packed_score_messages, score_messages
+from app.agents.routing import invoke_routed
+from app.agents.scheduler import Priority
+from app.agents.schemas import AgentScore
+from app.agents.structured import StructuredOutputError, parse_stats
+
+logger = logging.getLogger(__name__)
+
+
+def validate_score(data) -> Dict[str, Any]:
+    return AgentScore.model_validate(data).model_dump(exclude_none=True)
+
+
+def fallback_score(node: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
+    """Canned score used only after escalation/repair failed; flagged so it is never cached or reused."""
+    parse_stats.record(node, "fallbacks")
+    return {**fallback, "fallback": True}
+
+
+async def score_idea(node: str, rubric: str, business_idea: str, fallback: Dict[str, Any],
+                     priority: Priority = Priority.BLUEPRINT) -> Dict[str, Any]:
+    """Run one predictive agent's rubric against the idea and return its score/insight."""
+    try:
+        return await invoke_routed(node, score_messages(rubric, business_idea), validate_score,
+                                   entries=lambda entry: [entry], priority=priority, hedge=True)
+    except StructuredOutputError as e:
+        logger.warning("%s output unusable after repair, using fallback: %s", node, e)
+        return fallback_score(node, fallback)
+
+
+async def score_ideas(node: str, rubric: str, ideas: List[str], fallback: Dict[str, Any],
+                      priority: Priority = Priority.SCREENING) -> List[Dict[str, Any]]:
+    """
+    Score several ideas with one agent's rubric in a single request; the
+    rubric is sent once instead of once per idea. If the packed reply is
+    unusable after the repair retry, each idea is scored on its own.
+    """
+    if len(ideas) == 1:
+        return [await score_idea(node, rubric, ideas[0], fallback, priority)]
+
+    keys = [str(i) for i in range(1, len(ideas) + 1)]
+
+    def validate(data):
+        return [validate_score(data[key]) for key in keys]
+
+    try:
+        return await invoke_routed(node, packed_score_messages(rubric, ideas, keys), validate, entries=list,
+                                   priority=priority, expected_completion_tokens=70 * len(ideas), hedge=True)
+    except StructuredOutputError as e:
+        logger.warning("%s packed output unusable after repair, scoring %d ideas one by one: %s", node, len(ideas), e)
+        return list(await asyncio.gather(*(score_idea(node, rubric, idea, fallback, priority) for idea in ideas)))
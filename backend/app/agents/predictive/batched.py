@@ -0,0 +1,42 @@
+import logging
+from app.agents.state import AgentState
+from app.agents.predictive.base import fallback_score, validate_score
+from app.agents.predictive.registry import PREDICTIVE_AGENTS
+from app.agents.prompts import panel_messages
+from app.agents.routing import invoke_routed
+from app.agents.structured import StructuredOutputError
+
+logger = logging.getLogger(__name__)
+
+
+async def batched_predictive_node(state: AgentState):
+    """
+    "Mega-agent" mode: every predictive rubric packed into one request.
+
+    The idea is sent once instead of 13 times and the reply is split back into
+    the same `analysis` keys the per-agent nodes produce, so `blueprint_node`
+    works unchanged. Every key must validate as an AgentScore; if the reply is
+    still unusable after the repair retry, all agents fall back. Agents carried over by an
+    incremental run and agents the relevance gate skipped are left out of the
+    request.
+    """
+    selected = state.get("agents") or list(PREDICTIVE_AGENTS)
+    reuse = {name: entry for name, entry in (state.get("reuse") or {}).items() if name in selected}
+    agents = {name: agent for name, agent in PREDICTIVE_AGENTS.items() if name in selected and name not in reuse}
+    if not agents:
+        return {"analysis": dict(reuse)}
+
+    def validate(data):
+        return {name: validate_score(data[name]) for name in agents}
+
+    analysis = dict(reuse)
+    try:
+        analysis.update(await invoke_routed(
+            "predictive", panel_messages({name: agent.RUBRIC for name, agent in agents.items()}, state['business_idea']),
+            validate, entries=dict.values,
+            expected_completion_tokens=110 * len(agents), hedge=True,
+        ))
+    except StructuredOutputError as e:
+        logger.warning("Batched predictive output unusable after repair, using fallbacks: %s", e)
+        analysis.update({name: fallback_score(name, agent.FALLBACK) for name, agent in agents.items()})
+    return {"analysis": analysis}
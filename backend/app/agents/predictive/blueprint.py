@@ -1,70 +1,70 @@
-import json
-from langchain_core.messages import SystemMessage
+import logging
 from app.agents.state import AgentState
-from app.agents.llm import get_structural_llm
+from app.agents.cache import is_not_applicable
+from app.agents.routing import invoke_routed
+from app.agents.schemas import Blueprint
+from app.agents.structured import StructuredOutputError, parse_stats
+from app.agents.predictive.registry import SCORING_KEYS
+from app.agents.prompts import blueprint_messages
 
-def blueprint_node(state: AgentState):
-    llm = get_structural_llm()
-    prompt = f"""
-    You are the Lead Startup Architect. Using the analysis from your agents, generate a complete Business Blueprint.
-    Idea: {state['business_idea']}
-    Scores: {state['analysis']}
-    
-    OUTPUT ONLY VALID JSON matching this schema:
-    {{
-      "businessOverview": {{ "name": "string", "description": "string", "targetAudience": "string", "valueProposition": "string" }},
-      "agentScoring": {{
-        "marketResearch": {{ "score": number, "insight": "string" }},
-        "competitionIntel": {{ "score": number, "insight": "string" }},
-        "executionRisk": {{ "score": number, "insight": "string" }},
-        "pmfProbability": {{ "score": number, "insight": "string" }},
-        "techFeasibility": {{ "score": number, "insight": "string" }},
-        "fundingReadiness": {{ "score": number, "insight": "string" }},
-        "legalCompliance": {{ "score": number, "insight": "string" }},
-        "gtmStrategy": {{ "score": number, "insight": "string" }},
-        "unitEconomics": {{ "score": number, "insight": "string" }},
-        "scalabilityInfra": {{ "score": number, "insight": "string" }},
-        "impactSustainability": {{ "score": number, "insight": "string" }},
-        "supplyChainOps": {{ "score": number, "insight": "string" }},
-        "dataAiRisk": {{ "score": number, "insight": "string" }}
-      }},
-      "services": [ {{ "title": "string", "description": "string", "pricingModel": "string" }} ],
-      "revenueModel": ["string"],
-      "costStructure": {{ "oneTimeSetup": ["string"], "monthlyExpenses": ["string"] }},
-      "strategicRoadmap": ["string"],
-      "risks": ["string"],
-      "growthOpportunities": ["string"]
-    }}
+logger = logging.getLogger(__name__)
+
+
+def fallback_blueprint(analysis: dict) -> dict:
+    """Fail-safe blueprint carrying the agents' own scores; flagged so it is never cached."""
+    # safe .get() to avoid KeyError
+    return {
+        "businessOverview": {"name": "Fail-Safe Startup", "description": "Error in generation", "targetAudience": "Internal", "valueProposition": "Check logs"},
+        "agentScoring": {
+            key: analysis.get(name, {"score": 0, "insight": "N/A"}) for name, key in SCORING_KEYS.items()
+        },
+        "strategicRoadmap": ["Fix the AI generation logic"],
+        "fallback": True
+    }
+
+
+def finalize_blueprint(blueprint: dict, analysis: dict) -> dict:
     """
-    response = llm.invoke([SystemMessage(content=prompt)])
+    Report agents that missed their deadline as missing and agents the
+    relevance gate skipped as not applicable, instead of whatever score the
+    model filled in, and list every degraded agent (missing or canned
+    fallback) under `degradedAgents`. An agent that reported but that the
+    model left out keeps its own score.
+    """
+    degraded = []
+    for name, key in SCORING_KEYS.items():
+        entry = analysis.get(name) or {}
+        if is_not_applicable(entry):
+            blueprint.setdefault("agentScoring", {})[key] = {
+                "score": None, "insight": "Not applicable to this idea.", "status": "not_applicable",
+            }
+        elif entry.get("status") == "missing":
+            blueprint.setdefault("agentScoring", {})[key] = {
+                "score": None, "insight": "Not available: this agent did not finish in time.", "status": "missing",
+            }
+            degraded.append({"agent": key, "reason": entry.get("reason", "deadline")})
+        else:
+            if entry.get("fallback"):
+                degraded.append({"agent": key, "reason": "fallback"})
+            scoring = blueprint.setdefault("agentScoring", {})
+            if scoring.get(key) is None and entry.get("score") is not None:  # left out by the model
+                scoring[key] = {"score": entry["score"], "insight": entry.get("insight") or ""}
+    if degraded:
+        blueprint["degradedAgents"] = degraded
+    return blueprint
+
+
+async def blueprint_node(state: AgentState):
+    analysis = state.get('analysis', {})
     try:
-        content = response.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-        blueprint = json.loads(content.strip())
-    except Exception as e:
-        print(f"Blueprint generation failed, using fallback: {e}")
-        analysis = state.get('analysis', {})
-        # Fallback if LLM fails to output valid JSON — safe .get() to avoid KeyError
-        blueprint = {
-            "businessOverview": {"name": "Fail-Safe Startup", "description": "Error in generation", "targetAudience": "Internal", "valueProposition": "Check logs"},
-            "agentScoring": {
-                "marketResearch": analysis.get('market', {"score": 0, "insight": "N/A"}),
-                "competitionIntel": analysis.get('competition', {"score": 0, "insight": "N/A"}),
-                "executionRisk": analysis.get('execution', {"score": 0, "insight": "N/A"}),
-                "pmfProbability": analysis.get('pmf', {"score": 0, "insight": "N/A"}),
-                "techFeasibility": analysis.get('tech', {"score": 0, "insight": "N/A"}),
-                "fundingReadiness": analysis.get('funding', {"score": 0, "insight": "N/A"}),
-                "legalCompliance": analysis.get('legal', {"score": 0, "insight": "N/A"}),
-                "gtmStrategy": analysis.get('gtm', {"score": 0, "insight": "N/A"}),
-                "unitEconomics": analysis.get('economics', {"score": 0, "insight": "N/A"}),
-                "scalabilityInfra": analysis.get('scalability', {"score": 0, "insight": "N/A"}),
-                "impactSustainability": analysis.get('impact', {"score": 0, "insight": "N/A"}),
-                "supplyChainOps": analysis.get('supply_chain', {"score": 0, "insight": "N/A"}),
-                "dataAiRisk": analysis.get('data_ai', {"score": 0, "insight": "N/A"})
-            },
-            "strategicRoadmap": ["Fix the AI generation logic"]
-        }
-    return {"blueprint": blueprint}
+        # Not in JSON mode so blueprint tokens can still be streamed to the client
+        blueprint = (await invoke_routed(
+            "blueprint", blueprint_messages(state['business_idea'], analysis, SCORING_KEYS), Blueprint.model_validate,
+            use_json_mode=False, expected_completion_tokens=1500,
+        )).model_dump()
+    except StructuredOutputError as e:
+        logger.warning("Blueprint generation failed, using fallback: %s", e)
+        parse_stats.record("blueprint", "fallbacks")
+        # Fallback if LLM fails to output valid JSON
+        blueprint = fallback_blueprint(analysis)
+    return {"blueprint": finalize_blueprint(blueprint, analysis)}
@@ -1,22 +1,13 @@
-import json
-import re
-from langchain_core.messages import SystemMessage
 from app.agents.state import AgentState
-from app.agents.llm import get_structural_llm
+from app.agents.predictive.base import score_idea
 
-def execution_risk_node(state: AgentState):
-    llm = get_structural_llm()
-    prompt = f"""
-    You are the Execution Risk Agent.
-    Analyze: Founder skill vs product, Technical capability gap, Time commitment.
-    Business Idea: {state['business_idea']}
-    Output JSON: {{"score": 1-100, "insight": "short insight"}}
-    """
-    response = llm.invoke([SystemMessage(content=prompt)])
-    try:
-        data = json.loads(re.search(r'\{.*\}', response.content, re.DOTALL).group())
-    except Exception:
-        # Note: Higher score here means lower risk in the UI typically,
-        # but let's follow the UI logic: score is shown as percentage.
-        data = {"score": 80, "insight": "Low execution risk if key technical hires are secured."}
+RUBRIC = """You are the Execution Risk Agent.
+Analyze: Founder skill vs product, Technical capability gap, Time commitment."""
+
+# Note: Higher score here means lower risk in the UI typically,
+# but let's follow the UI logic: score is shown as percentage.
+FALLBACK = {"score": 80, "insight": "Low execution risk if key technical hires are secured."}
+
+async def execution_risk_node(state: AgentState):
+    data = await score_idea("execution", RUBRIC, state['business_idea'], FALLBACK)
     return {"analysis": {"execution": data}}
@@ -1,21 +1,12 @@
-import json
-import re
-from langchain_core.messages import SystemMessage
 from app.agents.state import AgentState
-from app.agents.llm import get_structural_llm
+from app.agents.predictive.base import score_idea
 
-def gtm_node(state: AgentState):
-    llm = get_structural_llm()
-    prompt = f"""
-    You are the Go-To-Market (GTM) Strategy Agent.
-    Role: "How will this startup acquire customers?"
-    Analyze: Distribution channel feasibility, CAC assumptions, Sales complexity (B2B vs B2C), Virality potential.
-    Business Idea: {state['business_idea']}
-    Output JSON: {{"score": 1-100, "insight": "short insight"}}
-    """
-    response = llm.invoke([SystemMessage(content=prompt)])
-    try:
-        data = json.loads(re.search(r'\{.*\}', response.content, re.DOTALL).group())
-    except Exception:
-        data = {"score": 70, "insight": "Recommended GTM: Content-led inbound strategy with high virality potential."}
+RUBRIC = """You are the Go-To-Market (GTM) Strategy Agent.
+Role: "How will this startup acquire customers?"
+Analyze: Distribution channel feasibility, CAC assumptions, Sales complexity (B2B vs B2C), Virality potential."""
+
+FALLBACK = {"score": 70, "insight": "Recommended GTM: Content-led inbound strategy with high virality potential."}
+
+async def gtm_node(state: AgentState):
+    data = await score_idea("gtm", RUBRIC, state['business_idea'], FALLBACK)
     return {"analysis": {"gtm": data}}
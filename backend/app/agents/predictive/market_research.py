@@ -1,21 +1,12 @@
-import json
-import re
-from langchain_core.messages import SystemMessage
 from app.agents.state import AgentState
-from app.agents.llm import get_structural_llm
+from app.agents.predictive.base import score_idea
 
-def market_research_node(state: AgentState):
-    llm = get_structural_llm()
-    prompt = f"""
-    You are the Market Research Agent. 
-    Role: "Will anyone actually buy this?"
-    Analyze: Target customer, Market size, Existing competitors, Differentiation.
-    Business Idea: {state['business_idea']}
-    Output JSON: {{"score": 1-100, "insight": "short insight"}}
-    """
-    response = llm.invoke([SystemMessage(content=prompt)])
-    try:
-        data = json.loads(re.search(r'\{.*\}', response.content, re.DOTALL).group())
-    except Exception:
-        data = {"score": 70, "insight": "Market demand looks promising but localized."}
+RUBRIC = """You are the Market Research Agent.
+Role: "Will anyone actually buy this?"
+Analyze: Target customer, Market size, Existing competitors, Differentiation."""
+
+FALLBACK = {"score": 70, "insight": "Market demand looks promising but localized."}
+
+async def market_research_node(state: AgentState):
+    data = await score_idea("market", RUBRIC, state['business_idea'], FALLBACK)
     return {"analysis": {"market": data}}
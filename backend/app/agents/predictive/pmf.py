@@ -1,20 +1,11 @@
-import json
-import re
-from langchain_core.messages import SystemMessage
 from app.agents.state import AgentState
-from app.agents.llm import get_structural_llm
+from app.agents.predictive.base import score_idea
 
-def pmf_node(state: AgentState):
-    llm = get_structural_llm()
-    prompt = f"""
-    You are the Product-Market Fit Agent.
-    Analyze: User validation, Urgency of problem, Alternative solutions.
-    Business Idea: {state['business_idea']}
-    Output JSON: {{"score": 1-100, "insight": "short insight"}}
-    """
-    response = llm.invoke([SystemMessage(content=prompt)])
-    try:
-        data = json.loads(re.search(r'\{.*\}', response.content, re.DOTALL).group())
-    except Exception:
-        data = {"score": 75, "insight": "High urgency for the identified problem set."}
+RUBRIC = """You are the Product-Market Fit Agent.
+Analyze: User validation, Urgency of problem, Alternative solutions."""
+
+FALLBACK = {"score": 75, "insight": "High urgency for the identified problem set."}
+
+async def pmf_node(state: AgentState):
+    data = await score_idea("pmf", RUBRIC, state['business_idea'], FALLBACK)
     return {"analysis": {"pmf": data}}
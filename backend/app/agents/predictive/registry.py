@@ -0,0 +1,50 @@
+from app.agents.predictive import (
+    market_research,
+    competition_intel,
+    execution_risk,
+    pmf,
+    tech_feasibility,
+    funding,
+    legal,
+    gtm,
+    economics,
+    scalability,
+    impact,
+    supply_chain,
+    data_ai,
+)
+
+# Predictive agent modules (each exposes RUBRIC and FALLBACK), keyed by their
+# graph node / analysis name
+PREDICTIVE_AGENTS = {
+    "market": market_research,
+    "competition": competition_intel,
+    "execution": execution_risk,
+    "pmf": pmf,
+    "tech": tech_feasibility,
+    "funding": funding,
+    "legal": legal,
+    "gtm": gtm,
+    "economics": economics,
+    "scalability": scalability,
+    "impact": impact,
+    "supply_chain": supply_chain,
+    "data_ai": data_ai,
+}
+
+# Analysis name -> key of the same agent in Blueprint.agentScoring
+SCORING_KEYS = {
+    "market": "marketResearch",
+    "competition": "competitionIntel",
+    "execution": "executionRisk",
+    "pmf": "pmfProbability",
+    "tech": "techFeasibility",
+    "funding": "fundingReadiness",
+    "legal": "legalCompliance",
+    "gtm": "gtmStrategy",
+    "economics": "unitEconomics",
+    "scalability": "scalabilityInfra",
+    "impact": "impactSustainability",
+    "supply_chain": "supplyChainOps",
+    "data_ai": "dataAiRisk",
+}
@@ -0,0 +1,179 @@
+"""
+Prompt construction for every LLM call the swarm makes.
+
+Each prompt is laid out static prefix first: a SystemMessage with the parts
+that are the same on every call (role, rubric, output format), then a
+HumanMessage with the request's variables (idea, scores, keys). The 13
+predictive agents also share one preamble in front of their rubrics. So
+every agent call starts with the same tokens, and an agent's calls differ
+only after its rubric, which lets a provider's prompt-prefix cache (and its
+cached-input discount) apply.
+
+The static parts are compiled once at import: dedented, with no blank
+padding, and the blueprint schema is a minified JSON shape with the 13
+agentScoring keys listed once rather than a 40-line pretty-printed example.
+The agents' scores reach the blueprint as minified JSON keyed like
+agentScoring, carrying only score and insight (or the status of a missing or
+not-applicable agent), not a Python dict repr with confidence, fallback and
+cache flags.
+
+Bump PROMPT_VERSION when a template here changes.
+`benchmarks/prompt_report.py` reports the tokens of every prompt.
+"""
+import json
+import re
+import textwrap
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+from app.agents.cache import NOT_APPLICABLE
+from app.agents.schemas import AgentScoring
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+
+def _compile(template: str) -> str:
+    return textwrap.dedent(template).strip()
+
+
+def minified(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _messages(system: str, user: str) -> List["BaseMessage"]:
+    from langchain_core.messages import HumanMessage, SystemMessage  # loaded with the swarm (app.agents.warmup)
+
+    return [SystemMessage(content=system), HumanMessage(content=user)]
+
+
+# The client's blueprint request: "User is ready for the blueprint. Context idea: <idea>.
+# Here is the structured data:\n<wizard title>: <option> | Details: <text>" per answer
+TEMPLATE_PREFIX = re.compile(r"^.*?context idea:\s*", re.IGNORECASE | re.DOTALL)
+STRUCTURED_MARKER = "Here is the structured data:"
+
+
+def compact_idea(message: str) -> str:
+    """The idea and its wizard answers, one per line, without the request template or blank padding."""
+    head, _, structured = message.partition(STRUCTURED_MARKER)
+    lines = [TEMPLATE_PREFIX.sub("", head), *structured.splitlines()]
+    return "\n".join(" ".join(line.split()) for line in lines if line.strip())
+
+
+# -- predictive agents ---------------------------------------------------------
+
+SCORE_SCHEMA = '{"score":1-100,"insight":"short insight","confidence":0-1}'
+
+PREDICTIVE_PREAMBLE = _compile(f"""
+    Score the business idea in the next message strictly through the rubric below. Output JSON: {SCORE_SCHEMA}
+""")
+
+PACKED_PREAMBLE = _compile(f"""
+    Score each business idea in the next message on its own, strictly through the rubric below.
+    Output ONLY a JSON object with exactly the IDEA KEYS given, each mapping to {SCORE_SCHEMA}.
+""")
+
+PANEL_PREAMBLE = _compile(f"""
+    You are a panel of startup analysis agents. Evaluate the business idea in the next message once per agent below, each strictly through its own rubric.
+    Output ONLY a JSON object with exactly the AGENT KEYS given, each mapping to {SCORE_SCHEMA}.
+""")
+
+
+@lru_cache(maxsize=None)
+def _agent_system(preamble: str, rubric: str) -> str:
+    return f"{preamble}\n\n{_compile(rubric)}"
+
+
+def score_messages(rubric: str, idea: str) -> List["BaseMessage"]:
+    """One predictive agent scoring one idea."""
+    return _messages(_agent_system(PREDICTIVE_PREAMBLE, rubric), f"Business Idea: {compact_idea(idea)}")
+
+
+def packed_score_messages(rubric: str, ideas: Sequence[str], keys: Sequence[str]) -> List["BaseMessage"]:
+    """One predictive agent scoring several ideas (portfolio screening)."""
+    listed = "\n".join(f"[{key}] {compact_idea(idea)}" for key, idea in zip(keys, ideas))
+    return _messages(_agent_system(PACKED_PREAMBLE, rubric), f"{listed}\n\nIDEA KEYS: {','.join(keys)}")
+
+
+def panel_messages(rubrics: Dict[str, str], idea: str) -> List["BaseMessage"]:
+    """Every selected agent's rubric in one request (batched mode); rubrics keep registry order."""
+    panel = "\n\n".join(f"[{name}]\n{_compile(rubric)}" for name, rubric in rubrics.items())
+    return _messages(f"{PANEL_PREAMBLE}\n\n{panel}", f"Business Idea: {compact_idea(idea)}\n\nAGENT KEYS: {','.join(rubrics)}")
+
+
+# -- blueprint -----------------------------------------------------------------
+
+BLUEPRINT_SHAPE = minified({
+    "businessOverview": {"name": "string", "description": "string", "targetAudience": "string",
+                         "valueProposition": "string"},
+    "agentScoring": "AGENT_SCORING",
+    "services": [{"title": "string", "description": "string", "pricingModel": "string"}],
+    "revenueModel": ["string"],
+    "costStructure": {"oneTimeSetup": ["string"], "monthlyExpenses": ["string"]},
+    "strategicRoadmap": ["string"],
+    "risks": ["string"],
+    "growthOpportunities": ["string"],
+}).replace('"AGENT_SCORING"', "AGENT_SCORING")
+
+BLUEPRINT_SYSTEM = _compile(f"""
+    You are the Lead Startup Architect. Using the analysis from your agents (next message), generate a complete Business Blueprint.
+    OUTPUT ONLY VALID JSON of this shape:
+    {BLUEPRINT_SHAPE}
+    AGENT_SCORING is an object with exactly these keys, each {{"score":number,"insight":"string"}}: {",".join(AgentScoring.model_fields)}
+""")
+
+MISSING_NOTE = "Agents with status \"missing\" did not report in time. Do not guess their scores: give them score 1 and insight \"Not available\", and build the rest of the blueprint from the agents that did."
+NOT_APPLICABLE_NOTE = "Agents with status \"not_applicable\" were skipped as irrelevant to this idea. Give them score 1 and insight \"Not applicable\"; they are reported as not applicable."
+
+
+def compact_scores(analysis: Dict[str, Any], scoring_keys: Dict[str, str]) -> str:
+    """The agents' results as minified JSON keyed like agentScoring: score and insight, or a status."""
+    scores = {}
+    for name, key in scoring_keys.items():
+        entry = analysis.get(name)
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("status") in (NOT_APPLICABLE, "missing"):
+            scores[key] = {"status": entry["status"]}
+        else:
+            scores[key] = {"score": entry.get("score"), "insight": entry.get("insight")}
+    return minified(scores)
+
+
+def blueprint_messages(idea: str, analysis: Dict[str, Any], scoring_keys: Dict[str, str]) -> List["BaseMessage"]:
+    statuses = {entry.get("status") for entry in analysis.values() if isinstance(entry, dict)}
+    notes = [note for status, note in (("missing", MISSING_NOTE), (NOT_APPLICABLE, NOT_APPLICABLE_NOTE))
+             if status in statuses]
+    user = "\n".join([f"Idea: {compact_idea(idea)}", f"Scores: {compact_scores(analysis, scoring_keys)}", *notes])
+    return _messages(BLUEPRINT_SYSTEM, user)
+
+
+# -- relevance and discovery ---------------------------------------------------
+
+RELEVANCE_SYSTEM = _compile("""
+    You decide which specialist reviews a startup idea needs. Every idea gets market, competition,
+    execution, PMF, funding, GTM and unit-economics reviews. Of the optional reviews below, pick
+    only those that genuinely apply to the idea in the next message.
+
+      tech          building non-trivial technology (software, hardware, platforms)
+      legal         regulated activity, personal data, licences or compliance exposure
+      scalability   growth limited by infrastructure, operations or geography
+      impact        environmental or social effects worth assessing
+      supply_chain  physical goods, inventory, vendors, logistics or delivery
+      data_ai       relies on data, analytics, ML or AI
+
+    Output JSON: {"agents": ["tech", ...]}
+""")
+
+
+def relevance_messages(idea: str) -> List["BaseMessage"]:
+    return _messages(RELEVANCE_SYSTEM, f"Idea: {idea}")
+
+
+DISCOVERY_SYSTEM = ("You are the Lead Startup Architect. Provide a strategic, founder-level 'First Impression' of this idea. "
+                    "Show that you understand the niche. Provide 2-3 'Architect Tips' specific to that domain. "
+                    "Be encouraging but realistic. Keep it concise (2 paragraphs).")
+
+
+def discovery_messages(idea: str) -> List["BaseMessage"]:
+    return _messages(DISCOVERY_SYSTEM, idea)
@@ -0,0 +1,241 @@
+"""
+Storage layout of `analyses` records.
+
+A blueprint record keeps the fields that list views and lookups read inline
+and stores the narrative out of their way:
+
+  overview        the blueprint's businessOverview, for history rows
+  analysis        per-agent results, read by incremental reuse and the semantic cache
+  data_z, codec   the whole blueprint as compressed JSON (zstd, or zlib without
+                  the zstandard package); only the reads that return the
+                  blueprint decompress it (`hydrate`)
+  layout          STORAGE_LAYOUT
+
+Each agent's result is also written as a row of `analysis_scores`
+(analysis_id, thread_id, type, agent, score, confidence, status, name,
+created_at), indexed by (agent, score). "Ideas with pmf above 80" is then
+an index range scan over rows of ~150 bytes, not a scan of whole blueprints.
+Screening records get rows too. The rows go through the write-behind buffer
+together with their record.
+
+Records from before this layout still have `data`. `hydrate` passes them
+through unchanged, and the history projection asks for both fields. The
+oldest of them have no `analysis` either; their score rows come from the
+blueprint's agentScoring. Migrate them with
+
+    python -m app.agents.records [--batch 200] [--dry-run]
+
+This packs `data` and writes the missing score rows. It is safe to run
+again. `benchmarks/bench_storage.py` compares sizes and read latency.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import bson
+from bson import Binary, ObjectId
+from pymongo import UpdateOne
+
+from app.agents.cache import is_degraded_entry
+from app.core.config import settings
+from app.core.write_behind import write_behind
+
+logger = logging.getLogger(__name__)
+
+STORAGE_LAYOUT = 2
+SCORES = "analysis_scores"
+NAME_CHARS = 120
+
+_zstd = None
+
+
+def _zstandard():
+    global _zstd
+    if _zstd is None:
+        try:
+            import zstandard
+
+            _zstd = zstandard
+        except ImportError as e:
+            logger.warning("zstandard unavailable, compressing blueprints with zlib: %s", e)
+            _zstd = False
+    return _zstd or None
+
+
+def compress(value: Any) -> Tuple[str, bytes]:
+    raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    if settings.BLUEPRINT_CODEC == "zstd" and _zstandard() is not None:
+        return "zstd", _zstandard().ZstdCompressor(level=settings.BLUEPRINT_COMPRESS_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, min(settings.BLUEPRINT_COMPRESS_LEVEL, 9))
+
+
+def decompress(codec: str, blob: bytes) -> Any:
+    if codec == "zstd":
+        import zstandard  # a zstd record cannot be read without it
+
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    elif codec == "zlib":
+        raw = zlib.decompress(blob)
+    else:
+        raise ValueError(f"Unknown blueprint codec {codec!r}")
+    return json.loads(raw)
+
+
+def pack_blueprint(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Record fields for a blueprint: the overview inline, the rest compressed (BLUEPRINT_CODEC=none: inline)."""
+    fields = {"overview": (data or {}).get("businessOverview") or {}, "layout": STORAGE_LAYOUT}
+    if settings.BLUEPRINT_CODEC == "none":
+        return {**fields, "data": data}
+    codec, blob = compress(data)
+    return {**fields, "data_z": Binary(blob), "codec": codec}
+
+
+def hydrate(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Put the decompressed blueprint back in `data`, as records of the old layout have it."""
+    if record and "data_z" in record:
+        record["data"] = decompress(record.pop("codec", "zlib"), bytes(record.pop("data_z")))
+        record.pop("overview", None)
+    return record
+
+
+def _blueprint_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-agent results of a record without `analysis`, keyed by analysis name, from its blueprint."""
+    from app.agents.predictive.registry import SCORING_KEYS
+
+    agents = {key: name for name, key in SCORING_KEYS.items()}
+    analysis = {}
+    for key, entry in {**(data.get("agent_scores") or {}), **(data.get("agentScoring") or {})}.items():
+        if isinstance(entry, (int, float)):
+            entry = {"score": entry}
+        analysis[agents.get(key, key)] = entry
+    return analysis
+
+
+def score_rows(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One `analysis_scores` row per agent of `record` (which needs its `_id`)."""
+    data = record.get("data") if isinstance(record.get("data"), dict) else {}
+    name = (record.get("overview") or data.get("businessOverview") or {}).get("name") \
+        or record.get("idea") or (record.get("sections") or {}).get("idea") or ""
+    rows = []
+    analysis = record["analysis"] if "analysis" in record else _blueprint_analysis(data)
+    for agent, entry in (analysis or {}).items():
+        if not isinstance(entry, dict):
+            continue
+        row = {
+            "analysis_id": record["_id"],
+            "thread_id": record.get("thread_id"),
+            "type": record.get("type"),
+            "agent": agent,
+            "score": entry.get("score") if isinstance(entry.get("score"), (int, float)) else None,
+            "confidence": entry.get("confidence"),
+            "name": name[:NAME_CHARS],
+            "created_at": record.get("created_at"),
+        }
+        if entry.get("status"):
+            row["status"] = entry["status"]
+        elif is_degraded_entry(entry):
+            row["status"] = "fallback"
+        rows.append(row)
+    return rows
+
+
+def _prepare(record: Dict[str, Any]) -> Dict[str, Any]:
+    record.setdefault("_id", ObjectId())
+    if "data" in record:
+        record.update(pack_blueprint(record.pop("data")))
+    record["layout"] = STORAGE_LAYOUT
+    return record
+
+
+async def save(db, record: Dict[str, Any]) -> ObjectId:
+    """Queue `record` for `analyses` in the current layout, and its score rows; returns its `_id`."""
+    rows = score_rows(_prepare(record))
+    record_id = await write_behind.insert(db.analyses, record)
+    if rows:
+        await write_behind.insert_many(db[SCORES], rows)
+    return record_id
+
+
+async def save_many(db, records: List[Dict[str, Any]]) -> List[ObjectId]:
+    rows = [row for record in records for row in score_rows(_prepare(record))]
+    ids = await write_behind.insert_many(db.analyses, records)
+    if rows:
+        await write_behind.insert_many(db[SCORES], rows)
+    return ids
+
+
+async def save_scores(db, record: Dict[str, Any]):
+    """Score rows for a record updated in place (a finished background job)."""
+    rows = score_rows(record)
+    if rows:
+        await write_behind.insert_many(db[SCORES], rows)
+
+
+async def migrate(db, batch: int = 200, dry_run: bool = False) -> Dict[str, int]:
+    """Bring records of the old layout up to STORAGE_LAYOUT; queued and running jobs are left alone."""
+    counts = {"records": 0, "packed": 0, "rows": 0, "bytes_before": 0, "bytes_after": 0}
+    query = {
+        "layout": {"$exists": False},
+        "$or": [{"data": {"$exists": True}}, {"analysis": {"$exists": True}}],
+        "status": {"$nin": ["queued", "running"]},  # jobs.QUEUED, jobs.RUNNING: their record is still being written
+    }
+    last = None
+    while True:
+        page = {**query, "_id": {"$gt": last}} if last is not None else query
+        records = await db.analyses.find(page).sort("_id", 1).limit(batch).to_list(length=batch)
+        if not records:
+            break
+        updates, rows = [], []
+        for record in records:
+            last = record["_id"]
+            update: Dict[str, Any] = {"$set": {"layout": STORAGE_LAYOUT}}
+            if "data" in record:
+                packed = pack_blueprint(record["data"])
+                update["$set"].update(packed)
+                if "data_z" in packed:
+                    update["$unset"] = {"data": ""}
+                counts["packed"] += 1
+                counts["bytes_before"] += len(bson.encode({"data": record["data"]}))
+                counts["bytes_after"] += len(bson.encode(packed))
+            updates.append((record["_id"], update))
+            rows += score_rows(record)
+        counts["records"] += len(records)
+        counts["rows"] += len(rows)
+        if dry_run:
+            continue
+        # Rows first: a run interrupted here leaves the records unmigrated, and the next run replaces their rows
+        await db[SCORES].delete_many({"analysis_id": {"$in": [record_id for record_id, _ in updates]}})
+        if rows:
+            await db[SCORES].insert_many(rows, ordered=False)
+        await db.analyses.bulk_write([UpdateOne({"_id": record_id}, update) for record_id, update in updates],
+                                     ordered=False)
+        logger.info("Migrated %d records so far (%d score rows)", counts["records"], counts["rows"])
+    return counts
+
+
+async def _run_migration(batch: int, dry_run: bool):
+    from app.core import db as db_module
+    from app.core.db import close_db_connection, connect_to_db, ensure_indexes
+    from app.core.log import configure_logging, shutdown_logging
+
+    configure_logging()
+    await connect_to_db()
+    try:
+        if not dry_run:
+            await ensure_indexes()
+        counts = await migrate(db_module.db, batch, dry_run)
+        logger.info("Migration %s: %s", "dry run" if dry_run else "done", counts)
+    finally:
+        await close_db_connection()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move analyses records to the compressed, split layout")
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="count and measure, write nothing")
+    args = parser.parse_args()
+    asyncio.run(_run_migration(args.batch, args.dry_run))
@@ -0,0 +1,120 @@
+"""
+Relevance gating: run only the predictive agents that matter for an idea.
+
+Seven agents apply to any business (market, competition, execution, PMF,
+funding, GTM, unit economics) and always run. The other six are gated on
+what the idea and wizard answers talk about: a SaaS idea skips supply chain,
+a bakery skips data & AI risk. RELEVANCE_MODE picks the selector:
+
+  keywords   a local keyword pass over the request; no LLM call (default)
+  llm        one small-model call that names the applicable gated agents,
+             falling back to keywords if its reply is unusable
+  off        every agent runs
+
+The `relevance` node runs first and the graph fans out from it through
+conditional edges, so a gated-out agent is never scheduled. Its analysis
+entry is `{"status": "not_applicable"}`, which the blueprint reports as
+"not applicable" in `agentScoring` instead of leaving it out.
+"""
+import logging
+import re
+from typing import Any, Dict, List
+
+from app.agents.cache import NOT_APPLICABLE
+from app.agents.incremental import IDEA_SECTION, idea_text, split_sections
+from app.agents.predictive.registry import PREDICTIVE_AGENTS
+from app.agents.prompts import relevance_messages
+from app.agents.routing import invoke_routed
+from app.agents.scheduler import Priority
+from app.agents.structured import StructuredOutputError
+from app.agents.tracing import node_span
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CORE_AGENTS = ("market", "competition", "execution", "pmf", "funding", "gtm", "economics")
+
+# Gated agents and what an idea has to mention for them to apply. Patterns
+# err on the side of running an agent: a wasted call is cheaper than a
+# missing analysis.
+GATED_AGENTS = {
+    "tech": r"app\b|apps\b|platform|software|saas|api\b|online|digital|web|tech|\bai\b|device|hardware|iot|"
+            r"automat|marketplace|portal|dashboard|sensor|robot|blockchain|e-?commerce|cloud|algorithm|browser|"
+            r"extension|plugin|develop",
+    "legal": r"health|medic|clinic|hospital|pharma|drug|patient|telemed|\bvet|financ|fintech|payment|loan|lend|"
+             r"credit|insur|bank|invest|crypto|\btax|gst|legal|\blaws?\b|complian|regulat|licen|privacy|personal data|"
+             r"gdpr|dpdp|child|kid|school|food|bak|restaurant|kitchen|cafe|cater|cook|meal|tiffin|alcohol|liquor|"
+             r"drone|gambl|betting|real estate|rental|employ|hiring|recruit|visa|immigra|nurs|gig|labou?r|"
+             r"import|export|energy|\bride|vehicle|transport|biometric|accounting|bookkeep|invoice",
+    "scalability": r"platform|saas|marketplace|app\b|apps\b|network|api\b|cloud|online|nationwide|global|"
+                   r"international|cities|countries|scale|franchise|million|enterprise|b2b|infra",
+    "impact": r"climate|carbon|emission|esg|social|sustainab|green|renewable|solar|\bev\b|electric|recycl|waste|"
+              r"rural|farm|agri|women|inclusi|accessib|ngo|poverty|health|educat|school|student|water|energy|"
+              r"impact|communit|elder|senior|disab",
+    "supply_chain": r"supply|vendor|supplier|logistic|inventory|warehouse|deliver|shipping|courier|fleet|"
+                    r"manufactur|factory|hardware|device|sensor|physical|retail|\bshops?\b|e-?commerce|"
+                    r"d2c|grocer|food|restaurant|bak|kitchen|cater|cook|meal|tiffin|farm|produce|cold.?chain|textile|apparel|"
+                    r"fashion|furniture|distribut|wholesale|box|rental|equipment|pharma|drug|import|export",
+    "data_ai": r"\bai\b|artificial intelligence|machine learning|\bml\b|llm|gpt|data|analytic|predict|"
+               r"recommend|personali|computer vision|nlp|chatbot|copilot|algorithm|automat|sensor|iot|"
+               r"dashboard|track|fraud|biometric|facial|scor",
+}
+
+selections = registry.counter("swarm_agent_selection_total", "Predictive agents selected or gated out per blueprint",
+                              ("agent", "result"))
+
+
+def not_applicable_entry() -> Dict[str, Any]:
+    return {"status": NOT_APPLICABLE, "score": None, "insight": "Not applicable to this idea."}
+
+
+def relevance_text(message: str) -> str:
+    """The idea and the wizard answers, without the message template (its words would match patterns)."""
+    sections = split_sections(message)
+    answers = [body for title, body in sections.items() if title != IDEA_SECTION]
+    return " ".join([idea_text(message), *answers]).lower()
+
+
+def keyword_agents(message: str) -> List[str]:
+    text = relevance_text(message)
+    return [name for name, pattern in GATED_AGENTS.items() if re.search(pattern, text)]
+
+
+async def llm_agents(message: str) -> List[str]:
+    def validate(data):
+        agents = data["agents"]
+        if not isinstance(agents, list) or any(name not in GATED_AGENTS for name in agents):
+            raise ValueError(f"agents must be a subset of {', '.join(GATED_AGENTS)}")
+        return agents
+
+    try:
+        async with node_span("relevance"):
+            return await invoke_routed("relevance", relevance_messages(relevance_text(message)), validate,
+                                       priority=Priority.BLUEPRINT, expected_completion_tokens=40)
+    except StructuredOutputError as e:
+        logger.warning("Relevance selection unusable, using keywords: %s", e)
+        return keyword_agents(message)
+
+
+async def select_agents(message: str) -> List[str]:
+    """Predictive agents to run for `message`, in registry order."""
+    mode = settings.RELEVANCE_MODE
+    if mode == "off":
+        return list(PREDICTIVE_AGENTS)
+    gated = await llm_agents(message) if mode == "llm" else keyword_agents(message)
+    return [name for name in PREDICTIVE_AGENTS if name in CORE_AGENTS or name in gated]
+
+
+async def relevance_node(state):
+    """Pick the agents for this run and mark the rest not applicable."""
+    agents = await select_agents(state["business_idea"])
+    skipped = [name for name in PREDICTIVE_AGENTS if name not in agents]
+    for name in PREDICTIVE_AGENTS:
+        selections.inc(name, "skipped" if name in skipped else "selected")
+    return {"agents": agents, "analysis": {name: not_applicable_entry() for name in skipped}}
+
+
+def selected_agents(state) -> List[str]:
+    """Conditional-edge router: fan out to the selected agents only."""
+    return state.get("agents") or list(PREDICTIVE_AGENTS)
@@ -0,0 +1,94 @@
+"""
+Tiered model routing for structured agent calls.
+
+Each node is sent to the model its LLM_ROUTES entry names. The predictive
+rubrics default to LLM_SMALL_MODEL, which is several times faster and cheaper
+than LLM_MODEL and good enough for a 1-100 score with a one-line insight. A
+small-tier reply is checked before it is used and escalated, i.e. asked again
+of LLM_MODEL, when it
+
+  parse        is not a JSON object
+  invalid      fails the schema (a missing key, a score of 150)
+  confidence   reports a confidence below ESCALATION_MIN_CONFIDENCE
+
+The small tier gets no repair round-trip: escalating costs about the same and
+gives a better answer. The blueprint synthesis and discovery stay on the large
+model. Escalations are counted per node and reason, so the routing table can
+be tuned from /api/v1/metrics.
+"""
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from app.agents.llm import get_structural_llm
+from app.agents.structured import SchemaMismatchError, StructuredOutputError, invoke_structured
+from app.core.config import settings
+from app.core.context import current_node_run
+from app.core.metrics import registry
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+T = TypeVar("T")
+
+SMALL, LARGE = "small", "large"
+
+routed_calls = registry.counter("llm_routed_calls_total", "Structured agent calls by the tier they were routed to",
+                                ("node", "tier"))
+escalations = registry.counter("llm_escalations_total", "Small-tier replies retried on the large model",
+                               ("node", "reason"))
+
+
+def model_for(node: str) -> str:
+    """Model a node is routed to; unlisted nodes use the "default" route."""
+    route = settings.LLM_ROUTES.get(node, settings.LLM_ROUTES.get("default", LARGE))
+    if route == SMALL:
+        return settings.LLM_SMALL_MODEL
+    if route == LARGE:
+        return settings.LLM_MODEL
+    return route
+
+
+def low_confidence(entries: Iterable[Dict[str, Any]]) -> bool:
+    """Any entry whose self-reported confidence is under the threshold; a missing confidence counts as sure."""
+    return any(
+        entry.get("confidence") is not None and entry["confidence"] < settings.ESCALATION_MIN_CONFIDENCE
+        for entry in entries
+    )
+
+
+async def invoke_routed(node: str, messages: List["BaseMessage"], validate: Callable[[Any], T],
+                        entries: Optional[Callable[[T], Iterable[Dict[str, Any]]]] = None, **invoke_kwargs) -> T:
+    """
+    `invoke_structured` on the node's routed model, escalating small-tier
+    replies as described above. `entries` lists the scored entries of a
+    validated result for the confidence check. Raises StructuredOutputError
+    if the large model's reply is unusable too.
+    """
+    model = model_for(node)
+    if model == settings.LLM_MODEL:
+        routed_calls.inc(node, LARGE)
+        return await invoke_structured(node, get_structural_llm(), messages, validate, **invoke_kwargs)
+
+    routed_calls.inc(node, SMALL)
+    result = None
+    try:
+        result = await invoke_structured(node, get_structural_llm(model), messages, validate,
+                                         repair=False, **invoke_kwargs)
+        if entries is None or not low_confidence(entries(result)):
+            return result
+        reason = "confidence"
+    except SchemaMismatchError:
+        reason = "invalid"
+    except StructuredOutputError:
+        reason = "parse"
+
+    escalations.inc(node, reason)
+    run = current_node_run()
+    if run is not None:
+        run.escalations += 1
+    try:
+        return await invoke_structured(node, get_structural_llm(), messages, validate, **invoke_kwargs)
+    except StructuredOutputError:
+        if result is None:
+            raise
+        # The small model's answer was valid, just unsure; it beats a canned fallback
+        return result
@@ -0,0 +1,300 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.context import current_node_run
+from app.core.shared import shared_state
+
+logger = logging.getLogger(__name__)
+
+PAUSE_KEY = "llm:paused_until"  # shared state entry: wall-clock end of the latest 429 pause
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+    DISCOVERY = 0
+    BLUEPRINT = 1
+    SCREENING = 2  # bulk portfolio screening never delays interactive requests
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        """Take ``amount`` (negative refunds); the level may go below zero as debt."""
+        if self.unlimited:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level - min(amount, self.capacity))
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+
+def _retry_after(error: BaseException) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0)) if response is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def is_retryable(error: BaseException) -> bool:
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError)) or name in ("APIConnectionError", "APITimeoutError")
+
+
+class LLMScheduler:
+    """
+    Process-wide admission control for Groq calls.
+
+    Every call waits in a priority queue until both token buckets (requests
+    per minute and tokens per minute) admit it, so concurrent swarms share the
+    provider quota instead of racing into 429s. Discovery chats are admitted
+    ahead of blueprint fan-out. A 429 pauses admission in this worker for the
+    Retry-After period, then the call is retried with jittered exponential
+    backoff. Saturation therefore shows up as queue wait, never as a
+    made-up score.
+
+    With a shared SHARED_STATE_URL backend, the buckets are the
+    deployment's (`shared_state.take`), so N workers together stay within
+    the provider quota. A 429 pause is published there too, so every worker
+    backs off. Each worker keeps its own priority queue and admits its head
+    waiter once the shared buckets can pay for it. If the backend fails, the
+    worker falls back to its local buckets and its own pause.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_retries: int,
+                 backoff_base: float, backoff_max: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._counters = {"admitted": 0, "completed": 0, "failed": 0, "retries": 0, "rate_limited": 0}
+        self._waits: Dict[Priority, Deque[float]] = {p: deque(maxlen=1000) for p in Priority}
+
+    # -- admission ---------------------------------------------------------
+
+    @property
+    def _shared(self) -> bool:
+        return shared_state.shared
+
+    def _costs(self, requests: float, tokens: float) -> Dict[str, Tuple[float, float]]:
+        costs = {"llm:requests": (requests, self.requests.capacity), "llm:tokens": (tokens, self.tokens.capacity)}
+        return {name: cost for name, cost in costs.items() if cost[0] and cost[1] > 0}
+
+    async def _take_shared(self, requests: float, tokens: float, force: bool = False) -> Optional[float]:
+        """Seconds until the shared buckets admit the call (0: taken); None when the backend failed."""
+        costs = self._costs(requests, tokens)
+        if not costs:
+            return 0.0
+        try:
+            return await shared_state.take(costs, force)
+        except Exception as e:
+            logger.warning("Shared rate-limit buckets unavailable, using local ones: %s", e)
+            return None
+
+    async def _shared_pause(self) -> float:
+        """Seconds left of a 429 pause published by any worker."""
+        try:
+            until = await shared_state.get(PAUSE_KEY)
+        except Exception as e:
+            logger.warning("Shared 429 pause unavailable: %s", e)
+            return 0.0
+        return max(0.0, (until or 0.0) - time.time())
+
+    async def _publish_pause(self, delay: float):
+        until = time.time() + delay
+        try:
+            if until > (await shared_state.get(PAUSE_KEY) or 0.0):
+                await shared_state.set(PAUSE_KEY, until, delay)
+        except Exception as e:
+            logger.warning("Publishing the 429 pause failed: %s", e)
+
+    async def _dispatch_shared(self):
+        while self._waiters:
+            head = self._waiters[0]
+            _, _, tokens, future = head
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(self._paused_until - time.monotonic(), await self._shared_pause())
+            local = False
+            if wait <= 0:
+                wait = await self._take_shared(1, tokens)
+                if wait is None:  # backend down: admit this call against the local buckets
+                    local = True
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if not wait:
+                        self.requests.consume(1)
+                        self.tokens.consume(tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            # A higher-priority waiter may have arrived during the await; admit the one that was paid for
+            self._waiters.remove(head)
+            heapq.heapify(self._waiters)
+            if not future.done():
+                future.set_result(None)
+            elif local:  # cancelled while its admission was being paid for: refund
+                self.requests.consume(-1)
+                self.tokens.consume(-tokens)
+            else:
+                await self._take_shared(-1, -tokens, force=True)
+
+    def _dispatch(self):
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._waiters:
+            priority, _, tokens, future = self._waiters[0]
+            if future.done():  # cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens),
+            )
+            if wait > 0:
+                self._timer = loop.call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            future.set_result(None)
+
+    async def _admit(self, priority: Priority, tokens: float):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), tokens, future))
+        if self._shared:
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = asyncio.create_task(self._dispatch_shared())
+        elif self._timer is None:
+            self._dispatch()
+        queued_at = time.monotonic()
+        await future
+        waited = time.monotonic() - queued_at
+        self._waits[priority].append(waited)
+        self._counters["admitted"] += 1
+        run = current_node_run()
+        if run is not None:
+            run.queue_seconds += waited
+
+    # -- execution ---------------------------------------------------------
+
+    async def run(self, call: Callable[[], Awaitable[Any]], priority: Priority = Priority.BLUEPRINT,
+                  estimated_tokens: float = 0) -> Any:
+        attempt = 0
+        while True:
+            await self._admit(priority, estimated_tokens)
+            self._in_flight += 1
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self._counters["failed"] += 1
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.5)
+                if _status_code(e) == 429:
+                    self._counters["rate_limited"] += 1
+                    delay = max(delay, _retry_after(e))
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    if self._shared:
+                        await self._publish_pause(delay)
+                self._counters["retries"] += 1
+                run = current_node_run()
+                if run is not None:
+                    run.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                self._in_flight -= 1
+
+            usage = getattr(result, "usage_metadata", None) or {}
+            if usage.get("total_tokens"):
+                correction = usage["total_tokens"] - estimated_tokens
+                if not self._shared or self.tokens.unlimited or await self._take_shared(0, correction, force=True) is None:
+                    self.tokens.consume(correction)
+            self._counters["completed"] += 1
+            return result
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, f in self._waiters if not f.done())
+
+    def stats(self) -> Dict[str, Any]:
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[priority.name.lower()] = {
+                "samples": len(ordered),
+                "avg_s": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+                "p95_s": round(ordered[int(0.95 * (len(ordered) - 1))], 4) if ordered else 0.0,
+                "max_s": round(ordered[-1], 4) if ordered else 0.0,
+            }
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            **self._counters,
+            "wait": waits,
+            "limits": {"requests_per_minute": self.requests.capacity, "tokens_per_minute": self.tokens.capacity},
+        }
+
+
+_offline = settings.LLM_CASSETTE_MODE == "replay"  # replayed calls use no provider quota
+llm_scheduler = LLMScheduler(
+    requests_per_minute=0 if _offline else settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=0 if _offline else settings.LLM_TOKENS_PER_MINUTE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_base=settings.LLM_BACKOFF_BASE,
+    backoff_max=settings.LLM_BACKOFF_MAX,
+)
@@ -0,0 +1,68 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+
+class NodeScore(BaseModel):
+    """One agent's score as the blueprint reports it."""
+    score: int = Field(ge=1, le=100)
+    insight: str = Field(min_length=1)
+
+
+class AgentScore(NodeScore):
+    """What every predictive agent returns; low confidence escalates a small-model reply."""
+    confidence: Optional[float] = Field(None, ge=0, le=1)
+
+
+class BusinessOverview(BaseModel):
+    name: str
+    description: str
+    targetAudience: str
+    valueProposition: str
+
+
+class AgentScoring(BaseModel):
+    """
+    Per-agent scores in the blueprint. An agent the model leaves out or scores
+    null (one that missed its deadline) is None; finalize_blueprint reports it.
+    """
+    marketResearch: Optional[NodeScore] = None
+    competitionIntel: Optional[NodeScore] = None
+    executionRisk: Optional[NodeScore] = None
+    pmfProbability: Optional[NodeScore] = None
+    techFeasibility: Optional[NodeScore] = None
+    fundingReadiness: Optional[NodeScore] = None
+    legalCompliance: Optional[NodeScore] = None
+    gtmStrategy: Optional[NodeScore] = None
+    unitEconomics: Optional[NodeScore] = None
+    scalabilityInfra: Optional[NodeScore] = None
+    impactSustainability: Optional[NodeScore] = None
+    supplyChainOps: Optional[NodeScore] = None
+    dataAiRisk: Optional[NodeScore] = None
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _unscored(cls, value):
+        return None if isinstance(value, dict) and value.get("score") is None else value
+
+
+class Service(BaseModel):
+    title: str
+    description: str
+    pricingModel: str
+
+
+class CostStructure(BaseModel):
+    oneTimeSetup: List[str] = []
+    monthlyExpenses: List[str] = []
+
+
+class Blueprint(BaseModel):
+    """The Business Blueprint the frontend renders (see blueprint_node's prompt)."""
+    businessOverview: BusinessOverview
+    agentScoring: AgentScoring
+    services: List[Service] = []
+    revenueModel: List[str] = []
+    costStructure: CostStructure = CostStructure()
+    strategicRoadmap: List[str] = []
+    risks: List[str] = []
+    growthOpportunities: List[str] = []
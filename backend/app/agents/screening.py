@@ -0,0 +1,130 @@
+"""
+Bulk portfolio screening: predictive scores for many ideas in one request.
+
+A batch is deduplicated on the normalized idea and split into groups of
+SCREEN_IDEAS_PER_CALL. Each group makes one packed request per predictive
+agent, so a group costs 13 requests instead of 13 per idea, and each rubric
+is sent once per group. Requests run at SCREENING priority on the shared
+LLM scheduler: they stay within the process-wide rate budget and yield to
+interactive traffic. At most SCREEN_CONCURRENCY of a batch's requests are in
+flight. Scores already in the response cache, from a blueprint run or an
+earlier batch, are not requested again.
+
+Results are yielded per idea as soon as its group is done. No blueprint is
+generated; a screened idea can go through /chat afterwards and reuses its
+cached agent scores there.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List
+
+from app.agents.cache import is_degraded_entry, is_not_applicable, normalize_idea, response_cache
+from app.agents.predictive.base import score_ideas
+from app.agents.predictive.registry import PREDICTIVE_AGENTS
+from app.agents.tracing import node_span
+from app.core.config import settings
+from app.core.metrics import registry
+
+screened = registry.counter("screening_ideas_total", "Ideas received by screening batches", ("result",))
+throughput = registry.summary("screening_ideas_per_minute", "Ideas per minute of one screening batch")
+
+
+def overall_score(analysis: Dict[str, Any]):
+    """Mean agent score, ignoring canned fallbacks and skipped agents; None if no agent produced one."""
+    scores = [entry["score"] for entry in analysis.values()
+              if not is_degraded_entry(entry) and not is_not_applicable(entry)]
+    return round(sum(scores) / len(scores)) if scores else None
+
+
+class ScreeningBatch:
+    def __init__(self, ideas: List[str], ideas_per_call: int, concurrency: int):
+        self.batch_id = uuid.uuid4().hex
+        self.ideas_per_call = ideas_per_call
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # normalized idea -> (first spelling, positions in the request)
+        self.unique: "OrderedDict[str, tuple]" = OrderedDict()
+        for index, idea in enumerate(ideas):
+            key = normalize_idea(idea)
+            if key not in self.unique:
+                self.unique[key] = (idea.strip(), [])
+            self.unique[key][1].append(index)
+        self.total = len(ideas)
+        self.llm_calls = 0
+        self.tokens = 0
+        self.started = time.perf_counter()
+
+    @property
+    def ideas_per_minute(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.total / elapsed * 60 if elapsed > 0 else 0.0
+
+    async def _score_agent(self, name: str, ideas: List[str]) -> Dict[str, Any]:
+        """One agent's entries for a group of ideas: cache first, then one packed request."""
+        agent = PREDICTIVE_AGENTS[name]
+        keys = {idea: response_cache.make_key(idea, name) for idea in ideas}
+        entries: Dict[str, Any] = {}
+        if settings.CACHE_ENABLED:
+            for idea, key in keys.items():
+                cached = await response_cache.get(key, name)
+                if cached is not None:
+                    entries[idea] = cached["analysis"][name]
+        pending = [idea for idea in ideas if idea not in entries]
+        if not pending:
+            return entries
+
+        async with self._semaphore:
+            async with node_span("screening") as run:
+                results = await score_ideas(name, agent.RUBRIC, pending, agent.FALLBACK)
+        self.llm_calls += run.llm_calls
+        self.tokens += run.prompt_tokens + run.completion_tokens
+        for idea, entry in zip(pending, results):
+            entries[idea] = entry
+            if settings.CACHE_ENABLED and not is_degraded_entry(entry):
+                # Same shape as the swarm's node cache, so /chat on a screened idea reuses it
+                await response_cache.set(keys[idea], name, {"analysis": {name: entry}})
+        return entries
+
+    async def _score_group(self, group: List[str]) -> List[Dict[str, Any]]:
+        per_agent = await asyncio.gather(*(self._score_agent(name, group) for name in PREDICTIVE_AGENTS))
+        results = []
+        for idea in group:
+            analysis = {name: entries[idea] for name, entries in zip(PREDICTIVE_AGENTS, per_agent)}
+            key = normalize_idea(idea)
+            results.append({
+                "idea": idea,
+                "indices": self.unique[key][1],
+                "analysis": analysis,
+                "overallScore": overall_score(analysis),
+                "degradedAgents": sorted(name for name, entry in analysis.items() if is_degraded_entry(entry)),
+            })
+        return results
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result per unique idea, in the order groups finish."""
+        ideas = [idea for idea, _ in self.unique.values()]
+        groups = [ideas[i:i + self.ideas_per_call] for i in range(0, len(ideas), self.ideas_per_call)]
+        # Groups queue on the semaphore in order, so early ideas finish first
+        tasks = [asyncio.create_task(self._score_group(group)) for group in groups]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for result in await finished:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+        screened.inc("unique", amount=len(self.unique))
+        screened.inc("duplicate", amount=self.total - len(self.unique))
+        throughput.observe(self.ideas_per_minute)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "batchId": self.batch_id,
+            "ideas": self.total,
+            "unique": len(self.unique),
+            "llmCalls": self.llm_calls,
+            "tokens": self.tokens,
+            "seconds": round(time.perf_counter() - self.started, 2),
+            "ideasPerMinute": round(self.ideas_per_minute, 1),
+        }
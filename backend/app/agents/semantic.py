@@ -0,0 +1,271 @@
+"""
+Semantic near-duplicate cache for blueprint requests.
+
+The exact-hash caches only hit when the same text comes back. Reworded
+ideas ("Uber for dog walking" vs "An Uber for dog-walking") miss them. This
+cache embeds the idea of every finished blueprint request into an in-process
+index that is persisted to the `idea_vectors` collection. A new request's
+idea is compared with everything seen so far. On a match, its wizard answers
+are compared section by section like an incremental re-run on a thread:
+
+  score >= SEMANTIC_SERVE_THRESHOLD, same answers  the stored blueprint is served
+  score >= SEMANTIC_SEED_THRESHOLD                 stored scores of agents whose
+                                                   answers did not change seed
+                                                   `reuse`; the rest run
+
+Only the idea is embedded because the wizard answers come from a short list
+of options; with them in the vector, different ideas with the same answers
+look alike. Vectors come from the hashed n-gram embedder by default (no
+download), which catches rewordings but not true paraphrases ("on-demand dog
+walker app"). For those, set SEMANTIC_MODEL to a sentence-transformers model,
+which runs on CPU, and retune the thresholds with `benchmarks/bench_semantic.py`.
+"""
+import asyncio
+import datetime
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+
+from app.agents.cache import is_degraded_entry, is_not_applicable
+from app.agents.embedding import content_words, embed
+from app.agents.incremental import IDEA_SECTION, affected_agents, idea_text, split_sections
+from app.agents.records import hydrate
+from app.core.config import settings
+from app.core.metrics import gauge_lines, registry
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "idea_vectors"
+HASHED = "hashed"
+SERVE, SEED, MISS = "serve", "seed", "miss"
+THREADED_SEARCH_ENTRIES = 20_000  # ~4 ms scan; beyond this the thread hop is cheaper than blocking the loop
+
+lookups = registry.counter("semantic_cache_lookups_total", "Semantic cache lookups by result", ("result",))
+lookup_latency = registry.summary("semantic_cache_lookup_seconds", "Embedding plus index search time of one lookup")
+
+
+def hashed_vector(text: str, dim: int) -> np.ndarray:
+    """
+    Hashed features of the content words plus character trigrams of the same
+    words run together, so "co-working" and "coworking" land close.
+    """
+    words = content_words(text)
+    vector = embed(words, dim) + embed(words.replace(" ", ""), dim)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticIndex:
+    """
+    Brute-force cosine search over unit vectors in one float32 matrix.
+
+    One scan of 100k x 512 floats is memory-bound at ~20 ms, so no ANN
+    structure is needed at this scale; large scans run in a thread (NumPy
+    releases the GIL) to keep the event loop free. When full, the oldest
+    entry is overwritten.
+    """
+
+    def __init__(self, dim: int, max_entries: int):
+        self.dim = dim
+        self.max_entries = max_entries
+        self._vectors = np.zeros((min(max_entries, 1024), dim), dtype=np.float32)
+        self._refs: List[str] = []
+        self._keys: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._oldest = 0
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def add(self, key: str, vector: np.ndarray, ref: str):
+        slot = self._slots.get(key)
+        if slot is None and len(self._refs) < self.max_entries:
+            slot = len(self._refs)
+            if slot == len(self._vectors):
+                grown = np.zeros((min(self.max_entries, 2 * slot), self.dim), dtype=np.float32)
+                grown[:slot] = self._vectors
+                self._vectors = grown
+            self._refs.append(ref)
+            self._keys.append(key)
+        elif slot is None:
+            slot = self._oldest
+            self._oldest = (self._oldest + 1) % self.max_entries
+            del self._slots[self._keys[slot]]
+        self._vectors[slot] = vector
+        self._refs[slot] = ref
+        self._keys[slot] = key
+        self._slots[key] = slot
+
+    def search(self, vector: np.ndarray):
+        """(ref, score) of the most similar entry, or None when empty."""
+        size = len(self._refs)
+        if not size:
+            return None
+        scores = self._vectors[:size] @ vector
+        best = int(np.argmax(scores))
+        return self._refs[best], float(scores[best])
+
+
+@dataclass
+class SemanticMatch:
+    action: str  # SERVE or SEED
+    score: float
+    analysis_id: str
+    blueprint: Dict[str, Any] = field(default_factory=dict)
+    analysis: Dict[str, Any] = field(default_factory=dict)
+
+    def record(self) -> Dict[str, Any]:
+        """Provenance stored on the new `analyses` record."""
+        return {"analysis_id": self.analysis_id, "score": round(self.score, 4), "action": self.action}
+
+
+class SemanticCache:
+    def __init__(self):
+        self.index: Optional[SemanticIndex] = None
+        self.model_name = HASHED
+        self._model = None
+        self._synced_at: Optional[float] = None
+        self._newest: Optional[datetime.datetime] = None
+        self._lock = asyncio.Lock()
+
+    def _embedder(self):
+        if self.index is None:
+            dim = settings.SEMANTIC_DIM
+            if settings.SEMANTIC_MODEL:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(settings.SEMANTIC_MODEL, device="cpu")
+                    self.model_name = settings.SEMANTIC_MODEL
+                    dim = self._model.get_sentence_embedding_dimension()
+                except Exception as e:
+                    logger.warning("Semantic model %s unavailable, using hashed vectors: %s", settings.SEMANTIC_MODEL, e)
+            self.index = SemanticIndex(dim, settings.SEMANTIC_MAX_ENTRIES)
+        return self._model
+
+    def vector(self, message: str) -> np.ndarray:
+        model = self._embedder()
+        text = idea_text(message)
+        if model is None:
+            return hashed_vector(text, self.index.dim)
+        return np.asarray(model.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+    async def embed(self, message: str) -> np.ndarray:
+        if self._embedder() is None:
+            return self.vector(message)
+        # Model inference is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self.vector, message)
+
+    def key(self, message: str) -> str:
+        """One vector per idea; a newer run of the same idea replaces the older one."""
+        raw = f"{self.model_name}\x1f{content_words(idea_text(message))}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def _sync(self, db):
+        """Load vectors other workers (or earlier processes) stored since the last sync."""
+        if self._synced_at is not None and time.monotonic() - self._synced_at < settings.SEMANTIC_REFRESH_SECONDS:
+            return
+        async with self._lock:
+            if self._synced_at is not None and time.monotonic() - self._synced_at < settings.SEMANTIC_REFRESH_SECONDS:
+                return
+            self._embedder()
+            query: Dict[str, Any] = {"model": self.model_name, "dim": self.index.dim}
+            if self._newest is not None:
+                query["created_at"] = {"$gt": self._newest}
+            docs = await db[COLLECTION].find(
+                query, {"vector": 1, "analysis_id": 1, "created_at": 1},
+                sort=[("created_at", -1)], limit=self.index.max_entries,
+            ).to_list(None)
+            for doc in reversed(docs):
+                self.index.add(doc["_id"], np.frombuffer(doc["vector"], dtype=np.float32), str(doc["analysis_id"]))
+            if docs:
+                self._newest = docs[0]["created_at"]
+            self._synced_at = time.monotonic()
+
+    async def lookup(self, db, message: str) -> Optional[SemanticMatch]:
+        """The stored blueprint or scores to use for `message`, or None to run the swarm."""
+        if not settings.SEMANTIC_ENABLED or db is None:
+            return None
+        try:
+            started = time.perf_counter()
+            await self._sync(db)
+            vector = await self.embed(message)
+            if len(self.index) >= THREADED_SEARCH_ENTRIES:
+                hit = await asyncio.to_thread(self.index.search, vector)
+            else:
+                hit = self.index.search(vector)
+            lookup_latency.observe(time.perf_counter() - started)
+            match = await self._resolve(db, message, hit) if hit else None
+        except Exception as e:
+            logger.warning("Semantic lookup failed: %s", e)
+            match = None
+        lookups.inc(match.action if match else MISS)
+        return match
+
+    async def _resolve(self, db, message: str, hit) -> Optional[SemanticMatch]:
+        ref, score = hit
+        if score < settings.SEMANTIC_SEED_THRESHOLD:
+            return None
+        previous = await db.analyses.find_one({"_id": ObjectId(ref)},
+                                              {"data": 1, "data_z": 1, "codec": 1, "analysis": 1, "sections": 1})
+        if not previous or not previous.get("analysis") or not previous.get("sections"):
+            return None
+        # The ideas matched; agents that read a wizard answer which differs still have to run
+        sections = split_sections(message)
+        rerun = affected_agents({**previous["sections"], IDEA_SECTION: ""}, {**sections, IDEA_SECTION: ""})
+        # Skipped agents are not seeded; the relevance gate decides again for the new request
+        scored = {name: entry for name, entry in previous["analysis"].items() if not is_not_applicable(entry)}
+        analysis = {name: entry for name, entry in scored.items() if name not in rerun and not is_degraded_entry(entry)}
+        if not analysis:
+            return None
+        blueprint = hydrate(previous).get("data") or {}
+        complete = len(analysis) == len(scored) and blueprint and not is_degraded_entry(blueprint)
+        if score >= settings.SEMANTIC_SERVE_THRESHOLD and complete:
+            return SemanticMatch(SERVE, score, ref, blueprint, previous["analysis"])
+        return SemanticMatch(SEED, score, ref, blueprint, analysis)
+
+    async def remember(self, db, message: str, analysis_id: Any, analysis: Dict[str, Any], blueprint: Dict[str, Any]):
+        """
+        Index a finished blueprint so later paraphrases can use it. Callers
+        skip runs that were served or seeded from a match, so scores never
+        drift along a chain of paraphrases. Degraded runs are not indexed.
+        """
+        if not settings.SEMANTIC_ENABLED or db is None or not analysis_id:
+            return
+        if is_degraded_entry(blueprint) or any(is_degraded_entry(entry) for entry in analysis.values()):
+            return
+        try:
+            vector = await self.embed(message)
+            key = self.key(message)
+            self.index.add(key, vector, str(analysis_id))
+            await db[COLLECTION].update_one({"_id": key}, {"$set": {
+                "vector": vector.tobytes(),
+                "model": self.model_name,
+                "dim": self.index.dim,
+                "analysis_id": analysis_id,
+                "created_at": datetime.datetime.utcnow(),
+            }}, upsert=True)
+        except Exception as e:
+            logger.warning("Semantic indexing failed: %s", e)
+
+
+semantic_cache = SemanticCache()
+
+
+def seeded_reuse(match: Optional[SemanticMatch], reuse: Dict[str, Any]) -> Dict[str, Any]:
+    """Reuse plan with a seed match's scores added; the thread's own carried-over scores win."""
+    if match is None:
+        return reuse
+    return {**match.analysis, **reuse}
+
+
+def _index_lines():
+    size = len(semantic_cache.index) if semantic_cache.index is not None else 0
+    return gauge_lines("semantic_cache_index_entries", "Ideas in the in-process semantic index", [({}, size)])
+
+
+registry.add_collector(_index_lines)
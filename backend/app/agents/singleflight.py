@@ -0,0 +1,189 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+A double-click or a client retry after a timeout sends the same blueprint
+(or discovery) request while the first one is still running. Without this
+layer both run the whole swarm. `SingleFlight.do` runs the work once per key
+and every concurrent caller awaits the same result:
+
+  in one worker     the first caller starts the work as a task; later callers
+                    await that task
+  across workers    the first worker inserts a lease document into the
+                    `inflight` collection and renews it while it runs;
+                    other workers poll it and take the result (or error)
+                    stored there when it finishes
+
+Callers await the task through `asyncio.shield`, so a client that disconnects
+stops waiting without cancelling the run for the others. The run always
+finishes and saves its record, so a retry arriving later still finds it. A
+lease whose worker died expires after SINGLEFLIGHT_LEASE_SECONDS and the next
+caller takes over. If Mongo is unavailable, coalescing is per worker only.
+Keys include the request's threadId; requests without one are never merged,
+since each is given a thread of its own.
+"""
+import asyncio
+import datetime
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+COLLECTION = "inflight"
+RUNNING, DONE, FAILED = "running", "done", "failed"
+
+requests = registry.counter("singleflight_requests_total",
+                            "Coalescable requests by role: leader (ran it), joined (same worker), remote (other worker)",
+                            ("kind", "role"))
+wait_time = registry.summary("singleflight_joined_wait_seconds", "Time a joining caller waited for the shared result",
+                             ("kind",))
+
+
+class SingleFlightError(RuntimeError):
+    """The shared run failed in another worker."""
+
+
+class SingleFlight:
+    def __init__(self, lease_seconds: float, poll_interval: float, result_seconds: float):
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.result_seconds = result_seconds
+        self.owner = uuid.uuid4().hex
+        self._flights: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, kind: str, key: str, fn: Callable[[], Awaitable[T]], db=None) -> T:
+        """Run `fn` once per (kind, key) across concurrent callers and return its result to each."""
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return await fn()
+        key = f"{kind}:{key}"
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lead(kind, key, fn, db))
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            # Shielded: a cancelled caller stops waiting, the run carries on for the others
+            return await asyncio.shield(task)
+        requests.inc(kind, "joined")
+        started = time.perf_counter()
+        try:
+            return await asyncio.shield(task)
+        finally:
+            wait_time.observe(time.perf_counter() - started, kind)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved even when every caller left, so it is not logged as unhandled
+
+    def _collection(self, db):
+        if db is None or not settings.SINGLEFLIGHT_MONGO_ENABLED:
+            return None
+        return db[COLLECTION]
+
+    async def _lead(self, kind: str, key: str, fn: Callable[[], Awaitable[T]], db) -> T:
+        collection = self._collection(db)
+        if collection is None:
+            requests.inc(kind, "leader")
+            return await fn()
+        try:
+            acquired = await self._acquire(collection, key)
+        except Exception as e:
+            logger.warning("Single-flight lease unavailable, running locally: %s", e)
+            requests.inc(kind, "leader")
+            return await fn()
+        if acquired:
+            requests.inc(kind, "leader")
+            return await self._run(collection, key, fn)
+        requests.inc(kind, "remote")
+        return await self._follow(kind, collection, key, fn)
+
+    async def _acquire(self, collection, key: str) -> bool:
+        now = datetime.datetime.utcnow()
+        lease = {
+            "owner": self.owner,
+            "status": RUNNING,
+            "lease_expires_at": now + datetime.timedelta(seconds=self.lease_seconds),
+            "expires_at": now + datetime.timedelta(seconds=self.lease_seconds),
+        }
+        try:
+            await collection.insert_one({"_id": key, **lease})
+            return True
+        except DuplicateKeyError:
+            pass
+        # Take over a lease whose worker died, or a finished run whose result window has passed
+        taken = await collection.find_one_and_update(
+            {"_id": key, "$or": [
+                {"status": RUNNING, "lease_expires_at": {"$lt": now}},
+                {"status": {"$ne": RUNNING}, "expires_at": {"$lt": now}},
+            ]},
+            {"$set": lease, "$unset": {"result": "", "error": ""}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return taken is not None
+
+    async def _run(self, collection, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        heartbeat = asyncio.create_task(self._renew(collection, key))
+        try:
+            result = await fn()
+        except BaseException as e:
+            heartbeat.cancel()
+            await self._settle(collection, key, {"status": FAILED, "error": str(e) or type(e).__name__}, 0)
+            raise
+        heartbeat.cancel()
+        await self._settle(collection, key, {"status": DONE, "result": result}, self.result_seconds)
+        return result
+
+    async def _renew(self, collection, key: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                now = datetime.datetime.utcnow()
+                expires = now + datetime.timedelta(seconds=self.lease_seconds)
+                await collection.update_one({"_id": key, "owner": self.owner},
+                                            {"$set": {"lease_expires_at": expires, "expires_at": expires}})
+            except Exception as e:
+                logger.warning("Single-flight lease renewal failed: %s", e)
+
+    async def _settle(self, collection, key: str, fields: Dict[str, Any], keep_seconds: float):
+        """Publish the outcome to remote followers; kept `keep_seconds` for late pollers."""
+        expires = datetime.datetime.utcnow() + datetime.timedelta(seconds=keep_seconds)
+        try:
+            await asyncio.shield(collection.update_one(
+                {"_id": key, "owner": self.owner}, {"$set": {**fields, "expires_at": expires}},
+            ))
+        except Exception as e:
+            logger.warning("Single-flight result not published: %s", e)
+
+    async def _follow(self, kind: str, collection, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Wait for another worker's run; take it over if its lease lapses."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            doc: Optional[Dict[str, Any]] = await collection.find_one({"_id": key})
+            if doc is not None and doc["status"] == DONE:
+                return doc["result"]
+            if doc is not None and doc["status"] == FAILED:
+                raise SingleFlightError(doc.get("error") or "shared run failed")
+            if doc is None or doc["lease_expires_at"] < datetime.datetime.utcnow():
+                if await self._acquire(collection, key):
+                    requests.inc(kind, "leader")
+                    return await self._run(collection, key, fn)
+
+
+single_flight = SingleFlight(
+    lease_seconds=settings.SINGLEFLIGHT_LEASE_SECONDS,
+    poll_interval=settings.SINGLEFLIGHT_POLL_INTERVAL,
+    result_seconds=settings.SINGLEFLIGHT_RESULT_SECONDS,
+)
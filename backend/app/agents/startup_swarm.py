@@ -1,9 +1,18 @@
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
+import threading
+from typing import Any, Dict, Optional
 from langgraph.graph import StateGraph, START, END
-from app.core.config import settings
 
 from app.agents.state import AgentState
+from app.agents.llm import get_discovery_llm, invoke_llm
+from app.agents.prompts import discovery_messages
+from app.agents.routing import model_for
+from app.agents.scheduler import Priority
+from app.agents.cache import cached_node, response_cache
+from app.agents.incremental import reusable_node
+from app.agents.relevance import relevance_node, selected_agents
+from app.agents.tracing import traced_node, node_span
+from app.agents.checkpoint import mongo_checkpointer
+from app.agents.budget import budgeted_node, budgeted_blueprint
 from app.agents.predictive.market_research import market_research_node
 from app.agents.predictive.competition_intel import competition_intel_node
 from app.agents.predictive.execution_risk import execution_risk_node
@@ -18,66 +27,92 @@ from app.agents.predictive.impact import impact_node
 from app.agents.predictive.supply_chain import supply_chain_node
 from app.agents.predictive.data_ai import data_ai_node
 from app.agents.predictive.blueprint import blueprint_node
+from app.agents.predictive.batched import batched_predictive_node
+from app.core.config import settings
+
+# Predictive agents, keyed by their graph node / analysis name
+PREDICTIVE_NODES = {
+    "market": market_research_node,
+    "competition": competition_intel_node,
+    "execution": execution_risk_node,
+    "pmf": pmf_node,
+    "tech": tech_feasibility_node,
+    "funding": funding_node,
+    "legal": legal_node,
+    "gtm": gtm_node,
+    "economics": economics_node,
+    "scalability": scalability_node,
+    "impact": impact_node,
+    "supply_chain": supply_chain_node,
+    "data_ai": data_ai_node,
+}
+
+SWARM_MODES = ("parallel", "batched")
+
+def create_startup_swarm(mode: str = "parallel", checkpointer=None):
+    """
+    parallel: the agents the relevance gate selects fan out from it and fan in to the blueprint.
+    batched:  one request carries the selected rubrics, split back into the same analysis keys.
+
+    With a checkpointer, runs need a `checkpoint_config` and resume after failures.
+    """
+    if mode not in SWARM_MODES:
+        raise ValueError(f"Unknown swarm mode: {mode}")
 
-def create_startup_swarm():
-    # Build the Graph
     builder = StateGraph(AgentState)
-    builder.add_node("market", market_research_node)
-    builder.add_node("competition", competition_intel_node)
-    builder.add_node("execution", execution_risk_node)
-    builder.add_node("pmf", pmf_node)
-    builder.add_node("tech", tech_feasibility_node)
-    builder.add_node("funding", funding_node)
-    builder.add_node("legal", legal_node)
-    builder.add_node("gtm", gtm_node)
-    builder.add_node("economics", economics_node)
-    builder.add_node("scalability", scalability_node)
-    builder.add_node("impact", impact_node)
-    builder.add_node("supply_chain", supply_chain_node)
-    builder.add_node("data_ai", data_ai_node)
-    builder.add_node("blueprint", blueprint_node)
+    builder.add_node("relevance", relevance_node)
+    builder.add_edge(START, "relevance")
+    if mode == "batched":
+        builder.add_node("predictive", traced_node("predictive", budgeted_node(
+            "predictive", cached_node("predictive", batched_predictive_node, depends_on_agents=True),
+            agents=PREDICTIVE_NODES,
+        )))
+        builder.add_edge("relevance", "predictive")
+        builder.add_edge("predictive", "blueprint")
+    else:
+        for name, node in PREDICTIVE_NODES.items():
+            builder.add_node(name, traced_node(name, reusable_node(name, budgeted_node(name, cached_node(name, node)))))
+            builder.add_edge(name, "blueprint")
+        builder.add_conditional_edges("relevance", selected_agents, list(PREDICTIVE_NODES))
 
-    builder.add_edge(START, "market")
-    builder.add_edge(START, "competition")
-    builder.add_edge(START, "execution")
-    builder.add_edge(START, "pmf")
-    builder.add_edge(START, "tech")
-    builder.add_edge(START, "funding")
-    builder.add_edge(START, "legal")
-    builder.add_edge(START, "gtm")
-    builder.add_edge(START, "economics")
-    builder.add_edge(START, "scalability")
-    builder.add_edge(START, "impact")
-    builder.add_edge(START, "supply_chain")
-    builder.add_edge(START, "data_ai")
-    
-    builder.add_edge("market", "blueprint")
-    builder.add_edge("competition", "blueprint")
-    builder.add_edge("execution", "blueprint")
-    builder.add_edge("pmf", "blueprint")
-    builder.add_edge("tech", "blueprint")
-    builder.add_edge("funding", "blueprint")
-    builder.add_edge("legal", "blueprint")
-    builder.add_edge("gtm", "blueprint")
-    builder.add_edge("economics", "blueprint")
-    builder.add_edge("scalability", "blueprint")
-    builder.add_edge("impact", "blueprint")
-    builder.add_edge("supply_chain", "blueprint")
-    builder.add_edge("data_ai", "blueprint")
-    
+    builder.add_node("blueprint", traced_node("blueprint", budgeted_blueprint(
+        cached_node("blueprint", blueprint_node, depends_on_analysis=True)
+    )))
     builder.add_edge("blueprint", END)
 
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
+
+def build_swarm_inputs(message: str, reuse: Optional[dict] = None) -> dict:
+    return {
+        "business_idea": message,
+        "messages": [],
+        "analysis": {},
+        "blueprint": {},
+        "reuse": reuse or {},
+    }
 
-# Singleton instance
-startup_agent = create_startup_swarm()
+# Singleton instances, compiled on first use (normally by app.agents.warmup during startup)
+_agents: Dict[str, Any] = {}
+_agents_lock = threading.Lock()  # warm-up compiles in a worker thread while requests may arrive
+
+def get_startup_agent(mode: Optional[str] = None):
+    mode = mode or settings.SWARM_MODE
+    if mode not in SWARM_MODES:
+        raise ValueError(f"Unknown swarm mode: {mode}")
+    with _agents_lock:
+        if mode not in _agents:
+            _agents[mode] = create_startup_swarm(mode, mongo_checkpointer if settings.CHECKPOINT_ENABLED else None)
+        return _agents[mode]
 
 # Simple chat function for the discovery phase
 async def get_discovery_insight(idea: str):
-    llm = ChatGroq(api_key=settings.GROQ_API_KEY, model="llama-3.3-70b-versatile", temperature=0.7)
-    prompt = [
-        SystemMessage(content="You are the Lead Startup Architect. Provide a strategic, founder-level 'First Impression' of this idea. Show that you understand the niche. Provide 2-3 'Architect Tips' specific to that domain. Be encouraging but realistic. Keep it concise (2 paragraphs)."),
-        HumanMessage(content=idea)
-    ]
-    response = await llm.ainvoke(prompt)
-    return response.content
+    async with node_span("discovery"):
+        cache_key = response_cache.make_key(idea, "discovery")
+        cached = await response_cache.get(cache_key, "discovery")
+        if cached is not None:
+            return cached
+
+        llm = get_discovery_llm(model_for("discovery"))
+        response = await invoke_llm(llm, discovery_messages(idea), priority=Priority.DISCOVERY, expected_completion_tokens=400)
+        await response_cache.set(cache_key, "discovery", response.content)
+        return response.content
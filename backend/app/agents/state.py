@@ -1,6 +1,5 @@
 from typing import List, Dict, Any, Annotated, TypedDict
 import operator
-from langchain_core.messages import BaseMessage
 
 # Reducer that deep-merges dicts so parallel nodes don't overwrite each other
 def merge_dicts(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
@@ -10,7 +9,9 @@ def merge_dicts(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]
 
 # Define the state for the graph
 class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], operator.add]
+    messages: Annotated[List[Any], operator.add]  # LangChain messages; typed loosely so `import app.main` skips langchain_core
     analysis: Annotated[Dict[str, Any], merge_dicts]  # reducer so parallel nodes merge, not overwrite
     business_idea: str
     blueprint: Dict[str, Any]
+    reuse: Dict[str, Any]  # analysis entries carried over from the thread's previous run (skipped agents)
+    agents: List[str]  # predictive agents the relevance gate selected for this run
@@ -0,0 +1,134 @@
+"""
+Schema-constrained LLM output.
+
+Replies are requested in JSON mode where possible, the first complete JSON
+object is cut out of the reply by balanced braces (so code fences or trailing
+prose do not matter), and the result is validated against a Pydantic model.
+A malformed reply gets exactly one repair round-trip - the model sees its own
+reply and the validation error - instead of a full regeneration or a silent
+canned fallback. Failure and repair rates are tracked per node.
+"""
+import json
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar
+
+from pydantic import ValidationError
+
+from app.agents.llm import invoke_llm
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+T = TypeVar("T")
+
+REPAIR_PROMPT = (
+    "Your previous reply could not be used: {error}\n"
+    "Reply with ONLY the corrected JSON object, matching the requested schema exactly."
+)
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+class SchemaMismatchError(StructuredOutputError):
+    """Well-formed JSON that fails validation (missing keys, out-of-range scores)."""
+
+
+def extract_json(text: str) -> Optional[str]:
+    """The first balanced top-level JSON object in `text` (braces inside strings are ignored), else None."""
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def parse_structured(content: str, validate: Callable[[Any], T]) -> T:
+    text = extract_json(content or "")
+    if text is None:
+        raise StructuredOutputError("no complete JSON object in the reply")
+    try:
+        return validate(json.loads(text))
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"invalid JSON: {e}") from e
+    except (ValidationError, KeyError, TypeError, ValueError) as e:
+        raise SchemaMismatchError(f"schema mismatch: {e}") from e
+
+
+class ParseStats:
+    COUNTERS = ("calls", "parse_failures", "repairs", "repaired", "fallbacks")
+
+    def __init__(self):
+        self._nodes: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.COUNTERS, 0))
+
+    def record(self, node: str, counter: str):
+        self._nodes[node][counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        nodes = {}
+        for node, counts in self._nodes.items():
+            calls = counts["calls"] or 1
+            nodes[node] = {
+                **counts,
+                "parse_failure_rate": round(counts["parse_failures"] / calls, 4),
+                "repair_success_rate": round(counts["repaired"] / counts["repairs"], 4) if counts["repairs"] else None,
+                "fallback_rate": round(counts["fallbacks"] / calls, 4),
+            }
+        return {"nodes": nodes}
+
+
+parse_stats = ParseStats()
+
+
+def json_mode(llm):
+    """Provider JSON mode; tagged so LangGraph's token streaming skips it."""
+    from langgraph.constants import TAG_NOSTREAM
+    return llm.bind(response_format={"type": "json_object"}).with_config(tags=[TAG_NOSTREAM])
+
+
+async def invoke_structured(node: str, llm, messages: List["BaseMessage"], validate: Callable[[Any], T],
+                            use_json_mode: bool = True, repair: bool = True, **invoke_kwargs) -> T:
+    """
+    Call the LLM and return `validate(parsed JSON)`, with one repair retry
+    (unless `repair` is off). Raises StructuredOutputError if the reply is
+    still unusable.
+    """
+    parse_stats.record(node, "calls")
+    response = await invoke_llm(json_mode(llm) if use_json_mode else llm, messages, **invoke_kwargs)
+    try:
+        return parse_structured(response.content, validate)
+    except StructuredOutputError as e:
+        parse_stats.record(node, "parse_failures")
+        if not repair:
+            raise
+        error = e
+
+    parse_stats.record(node, "repairs")
+    from langchain_core.messages import AIMessage, HumanMessage
+    repair_messages = [
+        *messages,
+        AIMessage(content=response.content),
+        HumanMessage(content=REPAIR_PROMPT.format(error=error)),
+    ]
+    repaired = await invoke_llm(json_mode(llm) if use_json_mode else llm, repair_messages, **invoke_kwargs)
+    result = parse_structured(repaired.content, validate)
+    parse_stats.record(node, "repaired")
+    return result
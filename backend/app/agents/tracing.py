@@ -0,0 +1,93 @@
+"""
+Per-node instrumentation for the swarm.
+
+Every node run (and every discovery call) gets a NodeRun in context; the LLM
+layer fills in queue time, tokens and retries underneath it. When the run
+ends it is recorded into the Prometheus registry and, optionally, into the
+`node_runs` Mongo collection tagged with the request's thread id.
+"""
+import asyncio
+import datetime
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+from app.agents.cache import is_degraded
+from app.core import db as db_module
+from app.core.config import settings
+from app.core.context import NodeRun, node_run_var, request_trace_var, thread_id_var
+from app.core.metrics import registry
+
+node_duration = registry.summary("swarm_node_duration_seconds", "Wall time of a node run", ("node",))
+node_queue = registry.summary("swarm_node_queue_seconds", "Time a node's LLM calls waited in the scheduler", ("node",))
+node_runs = registry.counter("swarm_node_runs_total", "Node runs by outcome", ("node", "outcome"))
+node_tokens = registry.counter("swarm_node_tokens_total", "LLM tokens used by a node", ("node", "kind"))
+node_retries = registry.counter("swarm_node_retries_total", "LLM call retries inside a node", ("node",))
+node_hedges = registry.counter("swarm_node_hedges_total", "Hedged duplicate LLM calls fired inside a node", ("node",))
+node_cost = registry.counter("swarm_node_cost_usd_total", "Estimated LLM spend of a node", ("node",))
+blueprint_cost = registry.summary("swarm_blueprint_cost_usd", "Estimated LLM spend of one full blueprint")
+blueprint_tokens = registry.summary("swarm_blueprint_tokens", "LLM tokens (prompt + completion) of one full blueprint")
+
+_pending_writes = set()
+
+
+def _record(run: NodeRun):
+    node_duration.observe(run.wall_seconds, run.node)
+    node_queue.observe(run.queue_seconds, run.node)
+    node_runs.inc(run.node, run.outcome)
+    node_tokens.inc(run.node, "prompt", amount=run.prompt_tokens)
+    node_tokens.inc(run.node, "completion", amount=run.completion_tokens)
+    node_retries.inc(run.node, amount=run.retries)
+    node_hedges.inc(run.node, amount=run.hedges)
+    node_cost.inc(run.node, amount=run.cost_usd)
+
+    trace = request_trace_var.get()
+    if trace is not None:
+        trace.runs.append(run)
+        if run.node == "blueprint":
+            blueprint_cost.observe(sum(r.cost_usd for r in trace.runs))
+            blueprint_tokens.observe(sum(r.prompt_tokens + r.completion_tokens for r in trace.runs))
+
+    if settings.METRICS_MONGO_ENABLED and db_module.db is not None:
+        doc = {**asdict(run), "thread_id": thread_id_var.get(),
+               "created_at": datetime.datetime.utcnow()}
+        task = asyncio.create_task(db_module.db.node_runs.insert_one(doc))
+        _pending_writes.add(task)
+        task.add_done_callback(_pending_writes.discard)
+
+
+@asynccontextmanager
+async def node_span(name: str):
+    """Scope one node run; code inside may set `run.outcome`."""
+    run = NodeRun(node=name)
+    token = node_run_var.set(run)
+    started = time.perf_counter()
+    try:
+        yield run
+    except BaseException:
+        run.outcome = "error"
+        raise
+    finally:
+        node_run_var.reset(token)
+        run.wall_seconds = time.perf_counter() - started
+        if run.outcome == "llm" and run.llm_calls == 0:
+            run.outcome = "cached"
+        _record(run)
+
+
+def traced_node(name: str, node):
+    """Wrap a graph node so each run is timed and accounted (outermost wrapper)."""
+    async def run_node(state):
+        async with node_span(name) as run:
+            update = await node(state)
+            entries = list((update.get("analysis") or {}).values()) + [update.get("blueprint") or {}]
+            if any(isinstance(e, dict) and e.get("status") == "missing" for e in entries):
+                run.outcome = "missing"
+            elif is_degraded(update):
+                run.outcome = "fallback"
+            elif name in (state.get("reuse") or {}):
+                run.outcome = "reused"
+        return update
+
+    run_node.__name__ = getattr(node, "__name__", name)
+    return run_node
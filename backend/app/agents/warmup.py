@@ -0,0 +1,104 @@
+"""
+Startup warm-up of the swarm layer.
+
+`import app.main` loads FastAPI, Motor and the agent modules the endpoints
+need, including the 13 predictive node modules (the registry lists them;
+they hold a rubric and a coroutine). It does not load langchain_core,
+langgraph or langchain_groq: the agent modules import them for type hints
+only or inside the functions that use them. These libraries are imported on
+first use, together with the graph module and the relevance, budget,
+checkpoint, blueprint and batched nodes. The two swarm graphs are compiled
+then too (`startup_swarm.get_startup_agent`). The lifespan starts `warmup` next to
+the Mongo connect, so that this first use happens in a worker thread while
+the event loop waits on the network, rather than inside the first request.
+
+WARMUP_MODE picks when requests are accepted:
+
+  startup      after the warm-up has finished (default)
+  background   right away; /api/v1/health reports "warm": false until done,
+               and a request that needs the swarm sooner waits for it
+  off          no warm-up; the first blueprint or discovery request loads
+               everything
+
+Under gunicorn (gunicorn.conf.py) the master calls `preload` before it
+forks. Each worker then starts with the swarm modules already imported and
+shares those pages with the master, so N workers do not pay the imports N
+times; their warm-up only compiles the graphs and creates the clients.
+
+`benchmarks/bench_startup.py` tracks the import-time profile and
+time-to-healthy.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import gauge_lines, registry
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    def __init__(self):
+        self.done = False
+        self.seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None  # lifespan start -> accepting requests
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> Optional[asyncio.Task]:
+        if settings.WARMUP_MODE == "off" or self._task is not None:
+            return self._task
+        self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def wait(self):
+        """Block until the warm-up is finished, when WARMUP_MODE asks for it."""
+        if settings.WARMUP_MODE == "startup" and self._task is not None:
+            await self._task
+
+    async def _run(self):
+        started = time.perf_counter()
+        try:
+            # Imports and graph compilation are CPU-bound; keep them off the event loop
+            await asyncio.to_thread(_warm)
+        except Exception as e:  # the first request retries whatever failed here
+            logger.warning("Warm-up failed, loading on first use: %s", e)
+            return
+        self.seconds = time.perf_counter() - started
+        self.done = True
+        logger.info("Swarm warmed up in %.2fs", self.seconds)
+
+
+def _warm():
+    from app.agents.llm import get_discovery_llm, get_structural_llm
+    from app.agents.routing import model_for
+    from app.agents.semantic import semantic_cache
+    from app.agents.startup_swarm import SWARM_MODES, get_startup_agent
+
+    for mode in SWARM_MODES:
+        get_startup_agent(mode)
+    # One client per routed model, plus LLM_MODEL for escalations
+    for model in {settings.LLM_MODEL, *(model_for(node) for node in settings.LLM_ROUTES)}:
+        get_structural_llm(model)
+    get_discovery_llm(model_for("discovery"))
+    if settings.SEMANTIC_ENABLED:
+        semantic_cache.vector("warm-up")  # loads SEMANTIC_MODEL when one is configured
+
+
+def preload():
+    """Import the swarm layer in a pre-fork master: no event loop, clients or threads are created."""
+    import app.agents.startup_swarm  # noqa: F401
+
+
+warmup = Warmup()
+
+
+def _warmup_lines():
+    return gauge_lines("app_warmup_seconds", "Time spent importing and compiling the swarm at startup",
+                       [({}, warmup.seconds)]) + \
+        gauge_lines("app_startup_seconds", "Lifespan startup time until requests were accepted",
+                    [({}, warmup.startup_seconds)])
+
+
+registry.add_collector(_warmup_lines)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.endpoints import health, ai
+from app.api.endpoints import health, ai, metrics
 
 router = APIRouter()
 
 router.include_router(health.router, prefix="/health", tags=["health"])
 router.include_router(ai.router, prefix="/ai", tags=["ai"])
+
+router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -1,92 +1,422 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-from app.agents.startup_swarm import startup_agent, get_discovery_insight
+from bson import ObjectId
+from typing import Callable, List, Optional, Tuple
+from app.agents.jobs import job_manager, dedupe_key, TERMINAL, DONE
+from app.agents.incremental import plan_reuse, record_fields
+from app.agents.predictive.registry import PREDICTIVE_AGENTS
+from app.agents.records import SCORES, hydrate, save, save_many
+from app.agents.semantic import semantic_cache, seeded_reuse, SERVE
+from app.agents.screening import ScreeningBatch
+from app.agents.singleflight import single_flight
+from app.core.config import settings
+from app.core.context import begin_request
 from app.core.db import get_database
+from app.core.write_behind import write_behind
+import asyncio
+import base64
+import logging
 import uuid
 import datetime
 import json
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
 class ChatRequest(BaseModel):
     message: str
     threadId: Optional[str] = None  # CamelCase to match frontend axios call
+    mode: Optional[str] = None  # swarm execution mode ("parallel" | "batched"); defaults to settings.SWARM_MODE
+    background: Optional[bool] = None  # queue blueprint as a job; defaults to settings.BLUEPRINT_BACKGROUND_DEFAULT
+
+
+class BatchRequest(BaseModel):
+    ideas: List[str]
+    threadId: Optional[str] = None
+    ideasPerCall: Optional[int] = None  # ideas packed into one request per agent; defaults to settings.SCREEN_IDEAS_PER_CALL
+
+
+def resolve_swarm(mode: Optional[str]):
+    # The swarm layer (langchain_core, langgraph, langchain_groq, the graph module) loads on first use,
+    # normally during startup warm-up (app.agents.warmup), not when this module is imported
+    from app.agents.startup_swarm import get_startup_agent, SWARM_MODES
+
+    if mode is not None and mode not in SWARM_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {list(SWARM_MODES)}")
+    return get_startup_agent(mode)
+
+
+def is_blueprint_request(message: str) -> bool:
+    text = message.lower()
+    return "blueprint" in text and "structured data" in text
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def job_view(job: dict) -> dict:
+    view = {"jobId": job["job_id"], "threadId": job["thread_id"], "status": job["status"]}
+    if job["status"] == DONE:
+        # Same shape as the synchronous /chat response so the client can reuse its parsing
+        view["response"] = json.dumps(job.get("data", {}))
+    if job.get("error"):
+        view["error"] = job["error"]
+    return view
+
+
+async def stream_swarm(swarm, inputs, config, emit: Callable[[str, dict], None]) -> Tuple[dict, dict]:
+    """Run the swarm, emitting `analysis` events as agents finish and `token` events for the blueprint."""
+    blueprint_data, analysis = {}, {}
+    if inputs is None:
+        # Resumed run: agents finished by the failed attempt are not re-emitted as updates
+        snapshot = await swarm.aget_state(config)
+        for agent, result in snapshot.values.get("analysis", {}).items():
+            analysis[agent] = result
+            emit("analysis", {"agent": agent, "result": result})
+    async for mode, chunk in swarm.astream(inputs, config, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "blueprint" and message.content:
+                emit("token", {"content": message.content})
+            continue
+
+        for node, update in chunk.items():
+            if node != "blueprint":
+                for agent, result in (update or {}).get("analysis", {}).items():
+                    analysis[agent] = result
+                    emit("analysis", {"agent": agent, "result": result})
+            elif node == "blueprint":
+                blueprint_data = (update or {}).get("blueprint", {})
+    return blueprint_data, analysis
+
+
+async def run_blueprint(db, swarm, thread_id: str, request: ChatRequest,
+                        emit: Optional[Callable[[str, dict], None]] = None) -> dict:
+    """
+    Run the swarm for a blueprint request and save the record; returns the
+    blueprint and the agents' analysis. With `emit` the swarm is streamed
+    (`stream_swarm`).
+    """
+    from app.agents.checkpoint import checkpoint_config, prepare_run, finish_run
+    from app.agents.startup_swarm import build_swarm_inputs
+
+    # Run the Agent Swarm, reusing agents whose inputs did not change since the thread's last run
+    reuse = await plan_reuse(db, request.threadId, request.message)
+    # A paraphrase of an earlier idea gets that blueprint back, or at least its scores
+    match = await semantic_cache.lookup(db, request.message)
+    if match is not None and match.action == SERVE:
+        blueprint_data, analysis, reuse = match.blueprint, match.analysis, match.analysis
+    else:
+        reuse = seeded_reuse(match, reuse)
+        # Resumes from the last checkpoint if this exact request failed part-way before
+        config = checkpoint_config(thread_id, request.message, request.mode)
+        inputs = await prepare_run(swarm, config, build_swarm_inputs(request.message, reuse))
+        if emit is None:
+            result = await swarm.ainvoke(inputs, config)
+            blueprint_data, analysis = result.get("blueprint", {}), result.get("analysis", {})
+        else:
+            blueprint_data, analysis = await stream_swarm(swarm, inputs, config, emit)
+
+    # Save to MongoDB → analyses collection (blueprint compressed) and analysis_scores
+    record = {
+        "thread_id": thread_id,
+        "type": "blueprint",
+        "data": blueprint_data,
+        **record_fields(request.message, {"analysis": analysis}, reuse),
+        "created_at": datetime.datetime.utcnow()
+    }
+    if match is not None:
+        record["semantic_match"] = match.record()
+    record_id = await save(db, record)
+    if match is None or match.action != SERVE:
+        await finish_run(swarm, config)
+    if match is None:
+        await semantic_cache.remember(db, request.message, record_id, analysis, blueprint_data)
+    return {"blueprint": blueprint_data, "analysis": analysis}
+
+
+async def run_discovery(db, thread_id: str, message: str) -> str:
+    from app.agents.startup_swarm import get_discovery_insight
+
+    insight = await get_discovery_insight(message)
+
+    # Save interaction to MongoDB → chats collection (write-behind, off the response path)
+    await write_behind.insert(db.chats, {
+        "thread_id": thread_id,
+        "role": "assistant",
+        "content": insight,
+        "created_at": datetime.datetime.utcnow()
+    })
+    return insight
 
 
 @router.post("/chat")
 async def handle_chat(request: ChatRequest, db = Depends(get_database)):
     """
     Main endpoint for the frontend. Handles Discovery (text) and Blueprint (JSON).
+
+    Identical requests (same threadId, idea and mode) that arrive while one is
+    running share its run and its saved record; see `app.agents.singleflight`.
+    Requests without a threadId are never merged.
     """
     try:
         thread_id = request.threadId or str(uuid.uuid4())
+        begin_request(thread_id)
+        # Keyed on the resolved thread: requests without a threadId each get their own, so never share a run
+        key = dedupe_key(thread_id, request.message, request.mode)
 
-        # Check if this is a blueprint request
-        is_blueprint_request = (
-            "blueprint" in request.message.lower()
-            and "structured data" in request.message.lower()
-        )
-
-        if is_blueprint_request:
-            # Run the full Agent Swarm
-            inputs = {
-                "business_idea": request.message,
-                "messages": [],
-                "analysis": {},
-                "blueprint": {},
-            }
-
-            result = await startup_agent.ainvoke(inputs)
-            blueprint_data = result.get("blueprint", {})
-
-            # Save to MongoDB → analyses collection
-            await db.analyses.insert_one({
-                "thread_id": thread_id,
-                "type": "blueprint",
-                "data": blueprint_data,
-                "created_at": datetime.datetime.utcnow()
-            })
+        if is_blueprint_request(request.message):
+            swarm = resolve_swarm(request.mode)
+            background = settings.BLUEPRINT_BACKGROUND_DEFAULT if request.background is None else request.background
+            if background:
+                # Queue the swarm run and return immediately; poll /jobs/{id} for the result
+                job = await job_manager.submit(thread_id, request.message, request.mode)
+                return JSONResponse(status_code=202, content=job_view(job))
 
+            result = await single_flight.do(
+                "blueprint", key, lambda: run_blueprint(db, swarm, thread_id, request), db,
+            )
             # The frontend expects the JSON as a string inside a 'response' field
-            return {"response": json.dumps(blueprint_data)}
+            return {"response": json.dumps(result["blueprint"])}
 
         else:
             # Discovery Phase
-            insight = await get_discovery_insight(request.message)
-
-            # Save interaction to MongoDB → chats collection
-            await db.chats.insert_one({
-                "thread_id": thread_id,
-                "role": "assistant",
-                "content": insight,
-                "created_at": datetime.datetime.utcnow()
-            })
-
+            insight = await single_flight.do("discovery", key, lambda: run_discovery(db, thread_id, request.message), db)
             return {"response": insight}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Chat Error: {e}")
+        logger.exception("Chat request failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def stream_chat(request: ChatRequest, db = Depends(get_database)):
+    """
+    Server-Sent Events variant of /chat. Blueprint requests emit one
+    `analysis` event per agent as soon as it finishes, then `token` events
+    while the blueprint is generated, then the final `blueprint` and `done`.
+    Discovery requests emit a single `message` event.
+
+    Identical blueprint streams share one run like /chat requests do (and
+    share it with /chat). The stream that started the run gets its events
+    as they happen; the others get every agent's `analysis` event once the
+    shared run finishes.
+    """
+    thread_id = request.threadId or str(uuid.uuid4())
+
+    async def events():
+        begin_request(thread_id)
+        flight = getter = None
+        try:
+            key = dedupe_key(thread_id, request.message, request.mode)
+            if not is_blueprint_request(request.message):
+                insight = await single_flight.do(
+                    "discovery", key, lambda: run_discovery(db, thread_id, request.message), db,
+                )
+                yield sse_event("message", {"threadId": thread_id, "response": insight})
+                yield sse_event("done", {"threadId": thread_id})
+                return
+
+            swarm = resolve_swarm(request.mode)
+            queue: asyncio.Queue = asyncio.Queue()
+            # Only the leading caller's `run_blueprint` runs, so only its queue ever fills
+            flight = asyncio.ensure_future(single_flight.do(
+                "blueprint", key,
+                lambda: run_blueprint(db, swarm, thread_id, request, lambda *event: queue.put_nowait(event)), db,
+            ))
+            sent = set()
+            while not flight.done() or not queue.empty():
+                if flight.done():
+                    event, data = queue.get_nowait()
+                else:
+                    getter = asyncio.ensure_future(queue.get())
+                    await asyncio.wait({getter, flight}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        continue
+                    event, data = getter.result()
+                if event == "analysis":
+                    sent.add(data["agent"])
+                yield sse_event(event, data)
+            result = flight.result()
+            for agent, analysis in result["analysis"].items():
+                if agent not in sent:
+                    yield sse_event("analysis", {"agent": agent, "result": analysis})
+            yield sse_event("blueprint", {"threadId": thread_id, "response": result["blueprint"]})
+            yield sse_event("done", {"threadId": thread_id})
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+        except Exception as e:
+            logger.exception("Stream request failed: %s", e)
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            # A client that disconnects stops waiting; the shared run carries on and saves its record
+            for task in (getter, flight):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+async def screen_batch(request: BatchRequest, db = Depends(get_database)):
+    """
+    Portfolio screening: predictive scores for many ideas, streamed as NDJSON.
+    One `result` line per submitted idea (duplicates repeat the first
+    occurrence's result) as soon as it is scored, then one `summary` line
+    with throughput. Records are queued for `analyses` together at the end.
+    """
+    ideas = [idea for idea in request.ideas if idea.strip()]
+    if not 0 < len(ideas) <= settings.SCREEN_MAX_IDEAS:
+        raise HTTPException(status_code=422, detail=f"ideas must hold 1-{settings.SCREEN_MAX_IDEAS} non-empty ideas")
+    per_call = request.ideasPerCall or settings.SCREEN_IDEAS_PER_CALL
+    if not 0 < per_call <= settings.SCREEN_MAX_IDEAS_PER_CALL:
+        raise HTTPException(status_code=422, detail=f"ideasPerCall must be 1-{settings.SCREEN_MAX_IDEAS_PER_CALL}")
+    thread_id = request.threadId or str(uuid.uuid4())
+    batch = ScreeningBatch(ideas, per_call, settings.SCREEN_CONCURRENCY)
+
+    async def lines():
+        begin_request(thread_id, budget=0)
+        records = []
+        try:
+            async for result in batch.run():
+                records.append({
+                    "thread_id": thread_id,
+                    "type": "screening",
+                    "batch_id": batch.batch_id,
+                    "idea": result["idea"],
+                    "analysis": result["analysis"],
+                    "overall_score": result["overallScore"],
+                    "created_at": datetime.datetime.utcnow(),
+                })
+                first, *duplicates = result.pop("indices")
+                yield json.dumps({"type": "result", "index": first, **result}, default=str) + "\n"
+                for index in duplicates:
+                    yield json.dumps({"type": "result", "index": index, "duplicateOf": first, **result}, default=str) + "\n"
+        except Exception as e:
+            logger.exception("Screening request failed: %s", e)
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            # Also runs when the client disconnects, so finished ideas are kept
+            if records:
+                await save_many(db, records)
+        yield json.dumps({"type": "summary", "threadId": thread_id, "saved": len(records), **batch.summary()}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/analyze")
 async def analyze_legacy(request: ChatRequest, db = Depends(get_database)):
     # Keeping this for backward compatibility
     return await handle_chat(request, db)
 
 
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str):
+    """SSE feed of a job's status; ends with the result once it is done or failed."""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current, last_status = job, None
+        while True:
+            if current is None:
+                yield sse_event("error", {"detail": "Job not found"})
+                return
+            if current["status"] != last_status:
+                last_status = current["status"]
+                yield sse_event("status", job_view(current))
+            if last_status in TERMINAL:
+                yield sse_event("done", {"jobId": job_id})
+                return
+            await asyncio.sleep(1.0)
+            # A status check (shared state when configured); the record is read again only when it changed
+            if await job_manager.status(job_id) != last_status:
+                current = await job_manager.get(job_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# List views only need enough to render a row; pass full=true for whole blueprint documents.
+# `overview` is the current layout, `data.businessOverview` that of records not yet migrated.
+HISTORY_SUMMARY_FIELDS = {
+    "thread_id": 1, "type": 1, "status": 1, "job_id": 1, "reused": 1,
+    "overview": 1, "data.businessOverview": 1, "idea": 1, "overall_score": 1, "created_at": 1,
+}
+
+
+def encode_cursor(record: dict) -> str:
+    raw = json.dumps({"t": record["created_at"].isoformat(), "id": str(record["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Query fragment for records strictly older than the cursor (created_at desc, _id desc)."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at, oid = datetime.datetime.fromisoformat(raw["t"]), ObjectId(raw["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": oid}},
+    ]}
+
+
 @router.get("/history/{thread_id}")
-async def get_analysis_history(thread_id: str, db = Depends(get_database)):
+async def get_analysis_history(
+    thread_id: str,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    before: Optional[str] = None,
+    full: bool = False,
+    db = Depends(get_database),
+):
+    """
+    Newest-first analyses of a thread. Pass the `X-Next-Cursor` response
+    header back as `before` to get the next page.
+    """
+    query = {"thread_id": thread_id, **(decode_cursor(before) if before else {})}
     try:
-        cursor = db.analyses.find({"thread_id": thread_id}).sort("created_at", -1).limit(10)
-        rows = await cursor.to_list(length=10)
+        cursor = db.analyses.find(query, None if full else HISTORY_SUMMARY_FIELDS) \
+            .sort([("created_at", -1), ("_id", -1)]).limit(limit + 1)
+        rows = await cursor.to_list(length=limit + 1)
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1])
 
         analyses = []
         for record in rows:
             record["id"] = str(record["_id"])
             del record["_id"]
+            if full:
+                hydrate(record)
+            elif "overview" in record:
+                record["data"] = {"businessOverview": record.pop("overview")}
             if isinstance(record.get("created_at"), datetime.datetime):
                 record["created_at"] = record["created_at"].isoformat()
             analyses.append(record)
@@ -94,3 +424,39 @@ async def get_analysis_history(thread_id: str, db = Depends(get_database)):
         return analyses
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/scores")
+async def query_scores(
+    agent: str,
+    min_score: float = Query(0, ge=0, le=100),
+    max_score: float = Query(100, ge=0, le=100),
+    kind: Optional[str] = Query(None, alias="type"),  # "blueprint" or "screening"
+    limit: int = Query(50, ge=1, le=500),
+    db = Depends(get_database),
+):
+    """
+    Records whose `agent` scored within [min_score, max_score], best first,
+    e.g. /scores?agent=pmf&min_score=80. Reads only the `analysis_scores`
+    rows; fetch a record itself with /history/{threadId}?full=true.
+    """
+    if agent not in PREDICTIVE_AGENTS:
+        raise HTTPException(status_code=422, detail=f"agent must be one of {list(PREDICTIVE_AGENTS)}")
+    query = {"agent": agent, "score": {"$gte": min_score, "$lte": max_score}}
+    if kind:
+        query["type"] = kind
+    try:
+        rows = await db[SCORES].find(query, {"agent": 0}).sort([("score", -1), ("_id", -1)]).limit(limit) \
+            .to_list(length=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return [{
+        "analysisId": str(row["analysis_id"]),
+        "threadId": row.get("thread_id"),
+        "type": row.get("type"),
+        "name": row.get("name"),
+        "score": row.get("score"),
+        "confidence": row.get("confidence"),
+        **({"status": row["status"]} if row.get("status") else {}),
+        "createdAt": row["created_at"].isoformat() if isinstance(row.get("created_at"), datetime.datetime) else None,
+    } for row in rows]
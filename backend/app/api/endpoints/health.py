@@ -1,7 +1,28 @@
+import os
+
 from fastapi import APIRouter
+from app.agents.cache import response_cache
+from app.agents.scheduler import llm_scheduler
+from app.agents.structured import parse_stats
+from app.agents.warmup import warmup
 
 router = APIRouter()
 
 @router.get("/")
 async def get_health():
-    return {"status": "ok", "message": "Service is healthy"}
+    return {"status": "ok", "message": "Service is healthy", "warm": warmup.done, "worker": os.getpid()}
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Hit/miss counters for the agent response cache, per node."""
+    return response_cache.stats()
+
+@router.get("/llm")
+async def get_llm_scheduler_stats():
+    """Queue depth, wait times and 429/retry counters of the LLM scheduler."""
+    return llm_scheduler.stats()
+
+@router.get("/parsing")
+async def get_parsing_stats():
+    """Per-node structured-output parse failure, repair and fallback rates."""
+    return parse_stats.stats()
@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.agents.cache import response_cache
+from app.agents.scheduler import llm_scheduler
+from app.agents.structured import parse_stats
+from app.agents import tracing  # noqa: F401  registers the per-node metrics
+from app.core.metrics import registry, gauge_lines
+
+router = APIRouter()
+
+
+def _cache_lines():
+    nodes = response_cache.stats()["nodes"]
+    samples = [
+        ({"node": node, "result": result}, count)
+        for node, counts in nodes.items() for result, count in counts.items()
+    ]
+    return gauge_lines("swarm_cache_lookups", "Response cache lookups per node and result", samples)
+
+
+def _scheduler_lines():
+    stats = llm_scheduler.stats()
+    lines = gauge_lines("llm_scheduler_queue_depth", "Calls waiting for admission", [({}, stats["queue_depth"])])
+    lines += gauge_lines("llm_scheduler_in_flight", "Calls currently running", [({}, stats["in_flight"])])
+    lines += gauge_lines("llm_scheduler_calls", "Scheduler call counters since start", [
+        ({"event": event}, stats[event]) for event in ("admitted", "completed", "failed", "retries", "rate_limited")
+    ])
+    return lines
+
+
+def _parsing_lines():
+    samples = [
+        ({"node": node, "event": event}, counts[event])
+        for node, counts in parse_stats.stats()["nodes"].items() for event in parse_stats.COUNTERS
+    ]
+    return gauge_lines("swarm_structured_output", "Structured-output parse counters per node", samples)
+
+
+registry.add_collector(_cache_lines)
+registry.add_collector(_scheduler_lines)
+registry.add_collector(_parsing_lines)
+
+
+@router.get("/", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint: per-node latency, queue time, tokens, cost and outcomes."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
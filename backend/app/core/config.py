@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -22,6 +22,140 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = ""
     TAVILY_API_KEY: Optional[str] = ""
     
+    # LLM (Groq)
+    LLM_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_BASE_URL: Optional[str] = None  # override to point at a local stub server
+    LLM_TIMEOUT: float = 60.0
+    # Shared HTTP pool: fan-out concurrency is bounded by sockets, not threads
+    LLM_MAX_CONNECTIONS: int = 64
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+    # Scheduler limits (0 disables a limit), per deployment with a shared SHARED_STATE_URL, else per
+    # worker. Defaults match Groq's free tier for 70b.
+    LLM_REQUESTS_PER_MINUTE: int = 30
+    LLM_TOKENS_PER_MINUTE: int = 12000
+    LLM_EXPECTED_COMPLETION_TOKENS: int = 200
+    LLM_MAX_RETRIES: int = 6
+    LLM_BACKOFF_BASE: float = 1.0
+    LLM_BACKOFF_MAX: float = 30.0
+    # Tiered routing: node -> "small" | "large" (or a model name); "default" covers unlisted nodes.
+    # A node on the small tier is retried on LLM_MODEL when its reply fails to parse, fails
+    # validation (e.g. an out-of-range score) or reports confidence below ESCALATION_MIN_CONFIDENCE.
+    LLM_SMALL_MODEL: str = "llama-3.1-8b-instant"
+    LLM_ROUTES: Dict[str, str] = {"default": "small", "blueprint": "large", "discovery": "large"}
+    ESCALATION_MIN_CONFIDENCE: float = 0.6
+    SWARM_MODE: str = "parallel"  # default execution mode: "parallel" (13 calls) or "batched" (1 call)
+    # Incremental re-analysis: agents whose wizard sections are unchanged reuse the thread's last scores
+    INCREMENTAL_ENABLED: bool = True
+    INCREMENTAL_SECTION_THRESHOLD: float = 0.97
+    # Relevance gating: "keywords" (local), "llm" (one small-model call) or "off" (all 13 agents run)
+    RELEVANCE_MODE: str = "keywords"
+    PROMPT_VERSION: str = "v4"  # bump when any agent prompt changes; part of every cache key
+    # LLM cassettes (app/agents/cassette.py): "record" Groq replies to LLM_CASSETTE_PATH, "replay" them
+    # offline, "auto" replays what is recorded and records the rest, "off". Replays take the recorded
+    # latency times LLM_CASSETTE_LATENCY_SCALE (1 = recorded speed, 0 = as fast as possible).
+    LLM_CASSETTE_MODE: str = "off"
+    LLM_CASSETTE_PATH: str = "cassettes/llm.jsonl"
+    LLM_CASSETTE_LATENCY_SCALE: float = 1.0
+
+    # Response cache (in-memory LRU + optional Mongo tier)
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 4096
+    CACHE_TTL_SECONDS: int = 24 * 3600
+    CACHE_MONGO_ENABLED: bool = False
+
+    # Cold start: import and compile the swarm during lifespan startup, next to the Mongo connect.
+    # "startup" waits for it before serving, "background" serves at once, "off" leaves it to the first request
+    WARMUP_MODE: str = "startup"
+
+    # Background blueprint jobs
+    BLUEPRINT_BACKGROUND_DEFAULT: bool = False  # /chat blueprint requests return a job id instead of blocking
+    JOB_RUN_IN_PROCESS: bool = True  # False when a separate `python -m app.agents.jobs` worker drains the queue
+    JOB_WORKERS: int = 4
+    JOB_LEASE_SECONDS: int = 600
+    JOB_POLL_INTERVAL: float = 2.0
+    JOB_SHUTDOWN_TIMEOUT: float = 25.0
+
+    # Single-flight: identical concurrent /chat requests share one run, across workers via a Mongo lease
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_MONGO_ENABLED: bool = True
+    SINGLEFLIGHT_LEASE_SECONDS: float = 30.0  # renewed every third of this while the run is alive
+    SINGLEFLIGHT_POLL_INTERVAL: float = 0.5
+    SINGLEFLIGHT_RESULT_SECONDS: float = 15.0  # how long a finished result is kept for late followers
+
+    # Write-behind persistence of chats/analyses: responses return before the insert; batched insert_many,
+    # spill file while Mongo is down. A hard kill loses at most the unflushed buffer (~one flush interval).
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_BATCH_SIZE: int = 100  # flush as soon as this many documents are queued
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 0.2  # ... or after this many seconds
+    WRITE_BEHIND_MAX_PENDING: int = 5000  # documents neither in Mongo nor on disk before requests wait
+    WRITE_BEHIND_PUT_TIMEOUT: float = 5.0  # how long a request waits for space before failing
+    WRITE_BEHIND_RETRIES: int = 3
+    WRITE_BEHIND_RETRY_BASE: float = 0.2
+    WRITE_BEHIND_SPILL_PATH: str = "write_behind_spill.jsonl"  # per-process files: <path>.<pid>
+    WRITE_BEHIND_SPILL_MAX_BYTES: int = 64 * 1024 * 1024
+    WRITE_BEHIND_SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Bulk portfolio screening (/ai/batch): ideas packed per agent request, requests in flight per batch
+    SCREEN_MAX_IDEAS: int = 500
+    SCREEN_IDEAS_PER_CALL: int = 5
+    SCREEN_MAX_IDEAS_PER_CALL: int = 20
+    SCREEN_CONCURRENCY: int = 16
+
+    # Instrumentation (/api/v1/metrics); prices are USD per million tokens for LLM_MODEL / LLM_SMALL_MODEL
+    LLM_INPUT_COST_PER_MTOK: float = 0.59
+    LLM_OUTPUT_COST_PER_MTOK: float = 0.79
+    LLM_SMALL_INPUT_COST_PER_MTOK: float = 0.05
+    LLM_SMALL_OUTPUT_COST_PER_MTOK: float = 0.08
+    METRICS_MONGO_ENABLED: bool = False  # also write every node run to the `node_runs` collection
+
+    # Logging (app/core/log.py): queued, written by a background thread; "json" (one object per line) or "text"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped (and counted), never waited for
+    # Per message template, at most LOG_SAMPLE_BURST records below ERROR per LOG_SAMPLE_WINDOW seconds (0: no sampling)
+    LOG_SAMPLE_BURST: int = 20
+    LOG_SAMPLE_WINDOW: float = 60.0
+
+    # Latency budgets per blueprint request (0 disables a limit). Predictive agents
+    # that miss their budget are reported as missing; the blueprint keeps a reserve.
+    SWARM_DEADLINE_SECONDS: float = 120.0
+    NODE_DEADLINE_SECONDS: float = 45.0
+    BLUEPRINT_RESERVE_SECONDS: float = 45.0
+
+    # Hedged predictive calls: re-issue a call still running after the node's
+    # HEDGE_PERCENTILE latency (never sooner than HEDGE_MIN_DELAY); first reply wins
+    HEDGE_ENABLED: bool = True
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_MIN_DELAY: float = 2.0
+    HEDGE_MIN_SAMPLES: int = 20
+
+    # Durable swarm checkpoints (resume an interrupted run instead of restarting it)
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_TTL_SECONDS: int = 24 * 3600  # abandoned checkpoints are removed after this
+
+    # Semantic near-duplicate cache: paraphrased blueprint requests reuse a prior run.
+    # Thresholds are cosine similarities for the default hashed vectors; retune them with SEMANTIC_MODEL.
+    SEMANTIC_ENABLED: bool = True
+    SEMANTIC_SERVE_THRESHOLD: float = 0.97  # serve the stored blueprint as-is
+    SEMANTIC_SEED_THRESHOLD: float = 0.85  # reuse the stored predictive scores, regenerate the blueprint
+    SEMANTIC_MODEL: str = ""  # e.g. "sentence-transformers/all-MiniLM-L6-v2" (needs sentence-transformers)
+    SEMANTIC_DIM: int = 512  # hashed vector size; a model sets its own
+    SEMANTIC_MAX_ENTRIES: int = 100_000
+    SEMANTIC_REFRESH_SECONDS: float = 30.0  # how often a worker picks up vectors stored by others
+
+    # analyses records (app/agents/records.py): blueprint narrative compressed ("zstd", "zlib" or "none"),
+    # per-agent scores as indexed rows in `analysis_scores`
+    BLUEPRINT_CODEC: str = "zstd"  # falls back to zlib without the zstandard package
+    BLUEPRINT_COMPRESS_LEVEL: int = 3  # zstd 1-22, zlib 1-9
+
+    # Multiple workers (app/core/shared.py): state every worker of a deployment shares - response cache
+    # tier, LLM rate-limit buckets, job status. "memory://" (per process), "sqlite:///path/state.db"
+    # (one host) or "redis://host:6379/0". WEB_CONCURRENCY is the worker count for `python -m app.main`.
+    SHARED_STATE_URL: str = "memory://"
+    SHARED_STATE_PREFIX: str = "swarm:"  # Redis key prefix
+    WEB_CONCURRENCY: int = 1
+
     # Database (MongoDB via Motor)
     MONGO_URI: str = "mongodb://localhost:27017/startup_swarm"
 
@@ -0,0 +1,69 @@
+"""
+Per-request and per-node context carried through contextvars.
+
+LangGraph runs each node in a task that copies the caller's context, so a
+value set in the request handler (the thread id, the request's trace) is
+visible inside every node, and a value set inside a node (its NodeRun) is
+visible to the LLM layer underneath it without threading arguments through.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class NodeRun:
+    """Accounting for one node execution, filled in by the LLM layer."""
+    node: str
+    outcome: str = "llm"  # llm | cached | reused | fallback | missing | error
+    wall_seconds: float = 0.0
+    llm_calls: int = 0
+    retries: int = 0
+    hedges: int = 0
+    queue_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0  # priced per model, so routed and escalated calls add up correctly
+    model: str = ""  # model of the last LLM call (the large one after an escalation)
+    escalations: int = 0
+
+
+@dataclass
+class RequestTrace:
+    """All node runs of one swarm invocation."""
+    thread_id: Optional[str]
+    runs: List[NodeRun] = field(default_factory=list)
+
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)  # set by RequestContextMiddleware
+thread_id_var: ContextVar[Optional[str]] = ContextVar("thread_id", default=None)
+request_trace_var: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+node_run_var: ContextVar[Optional[NodeRun]] = ContextVar("node_run", default=None)
+deadline_var: ContextVar[Optional[float]] = ContextVar("deadline", default=None)  # time.monotonic() value
+
+
+def begin_request(thread_id: Optional[str], budget: Optional[float] = None) -> RequestTrace:
+    """
+    Tag everything that runs from here on (in this task and its children) with
+    `thread_id`, and start the request's latency budget (SWARM_DEADLINE_SECONDS
+    unless given; 0 means none).
+    """
+    trace = RequestTrace(thread_id=thread_id)
+    thread_id_var.set(thread_id)
+    request_trace_var.set(trace)
+    budget = settings.SWARM_DEADLINE_SECONDS if budget is None else budget
+    deadline_var.set(time.monotonic() + budget if budget else None)
+    return trace
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the request deadline, or None without one."""
+    deadline = deadline_var.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def current_node_run() -> Optional[NodeRun]:
+    return node_run_var.get()
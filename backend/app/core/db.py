@@ -1,6 +1,9 @@
+import logging
 import motor.motor_asyncio
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 client = None
 db = None
 
@@ -14,15 +17,41 @@ async def connect_to_db():
     # Send a ping to confirm a successful connection
     try:
         await client.admin.command('ping')
-        print(f"Connected to MongoDB: {uri}")
+        logger.info("Connected to MongoDB: %s", uri)
     except Exception as e:
-        print(f"Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB: %s", e)
+
+# (collection, keys, options) created at startup; create_index is a no-op when it already exists
+INDEXES = [
+    # History listing and incremental lookups: equality on thread, newest first, _id as tie-breaker
+    ("analyses", [("thread_id", 1), ("created_at", -1), ("_id", -1)], {"name": "thread_created"}),
+    # Per-agent score rows: range queries by agent and score, and the rows of one record
+    ("analysis_scores", [("agent", 1), ("score", -1), ("_id", -1)], {"name": "agent_score"}),
+    ("analysis_scores", [("analysis_id", 1)], {"name": "analysis"}),
+    ("chats", [("thread_id", 1), ("created_at", -1), ("_id", -1)], {"name": "thread_created"}),
+    # Swarm checkpoints: latest-first lookup per run, TTL for runs that never finished
+    ("checkpoints", [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)], {"name": "run_checkpoint", "unique": True}),
+    ("checkpoints", [("created_at", 1)], {"name": "ttl", "expireAfterSeconds": settings.CHECKPOINT_TTL_SECONDS}),
+    ("checkpoint_writes", [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", 1), ("task_id", 1), ("idx", 1)],
+     {"name": "run_write", "unique": True}),
+    ("checkpoint_writes", [("created_at", 1)], {"name": "ttl", "expireAfterSeconds": settings.CHECKPOINT_TTL_SECONDS}),
+    # Single-flight leases: finished or abandoned entries expire
+    ("inflight", [("expires_at", 1)], {"name": "ttl", "expireAfterSeconds": 0}),
+    # Semantic cache: workers load vectors newer than their last sync
+    ("idea_vectors", [("model", 1), ("dim", 1), ("created_at", -1)], {"name": "model_created"}),
+]
+
+async def ensure_indexes(database=None):
+    database = database if database is not None else db
+    for collection, keys, options in INDEXES:
+        await database[collection].create_index(keys, **options)
+    logger.info("Ensured %d MongoDB indexes.", len(INDEXES))
 
 async def close_db_connection():
     global client
     if client:
         client.close()
-    print("Closed MongoDB connection.")
+    logger.info("Closed MongoDB connection.")
 
 async def get_database():
     """FastAPI dependency — yields the async MongoDB database object."""
@@ -0,0 +1,204 @@
+"""
+Structured logging that never writes to stdout from the event loop.
+
+Modules log through `logging.getLogger(__name__)` (the `app.*` tree).
+`configure_logging` puts one handler on the `app` logger, and that handler
+only enqueues. When a record is created, still in the request's task, the
+handler captures the message, any traceback and the request context:
+
+  request_id   X-Request-ID, or generated per HTTP request (RequestContextMiddleware);
+               the job id for background blueprint jobs
+  thread_id    set by `begin_request`
+  node         the LangGraph node running, from its NodeRun
+
+LangGraph nodes run in tasks that copy the caller's context, so records
+logged inside a node carry the id of the request that started it. A
+listener thread formats the records (one JSON object per line with
+LOG_FORMAT=json, else plain text) and writes them to stdout. A slow or
+blocked stdout therefore stalls that thread, not the event loop, and
+concurrent swarms no longer interleave partial lines.
+
+The queue holds at most LOG_QUEUE_SIZE records. When it is full, new
+records are dropped and counted (`log_records_dropped_total{reason=
+"queue_full"}`); a request never waits for the log. Records below ERROR
+are sampled per message template: at most LOG_SAMPLE_BURST per
+LOG_SAMPLE_WINDOW seconds, so a fallback that fires on every request
+cannot flood the log. The rest are counted (`reason="sampled"`), and the
+first record of the next window reports how many were suppressed. Log with
+%-style arguments, not f-strings, so that repeats share one template.
+
+`benchmarks/bench_logging.py` measures the overhead against print().
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from app.core.config import settings
+from app.core.context import node_run_var, request_id_var, thread_id_var
+from app.core.metrics import gauge_lines, registry
+
+dropped = registry.counter("log_records_dropped_total", "Log records not written, by reason (queue_full, sampled)",
+                           ("reason",))
+
+
+def log_context() -> Dict[str, Any]:
+    context = {}
+    request_id, thread_id, run = request_id_var.get(), thread_id_var.get(), node_run_var.get()
+    if request_id is not None:
+        context["request_id"] = request_id
+    if thread_id is not None:
+        context["thread_id"] = thread_id
+    if run is not None:
+        context["node"] = run.node
+    return context
+
+
+class JsonFormatter(logging.Formatter):
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = " ".join(f"{k}={v}" for k, v in getattr(record, "context", {}).items())
+        if getattr(record, "suppressed", 0):
+            context += f" suppressed={record.suppressed}"
+        return f"{line} [{context.strip()}]" if context.strip() else line
+
+
+class Sampler(logging.Filter):
+    """Pass at most `burst` records per (logger, template) per `window` seconds below ERROR."""
+
+    def __init__(self, burst: int, window: float):
+        super().__init__()
+        self.burst, self.window = burst, window
+        self._windows: Dict[Tuple[str, str], list] = {}  # key -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key, now = (record.name, str(record.msg)), time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                if state is not None and state[2]:
+                    record.suppressed = state[2]
+                state = self._windows[key] = [now, 0, 0]
+            if state[1] >= self.burst:
+                state[2] += 1
+                dropped.inc("sampled")
+                return False
+            state[1] += 1
+        return True
+
+
+class ContextQueueHandler(QueueHandler):
+    """Enqueue without blocking; the record carries its message, traceback and request context."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        prepared = logging.makeLogRecord(record.__dict__)
+        prepared.msg, prepared.message, prepared.args = message, message, None
+        prepared.exc_info, prepared.exc_text, prepared.stack_info = None, exc_text, None
+        prepared.context = log_context()
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped.inc("queue_full")
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel, timeout=5)  # behind what is queued, even when the queue is full
+
+
+_listener: Optional[QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+
+def configure_logging(stream: Optional[TextIO] = None, level: Optional[str] = None):
+    """Route the `app` loggers through the queue to `stream` (stdout). Safe to call more than once."""
+    global _listener, _queue
+    if _listener is not None:
+        return
+    logger = logging.getLogger("app")
+    logger.setLevel((level or settings.LOG_LEVEL).upper())
+    logger.propagate = False  # uvicorn and library loggers keep their own handlers
+    _queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    handler = ContextQueueHandler(_queue)
+    handler.addFilter(Sampler(settings.LOG_SAMPLE_BURST, settings.LOG_SAMPLE_WINDOW))
+    logger.handlers = [handler]
+    _listener = _Listener(_queue, writer)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out what is queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logging.getLogger("app").handlers = []
+
+
+class RequestContextMiddleware:
+    """ASGI middleware: a request id per HTTP request (X-Request-ID if sent), echoed in the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-request-id"),
+                          None) or uuid.uuid4().hex[:16]
+        request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+def _log_lines():
+    return gauge_lines("log_queue_depth", "Log records waiting for the writer thread",
+                       [({}, _queue.qsize() if _queue is not None else 0)])
+
+
+registry.add_collector(_log_lines)
@@ -0,0 +1,130 @@
+"""
+Minimal in-process Prometheus registry (text exposition format 0.0.4).
+
+Counters and summaries are keyed by label values. Summaries keep a sliding
+window of recent observations so `/metrics` can report real p50/p95/p99
+without a client library. Collectors let other modules (cache, scheduler,
+parsing) publish their own counters as gauges at scrape time.
+"""
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Tuple
+
+LabelValues = Tuple[str, ...]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def total(self) -> float:
+        """Sum over all label values."""
+        with self._lock:
+            return sum(self._values.values())
+
+    def values(self) -> Dict[LabelValues, float]:
+        """Snapshot of the count per label values."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Summary:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), window: int = 2048):
+        self.name, self.help, self.labels, self.window = name, help, labels, window
+        self._samples: Dict[LabelValues, Deque[float]] = {}
+        self._totals: Dict[LabelValues, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            self._samples.setdefault(label_values, deque(maxlen=self.window)).append(value)
+            total, count = self._totals.get(label_values, (0.0, 0))
+            self._totals[label_values] = (total + value, count + 1)
+
+    def quantiles(self, *label_values: str) -> Dict[float, float]:
+        with self._lock:
+            ordered = sorted(self._samples.get(label_values, ()))
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} summary"]
+        with self._lock:
+            keys = sorted(self._totals)
+        for values in keys:
+            for q, value in self.quantiles(*values).items():
+                quantile = f'quantile="{q}"'
+                lines.append(f"{self.name}{_format_labels(self.labels, values, quantile)} {value}")
+            total, count = self._totals[values]
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[object] = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def summary(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Summary:
+        metric = Summary(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]):
+        """`collector()` returns ready-made exposition lines, evaluated at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f"# collector error: {e}")
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {float(value)}")
+    return lines
+
+
+registry = Registry()
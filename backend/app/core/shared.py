@@ -0,0 +1,231 @@
+"""
+State shared by the workers of one deployment.
+
+Every uvicorn/gunicorn worker is its own process. Without this module, each
+worker has its own response cache. It also has its own LLM rate-limit
+buckets, so N workers send up to N times LLM_REQUESTS_PER_MINUTE. And it
+can only learn a job's status by polling Mongo. SHARED_STATE_URL picks a
+backend that all workers of a deployment point at:
+
+  memory://                  per process (default): one worker, tests, benchmarks
+  sqlite:///path/state.db    the workers of one host, through a SQLite file in WAL mode
+  redis://host:6379/0        any number of hosts, over the Redis protocol; a fakeredis
+                             TCP server works as a local stand-in
+
+It holds two kinds of state:
+
+  entries   JSON values with a TTL. The response cache's shared tier
+            (`cache:<key>`) and job statuses (`job:<id>`) live here.
+  buckets   token buckets refilled at `per_minute / 60` per second. `take`
+            admits a call only if every named bucket can pay, and it is
+            atomic in each backend: SQLite uses BEGIN IMMEDIATE, Redis uses
+            WATCH/MULTI. The LLM scheduler's RPM and TPM limits are
+            therefore enforced for the whole deployment.
+
+Bucket refills use wall-clock time, so hosts sharing a Redis need synced
+clocks (NTP). A backend error is raised to the caller. The cache treats it
+as a miss; the scheduler and jobs fall back to process-local state.
+`benchmarks/bench_workers.py` runs 1..N workers against each backend.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# bucket name -> (amount, per_minute)
+Costs = Dict[str, Tuple[float, float]]
+
+
+def _refill(level: Optional[float], updated: Optional[float], per_minute: float, now: float) -> float:
+    if level is None:
+        return float(per_minute)
+    return min(float(per_minute), level + (now - updated) * per_minute / 60.0)
+
+
+def _settle(levels: Dict[str, float], costs: Costs, force: bool) -> Tuple[float, Dict[str, float]]:
+    """Seconds to wait (0 = admitted) and the levels after taking `costs`."""
+    if not force:
+        waits = [(min(amount, per_minute) - levels[name]) / (per_minute / 60.0)
+                 for name, (amount, per_minute) in costs.items() if levels[name] < min(amount, per_minute)]
+        if waits:
+            return max(waits), levels
+    return 0.0, {name: min(float(per_minute), levels[name] - min(amount, per_minute))
+                 for name, (amount, per_minute) in costs.items()}
+
+
+class MemoryState:
+    """Process-local backend: the behaviour of a single worker."""
+
+    shared = False
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            self._entries.pop(key, None)
+            return None
+        return json.loads(entry[1])
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.time() + ttl, json.dumps(value, default=str))
+
+    async def take(self, costs: Costs, force: bool = False) -> float:
+        now = time.time()
+        levels = {name: _refill(*self._buckets.get(name, (None, None)), per_minute, now)
+                  for name, (_, per_minute) in costs.items()}
+        wait, levels = _settle(levels, costs, force)
+        if not wait:
+            self._buckets.update({name: (level, now) for name, level in levels.items()})
+        return wait
+
+    async def close(self):
+        pass
+
+
+class SqliteState:
+    """One host: every worker opens the same SQLite file; calls run in a thread, off the event loop."""
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # one connection per process, used from the default executor
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: durable across process crashes
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL, updated REAL)")
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection().execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                         (key, json.dumps(value, default=str), time.time() + ttl))
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+    def _take(self, costs: Costs, force: bool) -> float:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")  # takes the write lock: no other worker reads stale levels
+            try:
+                now = time.time()
+                levels = {}
+                for name, (_, per_minute) in costs.items():
+                    row = conn.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+                    levels[name] = _refill(*(row or (None, None)), per_minute, now)
+                wait, levels = _settle(levels, costs, force)
+                if not wait:
+                    conn.executemany("INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)",
+                                     [(name, level, now) for name, level in levels.items()])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def take(self, costs: Costs, force: bool = False) -> float:
+        return await asyncio.to_thread(self._take, costs, force)
+
+    async def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class RedisState:
+    """Redis protocol (redis-py's asyncio client); buckets are hashes updated in WATCH/MULTI transactions."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str):
+        import redis.asyncio as redis  # only needed for this backend
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._watch_error = redis.WatchError
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self._redis.set(self.prefix + key, json.dumps(value, default=str), px=max(1, int(ttl * 1000)))
+
+    async def take(self, costs: Costs, force: bool = False) -> float:
+        keys = {name: f"{self.prefix}bucket:{name}" for name in costs}
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(*keys.values())
+                    now = time.time()
+                    levels = {}
+                    for name, key in keys.items():
+                        level, updated = await pipe.hmget(key, "level", "updated")
+                        levels[name] = _refill(float(level) if level is not None else None,
+                                               float(updated) if updated is not None else None, costs[name][1], now)
+                    wait, levels = _settle(levels, costs, force)
+                    if wait:
+                        await pipe.unwatch()
+                        return wait
+                    pipe.multi()
+                    for name, level in levels.items():
+                        pipe.hset(keys[name], mapping={"level": level, "updated": now})
+                        pipe.expire(keys[name], 3600)  # idle buckets are full again after a minute anyway
+                    await pipe.execute()
+                    return 0.0
+                except self._watch_error:  # another worker took from the bucket first; read it again
+                    continue
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_state(url: str):
+    parsed = urlparse(url or "memory://")
+    if parsed.scheme == "memory":
+        return MemoryState()
+    if parsed.scheme == "sqlite":
+        return SqliteState(url[len("sqlite:///"):] if url.startswith("sqlite:///") else parsed.path)
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisState(url, settings.SHARED_STATE_PREFIX)
+    raise ValueError(f"Unsupported SHARED_STATE_URL {url!r}; use memory://, sqlite:///path or redis://host:port/db")
+
+
+shared_state = create_state(settings.SHARED_STATE_URL)
@@ -0,0 +1,338 @@
+"""
+Write-behind buffer for the request path's inserts (`chats`, `analyses`).
+
+A handler hands its document to `write_behind.insert` and returns; the
+document gets its `_id` up front, so the caller can still reference it. A
+background flusher coalesces queued documents into one `insert_many` per
+collection whenever WRITE_BEHIND_BATCH_SIZE documents are waiting or
+WRITE_BEHIND_FLUSH_INTERVAL has passed.
+
+When Mongo fails, a batch is retried WRITE_BEHIND_RETRIES times with backoff,
+then appended to a per-process spill file (JSON lines, at most
+WRITE_BEHIND_SPILL_MAX_BYTES). While Mongo is down, later batches are spilled
+straight away. Every flush cycle tries to replay the spill file; replays are
+idempotent because the ids were fixed before the first attempt. At startup,
+spill files left by dead processes are replayed too.
+
+Backpressure: at most WRITE_BEHIND_MAX_PENDING documents may be neither in
+Mongo nor on disk. When that is reached (Mongo down and the spill file full),
+`insert` waits up to WRITE_BEHIND_PUT_TIMEOUT and then raises
+WriteBehindFull, so the request fails as it did before this buffer.
+
+Lost-write window: a response can be sent before its document is durable.
+  - Graceful shutdown flushes to Mongo, or to the spill file if Mongo is
+    down. Nothing is lost unless the spill file is full.
+  - A crash (SIGKILL, OOM) loses the documents still in memory. Normally
+    that is at most one flush interval of writes. While Mongo is down and
+    the spill file is full, it can be up to WRITE_BEHIND_MAX_PENDING.
+  - Reads are not read-your-writes. For up to one flush interval, a new
+    record is not yet visible to history, incremental reuse or the
+    semantic cache.
+`benchmarks/verify_write_behind.py` checks each of these cases.
+
+Without a running buffer (no `start`, or WRITE_BEHIND_ENABLED=false),
+`insert` writes directly.
+"""
+import asyncio
+import glob
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.core.config import settings
+from app.core.metrics import gauge_lines, registry
+
+logger = logging.getLogger(__name__)
+
+batches = registry.counter("write_behind_batches_total", "Write-behind batches by outcome", ("result",))
+documents = registry.counter("write_behind_documents_total", "Write-behind documents by outcome", ("result",))
+batch_sizes = registry.summary("write_behind_batch_size", "Documents per insert_many")
+put_wait = registry.summary("write_behind_put_wait_seconds", "Time a request waited for buffer space")
+
+
+class WriteBehindFull(RuntimeError):
+    """No buffer space: Mongo is unavailable and the spill file is full."""
+
+
+class WriteBehind:
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int, put_timeout: float,
+                 retries: int, spill_path: str, spill_max_bytes: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self.spill_path = spill_path
+        self.spill_max_bytes = spill_max_bytes
+        self._database = None
+        self._queue: Deque[Tuple[Any, Dict[str, Any]]] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._healthy = True
+        self._file_lock = threading.Lock()  # spill file I/O runs in threads; appends must not interleave a rewrite
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    @property
+    def own_spill(self) -> str:
+        return f"{self.spill_path}.{os.getpid()}"
+
+    def spill_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.own_spill)
+        except OSError:
+            return 0
+
+    # -- producer side -----------------------------------------------------
+
+    async def insert(self, collection, document: Dict[str, Any]) -> ObjectId:
+        """Queue `document` for `collection`; returns its `_id` at once."""
+        document.setdefault("_id", ObjectId())
+        if not self.running:
+            await collection.insert_one(document)
+            return document["_id"]
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.put_timeout)
+        except asyncio.TimeoutError:
+            documents.inc("rejected")
+            raise WriteBehindFull(f"{self.max_pending} writes pending and Mongo unavailable") from None
+        put_wait.observe(time.perf_counter() - started)
+        self._queue.append((collection, document))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return document["_id"]
+
+    async def insert_many(self, collection, docs: List[Dict[str, Any]]) -> List[ObjectId]:
+        if not self.running:
+            for doc in docs:
+                doc.setdefault("_id", ObjectId())
+            await collection.insert_many(docs, ordered=False)
+            return [doc["_id"] for doc in docs]
+        return [await self.insert(collection, doc) for doc in docs]
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self, database):
+        if not settings.WRITE_BEHIND_ENABLED or database is None or self.running:
+            return
+        self._database = database
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._claim_orphans)
+        self._flusher = asyncio.create_task(self._run())
+
+    async def shutdown(self, timeout: float):
+        """Stop the flusher and write out everything queued: to Mongo, else to the spill file."""
+        if not self.running:
+            return
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._queue:
+            # Out of time: put the rest on disk without another round trip
+            self._healthy = False
+            await self._drain()
+        if self._queue:
+            documents.inc("lost", amount=len(self._queue))
+            logger.error("Write-behind shutdown lost %d documents (Mongo down, spill file full)", len(self._queue))
+        self._flusher = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._replay()
+                await self._drain()
+            except Exception as e:  # the flusher must outlive any one bad cycle
+                logger.exception("Write-behind flush failed: %s", e)
+
+    # -- consumer side -----------------------------------------------------
+
+    async def _drain(self):
+        while self._queue:
+            count = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(count)]
+            groups: Dict[int, Tuple[Any, List[Dict[str, Any]]]] = {}
+            for collection, document in batch:
+                groups.setdefault(id(collection), (collection, []))[1].append(document)
+            todo = list(groups.values())
+            kept: List[Tuple[Any, Dict[str, Any]]] = []
+            try:
+                while todo:
+                    collection, docs = todo[0]
+                    if await self._write(collection, docs) or await self._spill(collection.name, docs):
+                        for _ in docs:
+                            self._slots.release()
+                    else:
+                        kept.extend((collection, doc) for doc in docs)
+                    todo.pop(0)
+            finally:
+                # Mongo down and no disk room (or cancelled mid-batch): back to the front of the queue;
+                # producers block on the semaphore meanwhile
+                leftover = kept + [(collection, doc) for collection, docs in todo for doc in docs]
+                self._queue.extendleft(reversed(leftover))
+            if kept:
+                return
+
+    async def _write(self, collection, docs: List[Dict[str, Any]], attempts: Optional[int] = None) -> bool:
+        # While Mongo is down a batch gets one attempt (a probe) before it is spilled
+        attempts = attempts or (self.retries + 1 if self._healthy else 1)
+        for attempt in range(attempts):
+            if attempt:
+                await asyncio.sleep(min(settings.WRITE_BEHIND_RETRY_BASE * 2 ** (attempt - 1), 5.0))
+            try:
+                await collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                # Documents that did land on an earlier attempt come back as duplicates
+                rejected = [err for err in errors if err.get("code") != 11000]
+                if rejected:
+                    documents.inc("rejected", amount=len(rejected))
+                    logger.error("Write-behind dropped %d documents Mongo rejected: %s", len(rejected), rejected[0].get("errmsg"))
+            except PyMongoError as e:
+                batches.inc("retry")
+                if attempt == attempts - 1 and self._healthy:  # once per outage, not per probe
+                    logger.warning("Write-behind insert into %s failed, spilling to disk: %s", collection.name, e)
+                continue
+            if not self._healthy:
+                logger.info("Write-behind writing to %s again", collection.name)
+            self._healthy = True
+            batches.inc("ok")
+            batch_sizes.observe(len(docs))
+            documents.inc("written", amount=len(docs))
+            return True
+        self._healthy = False
+        return False
+
+    # -- disk spill --------------------------------------------------------
+
+    async def _spill(self, name: str, docs: List[Dict[str, Any]]) -> bool:
+        lines = "".join(json_util.dumps({"collection": name, "document": doc}) + "\n" for doc in docs)
+        if self.spill_bytes() + len(lines) > self.spill_max_bytes:
+            return False
+
+        def append():
+            with self._file_lock, open(self.own_spill, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+        try:
+            await asyncio.to_thread(append)
+        except OSError as e:
+            logger.error("Write-behind spill failed: %s", e)
+            return False
+        batches.inc("spilled")
+        documents.inc("spilled", amount=len(docs))
+        return True
+
+    def _claim_orphans(self):
+        """Adopt spill files (and interrupted replays) of processes that are gone, so they are replayed here."""
+        for path in sorted(glob.glob(f"{glob.escape(self.spill_path)}.*")):
+            pid = path[len(self.spill_path) + 1:].split(".")[0]
+            if not pid.isdigit() or (int(pid) != os.getpid() and _alive(int(pid))):
+                continue
+            if path == self.own_spill:
+                continue
+            try:
+                with self._file_lock, open(path, encoding="utf-8") as src, \
+                        open(self.own_spill, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(path)
+            except OSError as e:
+                logger.warning("Write-behind could not adopt %s: %s", path, e)
+
+    async def _replay(self):
+        if not self.spill_bytes():
+            return
+        replaying = f"{self.own_spill}.replay"
+        # File I/O and decoding in a thread: a large spill file must not stall the event loop
+        entries = await asyncio.to_thread(self._take_spill, replaying)
+        remaining = entries
+        try:
+            while remaining:
+                chunk, rest = remaining[:self.batch_size], remaining[self.batch_size:]
+                groups: Dict[str, List[Dict[str, Any]]] = {}
+                for entry in chunk:
+                    groups.setdefault(entry["collection"], []).append(entry["document"])
+                if not all([await self._write(self._database[name], docs, attempts=1) for name, docs in groups.items()]):
+                    break
+                batches.inc("replayed")
+                documents.inc("replayed", amount=len(chunk))
+                remaining = rest
+        finally:
+            await asyncio.to_thread(self._restore_spill, replaying, remaining)
+
+    def _take_spill(self, replaying: str) -> List[Dict[str, Any]]:
+        with self._file_lock:
+            os.replace(self.own_spill, replaying)  # new spills go to a fresh file meanwhile
+        with open(replaying, encoding="utf-8") as f:
+            return [json_util.loads(line) for line in f if line.strip()]
+
+    def _restore_spill(self, replaying: str, remaining: List[Dict[str, Any]]):
+        """Put what was not replayed back on disk, in front of anything spilled meanwhile."""
+        if remaining:
+            # Duplicates of a partially written chunk are harmless
+            lines = "".join(json_util.dumps(entry) + "\n" for entry in remaining)
+            with self._file_lock:
+                newer = ""
+                if os.path.exists(self.own_spill):
+                    with open(self.own_spill, encoding="utf-8") as f:
+                        newer = f.read()
+                with open(self.own_spill, "w", encoding="utf-8") as f:
+                    f.write(lines + newer)
+        os.remove(replaying)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+write_behind = WriteBehind(
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+    put_timeout=settings.WRITE_BEHIND_PUT_TIMEOUT,
+    retries=settings.WRITE_BEHIND_RETRIES,
+    spill_path=settings.WRITE_BEHIND_SPILL_PATH,
+    spill_max_bytes=settings.WRITE_BEHIND_SPILL_MAX_BYTES,
+)
+
+
+def _buffer_lines():
+    return gauge_lines("write_behind_pending", "Documents queued in memory, not yet in Mongo or on disk",
+                       [({}, write_behind.pending)]) + \
+        gauge_lines("write_behind_spill_bytes", "Size of this process's spill file", [({}, write_behind.spill_bytes())])
+
+
+registry.add_collector(_buffer_lines)
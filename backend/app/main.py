@@ -1,17 +1,54 @@
+import logging
+import os
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.api.api import router
 from app.core.config import settings
-from app.core.db import connect_to_db, close_db_connection
+from app.core.db import connect_to_db, close_db_connection, ensure_indexes
+from app.agents.llm import close_llm_clients
+from app.agents.jobs import job_manager
+from app.agents.warmup import warmup
+from app.core import db as db_module
+from app.core.log import RequestContextMiddleware, configure_logging, shutdown_logging
+from app.core.shared import shared_state
+from app.core.write_behind import write_behind
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Connect to DB and create tables
+    # Startup: Connect to DB and create indexes while the swarm is imported and compiled in a thread
+    started = time.perf_counter()
+    configure_logging()
+    if settings.WEB_CONCURRENCY > 1 and not shared_state.shared:
+        logger.warning("%d workers with SHARED_STATE_URL=%s: caches and LLM rate limits are per worker",
+                       settings.WEB_CONCURRENCY, settings.SHARED_STATE_URL)
+    warmup.start()
     await connect_to_db()
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning("Failed to create MongoDB indexes: %s", e)
+    await warmup.wait()
+    if settings.JOB_RUN_IN_PROCESS:
+        try:
+            await job_manager.start()
+        except Exception as e:
+            logger.error("Failed to start blueprint job workers: %s", e)
+    await write_behind.start(db_module.db)
+    warmup.startup_seconds = time.perf_counter() - started
     yield
-    # Shutdown: Close connection
+    # Shutdown: let in-flight blueprint jobs finish (or requeue them), flush writes, then close connections
+    if settings.JOB_RUN_IN_PROCESS:
+        await job_manager.shutdown(timeout=settings.JOB_SHUTDOWN_TIMEOUT)
+    # Queued chats/analyses go to Mongo (or the spill file) before the client closes
+    await write_behind.shutdown(timeout=settings.WRITE_BEHIND_SHUTDOWN_TIMEOUT)
+    await close_llm_clients()
     await close_db_connection()
+    await shared_state.close()
+    shutdown_logging()
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
@@ -24,6 +61,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request id for log correlation (X-Request-ID in and out)
+app.add_middleware(RequestContextMiddleware)
+
 app.include_router(router, prefix=settings.API_V1_STR)
 
 @app.get("/")
@@ -31,5 +71,18 @@ def root():
     return {"message": "Startup Swarm AI Orchestrator Running 🚀"}
 
 if __name__ == "__main__":
+    # Development: one worker with hot reload. `--workers N` (or WEB_CONCURRENCY) runs N worker
+    # processes without reload; gunicorn.conf.py is the production setup (workers fork from a warm master).
+    import argparse
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY)
+    args = parser.parse_args()
+    if args.workers > 1:
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)  # the spawned workers read it from settings
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
\ No newline at end of file
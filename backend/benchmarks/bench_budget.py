@@ -0,0 +1,104 @@
+"""
+Tail-latency benchmark for latency budgets and hedged calls.
+
+The stub LLM makes ``--tail-rate`` of its responses stragglers. Blueprints are
+run with budgets and hedging off, with hedging only, and with both, and the
+script reports latency percentiles, how many blueprints came back with
+degraded (missing/fallback) agents, how many blueprint replies were
+rejected (failed validation even after the repair) for the fail-safe
+blueprint, and how many hedges fired. The stub leaves agents reported
+missing out of its blueprint (``--missing-scores``); that must not reject it.
+
+    python -m benchmarks.bench_budget --blueprints 40 --tail-rate 0.03 --tail-latency 8
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import percentile, print_table, run_load, stub_server, use_stub
+
+IDEA = "A marketplace connecting {i} independent bakeries with office caterers"
+
+
+def blueprint_fallbacks() -> int:
+    from app.agents.structured import parse_stats
+    return parse_stats.stats()["nodes"].get("blueprint", {}).get("fallbacks", 0)
+
+
+async def bench(label: str, total: int, concurrency: int, budget: float, node_deadline: float, hedge: bool) -> dict:
+    from app.agents.llm import hedged_calls
+    from app.agents.startup_swarm import create_startup_swarm, build_swarm_inputs
+    from app.core.config import settings
+    from app.core.context import begin_request
+
+    settings.NODE_DEADLINE_SECONDS = node_deadline
+    settings.HEDGE_ENABLED = hedge
+    swarm = create_startup_swarm("parallel")
+    degraded = 0
+    rejected_before = blueprint_fallbacks()
+    hedges_before = hedged_calls.total()
+
+    async def call(i: int):
+        nonlocal degraded
+        begin_request(f"bench-{label}-{i}", budget=budget)
+        result = await swarm.ainvoke(build_swarm_inputs(IDEA.format(i=f"{label}-{i}")))
+        degraded += bool(result["blueprint"].get("degradedAgents"))
+
+    latencies, elapsed = await run_load(call, total, concurrency)
+    return {
+        "config": label,
+        "p50 s": f"{percentile(latencies, 50):.2f}",
+        "p95 s": f"{percentile(latencies, 95):.2f}",
+        "p99 s": f"{percentile(latencies, 99):.2f}",
+        "max s": f"{max(latencies):.2f}",
+        "degraded": f"{degraded}/{total}",
+        "rejected blueprints": blueprint_fallbacks() - rejected_before,
+        "hedges": int(hedged_calls.total() - hedges_before),
+    }
+
+
+async def main_async(args):
+    from app.agents.llm import close_llm_clients
+    from app.core.config import settings
+
+    settings.CACHE_ENABLED = False
+    settings.HEDGE_MIN_DELAY = args.hedge_min_delay
+    settings.BLUEPRINT_RESERVE_SECONDS = args.reserve
+    # Warm the per-node latency history that hedge delays are derived from
+    await bench("warm-up", settings.HEDGE_MIN_SAMPLES + 5, args.concurrency, 0, 0, False)
+
+    rows = [
+        await bench("no budget, no hedge", args.blueprints, args.concurrency, 0, 0, False),
+        await bench("hedge only", args.blueprints, args.concurrency, 0, 0, True),
+        await bench(f"hedge + {args.node_deadline:g}s node / {args.budget:g}s request",
+                    args.blueprints, args.concurrency, args.budget, args.node_deadline, True),
+    ]
+    await close_llm_clients()
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blueprints", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--tail-latency", type=float, default=8.0)
+    parser.add_argument("--budget", type=float, default=6.0, help="request budget in seconds")
+    parser.add_argument("--node-deadline", type=float, default=2.0, help="per-node budget in seconds")
+    parser.add_argument("--reserve", type=float, default=3.0, help="part of the request budget kept for the blueprint")
+    parser.add_argument("--hedge-min-delay", type=float, default=0.3)
+    parser.add_argument("--missing-scores", choices=["omit", "null", "placeholder"], default="omit",
+                        help="how the stub's blueprint reports agents that missed their deadline")
+    args = parser.parse_args()
+
+    stub_args = ["--latency", str(args.latency), "--jitter", str(args.jitter),
+                 "--tail-rate", str(args.tail_rate), "--tail-latency", str(args.tail_latency),
+                 "--missing-scores", args.missing_scores]
+    with stub_server(*stub_args) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
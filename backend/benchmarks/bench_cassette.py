@@ -0,0 +1,176 @@
+"""
+LLM cassettes: record blueprints once, replay them offline at recorded speed
+or as fast as possible, to measure the orchestration overhead on its own.
+
+  record     ``--requests`` blueprints through the swarm with
+             LLM_CASSETTE_MODE=record against the stub LLM (jittery, like
+             Groq) or, with ``--live``, against Groq itself; wall time per
+             blueprint and cassette size
+  replay 1x  the stub is stopped; the same blueprints replayed at recorded
+             speed must give identical analyses and blueprints in about the
+             recorded time
+  replay 0x  replayed with LLM_CASSETTE_LATENCY_SCALE=0: what is left is
+             LangGraph, the nodes, parsing and the scheduler. Run through the
+             swarm and through POST /api/v1/ai/chat (in-memory Mongo), so the
+             API layer's share shows too
+
+``--max-overhead-ms`` fails the run (exit 1) when the per-blueprint overhead
+of the swarm replay exceeds it. ``--cassette`` keeps the recording, and with
+``--replay-only`` an existing cassette is replayed without recording, e.g. one
+recorded live for CI.
+
+    python -m benchmarks.bench_cassette --requests 8 --latency 0.3 --jitter 0.15 --token-rate 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.common import print_table, stub_server, use_stub
+
+MESSAGE = ("User is ready for the blueprint. Context idea: {idea}. Here is the structured data:\n"
+           "The Core Blueprint: Subscription | Details: monthly plan, {n} seats")
+IDEAS = ["meal-prep delivery for shift workers", "marketplace for used lab equipment",
+         "AI bookkeeping for freelancers", "community solar subscriptions"]
+
+
+def message(i: int) -> str:
+    return MESSAGE.format(idea=IDEAS[i % len(IDEAS)], n=i)
+
+
+def use_cassette(mode: str, path: str, scale: float = 1.0):
+    from app.agents import cassette, llm
+    from app.core.config import settings
+
+    settings.LLM_CASSETTE_MODE, settings.LLM_CASSETTE_PATH, settings.LLM_CASSETTE_LATENCY_SCALE = mode, path, scale
+    llm._llms.clear()
+    cassette._cassettes.clear()  # replay order starts over
+
+
+async def run_swarm(total: int) -> tuple:
+    """Blueprints one after another (the per-key replay order is the recorded one); outputs and times."""
+    from app.agents.startup_swarm import build_swarm_inputs, create_startup_swarm
+
+    swarm = create_startup_swarm()
+    outputs, times = [], []
+    for i in range(total):
+        started = time.perf_counter()
+        result = await swarm.ainvoke(build_swarm_inputs(message(i), {}))
+        times.append(time.perf_counter() - started)
+        outputs.append(json.dumps([result.get("analysis"), result.get("blueprint")], sort_keys=True, default=str))
+    return outputs, times
+
+
+async def run_api(total: int, run: str) -> list:
+    import httpx
+    from app.core import db as db_module
+    from app.core.db import get_database
+    from app.main import app
+    from benchmarks.memory_db import MemoryDatabase
+
+    database = MemoryDatabase()
+    db_module.db = database
+    app.dependency_overrides[get_database] = database.dependency
+    times = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        for i in range(total):
+            started = time.perf_counter()
+            response = await client.post("/api/v1/ai/chat", json={"message": message(i), "threadId": f"{run}-{i}",
+                                                                   "background": False})
+            response.raise_for_status()
+            times.append(time.perf_counter() - started)
+    return times
+
+
+def row(phase: str, times: list, outputs: list = None, expected: list = None) -> dict:
+    return {
+        "phase": phase,
+        "blueprints": len(times),
+        "mean ms": f"{statistics.mean(times) * 1000:.1f}",
+        "max ms": f"{max(times) * 1000:.1f}",
+        "identical": "-" if expected is None else f"{sum(a == b for a, b in zip(outputs, expected))}/{len(expected)}",
+    }
+
+
+async def record(args, path: str) -> tuple:
+    from app.agents.cassette import get_cassette
+    from app.agents.llm import close_llm_clients
+
+    use_cassette("record", path)
+    outputs, times = await run_swarm(args.requests)
+    await close_llm_clients()
+    size = os.path.getsize(path)
+    print(f"cassette: {len(get_cassette(path))} responses, {size / 1024:.1f} KiB "
+          f"({size / len(get_cassette(path)):.0f} bytes per response)")
+    return outputs, row("record (live)" if args.live else "record (stub)", times)
+
+
+async def replay(args, path: str, recorded: list, rows: list) -> tuple:
+    from app.agents.cassette import calls
+    from app.agents.scheduler import TokenBucket, llm_scheduler
+
+    # Replays use no provider quota (a live recording ran under Groq's limits)
+    llm_scheduler.requests, llm_scheduler.tokens = TokenBucket(0), TokenBucket(0)
+    use_cassette("replay", path, 1.0)
+    outputs, times = await run_swarm(args.requests)
+    recorded = recorded or outputs
+    rows.append(row("replay 1x swarm", times, outputs, recorded))
+    use_cassette("replay", path, 0.0)
+    outputs, overhead = await run_swarm(args.requests)
+    rows.append(row("replay 0x swarm", overhead, outputs, recorded))
+    use_cassette("replay", path, 0.0)
+    rows.append(row("replay 0x /chat", await run_api(args.requests, "replay")))
+    print_table(rows)
+    misses = calls.values().get(("miss",), 0)
+    identical = all(a == b for a, b in zip(outputs, recorded))
+    return statistics.mean(overhead) * 1000, misses, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub LLM latency")
+    parser.add_argument("--jitter", type=float, default=0.15)
+    parser.add_argument("--token-rate", type=float, default=400)
+    parser.add_argument("--live", action="store_true", help="record against Groq (GROQ_API_KEY) instead of the stub")
+    parser.add_argument("--cassette", default="", help="cassette file to write or replay (default: a temp file)")
+    parser.add_argument("--replay-only", action="store_true", help="replay --cassette without recording")
+    parser.add_argument("--max-overhead-ms", type=float, default=0, help="fail above this swarm overhead per blueprint")
+    args = parser.parse_args()
+    if args.replay_only and not args.cassette:
+        parser.error("--replay-only needs --cassette")
+
+    os.environ.setdefault("CACHE_ENABLED", "false")  # every blueprint reaches the swarm
+    os.environ.setdefault("SEMANTIC_ENABLED", "false")
+    os.environ.setdefault("SINGLEFLIGHT_ENABLED", "false")
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.cassette or os.path.join(directory, "llm.jsonl")
+        if not args.replay_only and os.path.exists(path):
+            os.remove(path)
+        rows, recorded = [], None
+        if args.live and not args.replay_only:
+            recorded, recorded_row = asyncio.run(record(args, path))
+            rows.append(recorded_row)
+        elif not args.replay_only:
+            with stub_server("--latency", str(args.latency), "--jitter", str(args.jitter),
+                             "--token-rate", str(args.token_rate)) as base_url:
+                use_stub(base_url)
+                recorded, recorded_row = asyncio.run(record(args, path))
+                rows.append(recorded_row)
+        # Offline from here: the stub is gone and replay mode builds no Groq client
+        overhead_ms, misses, identical = asyncio.run(replay(args, path, recorded, rows))
+
+    print(f"orchestration overhead: {overhead_ms:.1f} ms per blueprint")
+    failed = misses or not identical or (args.max_overhead_ms and overhead_ms > args.max_overhead_ms)
+    if failed:
+        print("FAIL: " + ("cassette misses" if misses else "replays differ" if not identical
+                          else f"overhead above {args.max_overhead_ms:.0f} ms"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
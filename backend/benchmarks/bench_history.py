@@ -0,0 +1,152 @@
+"""
+Thread-history query benchmark against a real MongoDB.
+
+Seeds a scratch database with ``--docs`` blueprint-sized ``analyses`` records
+spread over ``--threads`` threads, then times the history query shapes:
+
+  legacy      no index, whole documents (the old endpoint)
+  indexed     (thread_id, created_at, _id) index, whole documents
+  summary     same index, list-view projection
+  deep page   same, ``--page`` pages deep via ``skip`` vs the ``before`` cursor
+
+and prints each shape's latency with the explain() plan (stage, keys and
+documents examined). Needs a reachable MongoDB; nothing touches the app's
+own database.
+
+    python -m benchmarks.bench_history --uri mongodb://localhost:27017 --docs 2000000 --threads 20000
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import time
+
+from benchmarks.common import percentile, print_table
+
+INDEX_KEYS = [("thread_id", 1), ("created_at", -1), ("_id", -1)]
+SORT = [("created_at", -1), ("_id", -1)]
+
+
+def blueprint_doc(thread: int, i: int, created_at: datetime.datetime) -> dict:
+    """Roughly the size of a real analyses record (~6 KB)."""
+    scores = {f"agent{k}": {"score": random.randint(1, 100), "insight": "x" * 160} for k in range(13)}
+    return {
+        "thread_id": f"thread-{thread}",
+        "type": "blueprint",
+        "data": {
+            "businessOverview": {"name": f"Venture {i}", "description": "d" * 200,
+                                 "targetAudience": "t" * 80, "valueProposition": "v" * 120},
+            "agentScoring": scores,
+            "strategicRoadmap": ["r" * 120] * 6,
+            "risks": ["k" * 100] * 5,
+        },
+        "analysis": scores,
+        "sections": {"idea": "i" * 400},
+        "created_at": created_at,
+    }
+
+
+async def seed(collection, docs: int, threads: int, batch: int = 5000):
+    existing = await collection.estimated_document_count()
+    if existing >= docs:
+        print(f"Reusing {existing} seeded documents")
+        return
+    await collection.drop()
+    start = datetime.datetime(2025, 1, 1)
+    started = time.perf_counter()
+    for offset in range(0, docs, batch):
+        await collection.insert_many([
+            blueprint_doc(random.randrange(threads), i, start + datetime.timedelta(seconds=i))
+            for i in range(offset, min(docs, offset + batch))
+        ], ordered=False)
+    print(f"Seeded {docs} documents in {time.perf_counter() - started:.0f}s")
+
+
+async def plan(collection, query: dict, projection=None, skip: int = 0, limit: int = 10) -> dict:
+    cursor = collection.find(query, projection).sort(SORT).skip(skip).limit(limit)
+    explain = await cursor.explain()
+    stats = explain.get("executionStats", {})
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    stages, stage = [], winning.get("queryPlan", winning)  # slot-based engine nests the classic plan
+    while stage:
+        stages.append(stage.get("stage", "?"))
+        stage = stage.get("inputStage")
+    return {
+        "plan": ">".join(stages) or "?",
+        "keys": stats.get("totalKeysExamined", "?"),
+        "docs": stats.get("totalDocsExamined", "?"),
+    }
+
+
+async def timed(label: str, run, samples: int, explain: dict) -> dict:
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        await run()
+        latencies.append(time.perf_counter() - started)
+    return {
+        "shape": label,
+        "p50 ms": f"{percentile(latencies, 50) * 1000:.1f}",
+        "p95 ms": f"{percentile(latencies, 95) * 1000:.1f}",
+        **explain,
+    }
+
+
+async def main_async(args):
+    import motor.motor_asyncio
+    from app.api.endpoints.ai import HISTORY_SUMMARY_FIELDS
+
+    client = motor.motor_asyncio.AsyncIOMotorClient(args.uri)
+    collection = client[args.database].analyses
+    await seed(collection, args.docs, args.threads)
+
+    thread_ids = [f"thread-{random.randrange(args.threads)}" for _ in range(args.samples)]
+    picks = iter(thread_ids * 100)
+
+    async def history(projection=None, skip=0, before=None):
+        query = {"thread_id": next(picks)}
+        if before:
+            query["created_at"] = {"$lt": before}
+        return await collection.find(query, projection).sort(SORT).skip(skip).limit(10).to_list(10)
+
+    rows = []
+    await collection.drop_indexes()
+    sample = {"thread_id": thread_ids[0]}
+    rows.append(await timed("legacy (no index, full docs)", history, min(args.samples, 5),
+                            await plan(collection, sample)))
+
+    await collection.create_index(INDEX_KEYS, name="thread_created")
+    rows.append(await timed("indexed, full docs", history, args.samples, await plan(collection, sample)))
+    rows.append(await timed("indexed, summary projection", lambda: history(HISTORY_SUMMARY_FIELDS), args.samples,
+                            await plan(collection, sample, HISTORY_SUMMARY_FIELDS)))
+
+    depth = args.page * 10
+    cutoff = datetime.datetime(2025, 1, 1) + datetime.timedelta(seconds=args.docs // 2)
+    rows.append(await timed(f"page {args.page} via skip", lambda: history(HISTORY_SUMMARY_FIELDS, skip=depth),
+                            args.samples, await plan(collection, sample, HISTORY_SUMMARY_FIELDS, skip=depth)))
+    # Threads hold docs/threads records spread evenly in time, so the midpoint is about page docs/threads/20
+    rows.append(await timed("mid-thread page via cursor", lambda: history(HISTORY_SUMMARY_FIELDS, before=cutoff),
+                            args.samples, await plan(collection, {**sample, "created_at": {"$lt": cutoff}},
+                                                     HISTORY_SUMMARY_FIELDS)))
+    print_table(rows)
+
+    if not args.keep:
+        await client.drop_database(args.database)
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="startup_swarm_bench")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=10_000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--page", type=int, default=5, help="page depth for skip vs cursor")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database for the next run")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
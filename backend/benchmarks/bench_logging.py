@@ -0,0 +1,241 @@
+"""
+Logging overhead: print() and a synchronous handler against the queued JSON
+logger (app/core/log.py), with stdout slowed to ``--write-latency`` seconds
+per write (a terminal, a full pipe, a log shipper applying backpressure).
+
+  caller cost   microseconds per call in the calling thread, fast and slow stdout
+  event loop    ``--tasks`` concurrent tasks each logging ``--records`` lines
+                between awaits; wall time and event-loop lag (how late a 1 ms
+                ticker wakes up) for print vs queued logging
+  /ai/chat      blueprints through the ASGI app against the stub with a request
+                budget tight enough that every request logs budget warnings;
+                p50/p95 with a synchronous stdout handler vs the queue
+  overflow      a burst larger than LOG_QUEUE_SIZE: what the caller paid, what
+                was dropped and counted, and what sampling suppressed
+
+    python -m benchmarks.bench_logging --write-latency 0.002 --tasks 50 --records 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import time
+
+from benchmarks.common import percentile, print_table, run_load, stub_server, use_stub
+
+
+class SlowStream(io.TextIOBase):
+    """A stdout whose every write blocks for `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency, self.lines = latency, 0
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+@contextlib.contextmanager
+def queued_logging(stream, **overrides):
+    from app.core import log
+    from app.core.config import settings
+
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    log.configure_logging(stream=stream)
+    try:
+        yield
+    finally:
+        log.shutdown_logging()
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+@contextlib.contextmanager
+def sync_logging(stream):
+    """The app loggers writing straight to `stream` from the caller, as print() does."""
+    from app.core.log import JsonFormatter
+
+    logger = logging.getLogger("app")
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger.handlers, logger.propagate = [handler], False
+    logger.setLevel(logging.INFO)
+    try:
+        yield
+    finally:
+        logger.handlers = []
+
+
+def dropped(reason: str) -> int:
+    from app.core.log import dropped as counter
+    return int(counter.values().get((reason,), 0))
+
+
+def caller_cost(write_latency: float, calls: int) -> list:
+    logger = logging.getLogger("app.bench")
+    rows = []
+    for label, latency in (("fast stdout", 0.0), (f"stdout {write_latency * 1000:.1f} ms/write", write_latency)):
+        stream = SlowStream(latency)
+        n = calls if not latency else max(50, min(calls, int(0.5 / latency)))
+        started = time.perf_counter()
+        for i in range(n):
+            print(f"Blueprint generation failed, using fallback: attempt {i}", file=stream)
+        printed = (time.perf_counter() - started) / n
+        with sync_logging(stream):
+            started = time.perf_counter()
+            for i in range(n):
+                logger.warning("Blueprint generation failed, using fallback: attempt %d", i)
+            synchronous = (time.perf_counter() - started) / n
+        with queued_logging(stream, LOG_SAMPLE_BURST=0, LOG_QUEUE_SIZE=n + 10):
+            started = time.perf_counter()
+            for i in range(n):
+                logger.warning("Blueprint generation failed, using fallback: attempt %d", i)
+            queued = (time.perf_counter() - started) / n
+        rows.append({"stdout": label, "print us": f"{printed * 1e6:.1f}", "sync handler us": f"{synchronous * 1e6:.1f}",
+                     "queued us": f"{queued * 1e6:.1f}"})
+    return rows
+
+
+async def loop_lag(work) -> tuple:
+    """Run `work()` while a 1 ms ticker measures how late the event loop lets it run."""
+    lags, done = [], asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+    return elapsed, lags
+
+
+async def bench_event_loop(write_latency: float, tasks: int, records: int) -> list:
+    logger = logging.getLogger("app.bench")
+    rows = []
+    for label in ("print", "queued"):
+        stream = SlowStream(write_latency)
+
+        async def request(i: int):
+            for j in range(records):
+                await asyncio.sleep(0)  # the request's own awaits (LLM, Mongo)
+                if label == "print":
+                    print(f"request {i}: agent {j} output unusable, using fallback", file=stream)
+                else:
+                    logger.warning("request %d: agent %d output unusable, using fallback", i, j)
+
+        async def work():
+            await asyncio.gather(*(request(i) for i in range(tasks)))
+
+        if label == "print":
+            elapsed, lags = await loop_lag(work)
+        else:
+            with queued_logging(stream, LOG_SAMPLE_BURST=0, LOG_QUEUE_SIZE=tasks * records + 10):
+                elapsed, lags = await loop_lag(work)
+        rows.append({
+            "logging": label,
+            "records": tasks * records,
+            "wall ms": f"{elapsed * 1000:.0f}",
+            "loop lag p50 ms": f"{percentile(lags, 50) * 1000:.1f}",
+            "loop lag max ms": f"{max(lags or [0]) * 1000:.1f}",
+        })
+    return rows
+
+
+async def bench_chat(args) -> list:
+    import httpx
+    from app.core import db as db_module
+    from app.core.config import settings
+    from app.core.db import get_database
+    from app.main import app
+    from benchmarks.memory_db import MemoryDatabase
+
+    settings.CACHE_ENABLED = settings.SEMANTIC_ENABLED = settings.SINGLEFLIGHT_ENABLED = False
+    settings.SWARM_DEADLINE_SECONDS = args.deadline  # below the stub latency: every request logs warnings
+    database = MemoryDatabase()
+    db_module.db = database
+    app.dependency_overrides[get_database] = database.dependency
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        for label in ("sync handler", "queued"):
+            stream = SlowStream(args.write_latency)
+
+            async def call(i: int):
+                response = await client.post("/api/v1/ai/chat", json={
+                    "message": f"User is ready for the blueprint. Context idea: logging check {label} #{i}. "
+                               "Here is the structured data:\nThe Core Blueprint: Subscription | Details: monthly",
+                    "threadId": f"log-{label}-{i}"})
+                response.raise_for_status()
+
+            context = sync_logging(stream) if label == "sync handler" else queued_logging(stream, LOG_SAMPLE_BURST=0)
+            with context:
+                latencies, elapsed = await run_load(call, args.requests, args.concurrency)
+            rows.append({
+                "logging": label,
+                "requests": args.requests,
+                "log lines": stream.lines,
+                "p50 ms": f"{percentile(latencies, 50) * 1000:.0f}",
+                "p95 ms": f"{percentile(latencies, 95) * 1000:.0f}",
+                "wall s": f"{elapsed:.2f}",
+            })
+    return rows
+
+
+def overflow(write_latency: float, burst: int, queue_size: int):
+    logger = logging.getLogger("app.bench")
+    stream = SlowStream(write_latency)
+    before_full, before_sampled = dropped("queue_full"), dropped("sampled")
+    with queued_logging(stream, LOG_SAMPLE_BURST=0, LOG_QUEUE_SIZE=queue_size):
+        started = time.perf_counter()
+        for i in range(burst):
+            logger.warning("Cache write failed for %s: %s", f"node{i % 13}", "timeout")
+        elapsed = time.perf_counter() - started
+    print(f"overflow: {burst} records into a {queue_size}-record queue in {elapsed * 1000:.1f} ms; "
+          f"written={stream.lines}, dropped (queue_full)={dropped('queue_full') - before_full}")
+
+    stream = SlowStream(0)
+    with queued_logging(stream, LOG_SAMPLE_BURST=20, LOG_SAMPLE_WINDOW=60.0):
+        for i in range(burst):
+            logger.warning("Relevance selection unusable, using keywords: %s", i)
+        logger.error("Chat request failed: %s", "errors are never sampled")
+    print(f"sampling (20 per template per 60 s): {burst} repeated warnings -> written={stream.lines}, "
+          f"suppressed (sampled)={dropped('sampled') - before_sampled}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--write-latency", type=float, default=0.002, help="seconds each stdout write blocks")
+    parser.add_argument("--calls", type=int, default=20000, help="caller-cost iterations (fast stdout)")
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--records", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.1, help="stub LLM latency")
+    parser.add_argument("--deadline", type=float, default=0.05, help="request budget, below the stub latency")
+    parser.add_argument("--burst", type=int, default=5000)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print_table(caller_cost(args.write_latency, args.calls))
+    print()
+    print_table(asyncio.run(bench_event_loop(args.write_latency, args.tasks, args.records)))
+    print()
+    with stub_server("--latency", str(args.latency)) as base_url:
+        use_stub(base_url)
+        print_table(asyncio.run(bench_chat(args)))
+    print()
+    overflow(args.write_latency, args.burst, args.queue_size)
+
+
+if __name__ == "__main__":
+    main()
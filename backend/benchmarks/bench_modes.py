@@ -0,0 +1,128 @@
+"""
+Parallel (13 calls) vs batched (1 call) predictive mode: cost and agreement.
+
+For each idea both swarms run once; the script reports LLM calls, prompt and
+completion tokens, latency, and how far the batched scores drift from the
+per-agent scores (mean absolute difference and share within 10 points).
+
+Against the stub the token/call numbers are real but the scores are synthetic;
+pass ``--live`` to run against Groq (needs GROQ_API_KEY) for quality numbers.
+
+    python -m benchmarks.bench_modes --ideas 8
+    python -m benchmarks.bench_modes --ideas 8 --live
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+from benchmarks.common import percentile, print_table, stub_server, use_stub
+
+IDEAS = [
+    "On-demand dog walking app for busy professionals in tier-1 Indian cities.",
+    "B2B SaaS that reconciles GST invoices for small manufacturers.",
+    "Subscription bakery delivering fresh sourdough to apartments every morning.",
+    "AI tutor that grades handwritten math homework from phone photos.",
+    "Marketplace for renting farm equipment to smallholder farmers.",
+    "Carbon accounting dashboard for mid-size logistics fleets.",
+    "Telehealth platform for veterinary consultations in rural areas.",
+    "Refurbished laptop resale with a one-year warranty for students.",
+    "Compliance copilot that drafts DPDP privacy policies for startups.",
+    "Cold-chain monitoring sensors for pharmaceutical distributors.",
+]
+
+
+def _call_counter():
+    from langchain_core.callbacks import AsyncCallbackHandler
+
+    class CallCounter(AsyncCallbackHandler):
+        def __init__(self):
+            self.calls = 0
+
+        async def on_llm_end(self, response, **kwargs):
+            self.calls += 1
+
+    return CallCounter()
+
+
+async def run_mode(graph, ideas):
+    from langchain_core.callbacks import get_usage_metadata_callback
+
+    counter = _call_counter()
+    latencies, analyses = [], []
+    with get_usage_metadata_callback() as usage:
+        for idea in ideas:
+            started = time.perf_counter()
+            result = await graph.ainvoke(
+                {"business_idea": idea, "messages": [], "analysis": {}, "blueprint": {}},
+                config={"callbacks": [counter]},
+            )
+            latencies.append(time.perf_counter() - started)
+            analyses.append(result["analysis"])
+    prompt_tokens = sum(u.get("input_tokens", 0) for u in usage.usage_metadata.values())
+    completion_tokens = sum(u.get("output_tokens", 0) for u in usage.usage_metadata.values())
+    return {
+        "calls": counter.calls,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latencies": latencies,
+        "analyses": analyses,
+    }
+
+
+def agreement(parallel, batched):
+    diffs = []
+    for a, b in zip(parallel, batched):
+        for name, result in a.items():
+            with contextlib.suppress(KeyError, TypeError, ValueError):
+                diffs.append(abs(float(result["score"]) - float(b[name]["score"])))
+    if not diffs:
+        return "n/a", "n/a"
+    within = sum(d <= 10 for d in diffs) / len(diffs)
+    return f"{sum(diffs) / len(diffs):.1f}", f"{within:.0%}"
+
+
+async def main_async(args):
+    from app.agents.llm import close_llm_clients
+    from app.agents.startup_swarm import create_startup_swarm
+
+    ideas = [f"User is ready for the blueprint. Context idea: {idea}" for idea in (IDEAS * 10)[:args.ideas]]
+    results = {}
+    for mode in ("parallel", "batched"):
+        results[mode] = await run_mode(create_startup_swarm(mode), ideas)
+    await close_llm_clients()
+
+    rows = []
+    for mode, r in results.items():
+        rows.append({
+            "mode": mode,
+            "calls/idea": f"{r['calls'] / len(ideas):.1f}",
+            "prompt tok/idea": f"{r['prompt_tokens'] / len(ideas):.0f}",
+            "completion tok/idea": f"{r['completion_tokens'] / len(ideas):.0f}",
+            "p50 s": f"{percentile(r['latencies'], 50):.2f}",
+            "p95 s": f"{percentile(r['latencies'], 95):.2f}",
+        })
+    print_table(rows)
+    mad, within = agreement(results["parallel"]["analyses"], results["batched"]["analyses"])
+    print(f"\nbatched vs parallel score drift: mean |diff| = {mad}, within 10 points = {within}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--live", action="store_true", help="call Groq instead of the local stub")
+    args = parser.parse_args()
+    os.environ["CACHE_ENABLED"] = "false"  # measure the model, not the cache
+
+    if args.live:
+        asyncio.run(main_async(args))
+        return
+    with stub_server("--latency", str(args.latency)) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Relevance gating benchmark: LLM calls per blueprint with and without gating.
+
+Runs a mix of real-world idea shapes (SaaS, marketplaces, food, hardware,
+fintech, services, ...) with wizard answers through the parallel swarm
+against the stub LLM, once per RELEVANCE_MODE. Reports LLM calls, tokens
+and latency per blueprint, and for the keyword gate how often each optional
+agent was skipped. ``--show`` prints the keyword selection for every idea so
+the patterns can be reviewed by eye.
+
+    python -m benchmarks.bench_relevance --modes off keywords llm --show
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import percentile, print_table, stub_server, use_stub
+
+TEMPLATE = (
+    "User is ready for the blueprint. Context idea: {idea}. Here is the structured data:\n"
+    "The Core Blueprint: {model} | Details: {details}\n"
+    "Market Domain: {market} | Details: early adopters\n"
+    "Builder Profile: {team} | Details: bootstrapped"
+)
+
+# (idea, core blueprint answer, details, market, team)
+IDEAS = [
+    ("Neighbourhood sourdough bakery with a weekend farmers-market stall", "D2C", "walk-in and market sales", "B2C", "Solo founder, baker"),
+    ("Project management SaaS for architecture firms", "SaaS", "per-seat subscription", "B2B", "Technical founder"),
+    ("Invoice reconciliation software for small accounting practices", "SaaS", "monthly plans", "B2B", "Two engineers"),
+    ("Boutique yoga studio with beginner classes", "Services", "class packs", "B2C", "Instructor founder"),
+    ("Marketplace connecting home cooks with office lunch orders", "Marketplace", "commission per order", "B2B2C", "Ops founder"),
+    ("AI copilot that drafts sales follow-up emails from CRM notes", "SaaS", "usage-based pricing", "B2B", "ML engineer"),
+    ("Used-bicycle refurbishing and resale shop", "D2C", "margin on resale", "B2C", "Mechanic founder"),
+    ("Micro-lending app for street vendors", "Fintech", "interest on loans", "B2C", "Banker and engineer"),
+    ("Solar-powered cold storage units for smallholder farmers", "Hardware", "lease per unit", "B2B", "Hardware engineers"),
+    ("Wedding photography collective", "Services", "package pricing", "B2C", "Photographers"),
+    ("Telemedicine platform for dermatology consultations", "Marketplace", "fee per consult", "B2C", "Doctor and CTO"),
+    ("Online course on public speaking for engineers", "Content", "one-time purchase", "B2C", "Coach founder"),
+    ("Fleet tracking dashboard for school bus operators", "SaaS", "per-vehicle subscription", "B2B", "IoT engineer"),
+    ("Handmade ceramics brand selling through Instagram", "D2C", "direct sales", "B2C", "Artist founder"),
+    ("Recruitment agency for nurses relocating to Germany", "Services", "placement fee", "B2B", "HR founder"),
+    ("Browser extension that blocks distracting sites during focus hours", "Freemium", "premium tier", "B2C", "Indie developer"),
+    ("Cloud kitchen brand for healthy biryani", "D2C", "delivery orders", "B2C", "Chef and operator"),
+    ("Bookkeeping services for freelancers", "Services", "monthly retainer", "B2C", "Accountant founder"),
+    ("Recycled-plastic furniture manufacturer", "Manufacturing", "wholesale to retailers", "B2B", "Materials engineer"),
+    ("Community app for dog owners to arrange playdates", "Freemium", "ads and premium", "B2C", "Two developers"),
+    ("Interior design consultancy for small offices", "Services", "project fees", "B2B", "Designer founder"),
+    ("Language exchange meetups in co-working spaces", "Community", "ticketed events", "B2C", "Organiser founder"),
+    ("Fraud detection API for regional e-commerce sites", "SaaS", "per-transaction pricing", "B2B", "Data scientists"),
+    ("Tiffin subscription for hostel students", "Subscription", "monthly meal plans", "B2C", "Home-chef founder"),
+]
+
+
+def message(idea, model, details, market, team) -> str:
+    return TEMPLATE.format(idea=idea, model=model, details=details, market=market, team=team)
+
+
+async def bench(mode: str, messages) -> dict:
+    import time
+    from app.agents.startup_swarm import build_swarm_inputs, create_startup_swarm
+    from app.core.config import settings
+    from app.core.context import begin_request
+
+    settings.RELEVANCE_MODE = mode
+    swarm = create_startup_swarm("parallel")
+    traces, latencies = [], []
+    for i, text in enumerate(messages):
+        traces.append(begin_request(f"bench-{mode}-{i}", budget=0))
+        started = time.perf_counter()
+        await swarm.ainvoke(build_swarm_inputs(text))
+        latencies.append(time.perf_counter() - started)
+    runs = [run for trace in traces for run in trace.runs]
+    total = len(messages)
+    return {
+        "relevance": mode,
+        "LLM calls/bp": f"{sum(run.llm_calls for run in runs) / total:.1f}",
+        "tokens/bp": f"{sum(run.prompt_tokens + run.completion_tokens for run in runs) / total:.0f}",
+        "cost/bp $": f"{sum(run.cost_usd for run in runs) / total:.5f}",
+        "p50 s": f"{percentile(latencies, 50):.2f}",
+    }
+
+
+async def main_async(args):
+    from app.agents.llm import close_llm_clients
+    from app.agents.relevance import GATED_AGENTS, keyword_agents
+    from app.core.config import settings
+
+    settings.CACHE_ENABLED = False
+    settings.SEMANTIC_ENABLED = False
+    messages = [message(*idea) for idea in IDEAS]
+    rows = [await bench(mode, messages) for mode in args.modes]
+    await close_llm_clients()
+    print_table(rows)
+
+    selected = [keyword_agents(text) for text in messages]
+    print("\nkeyword gate, share of ideas that skip each optional agent:")
+    print_table([{name: f"{sum(name not in s for s in selected) / len(selected):.0%}" for name in GATED_AGENTS}])
+    if args.show:
+        print()
+        print_table([{"idea": idea[0][:60], "optional agents run": ", ".join(s) or "-"}
+                     for idea, s in zip(IDEAS, selected)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["off", "keywords", "llm"])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-rate", type=float, default=400.0)
+    parser.add_argument("--show", action="store_true", help="print the keyword selection per idea")
+    args = parser.parse_args()
+
+    with stub_server("--latency", str(args.latency), "--token-rate", str(args.token_rate)) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
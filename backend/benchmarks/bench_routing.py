@@ -0,0 +1,100 @@
+"""
+Tiered routing benchmark: every node on the large model vs predictive agents
+on the small one.
+
+Runs ``--blueprints`` parallel-mode blueprints per configuration against the
+stub LLM, whose small model answers ``--small-speedup`` times faster and
+returns unusable (``--bad-rate``) or low-confidence (``--unsure-rate``)
+scores. Reports latency (one agent, the 13-agent stage, the whole
+blueprint), LLM calls, estimated cost per blueprint
+(priced per model with the LLM_*_COST_PER_MTOK settings) and how many
+predictive agent runs escalated to the large model, by reason.
+
+    python -m benchmarks.bench_routing --blueprints 40 --bad-rate 0.03 --unsure-rate 0.05
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import percentile, print_table, run_load, stub_server, use_stub
+
+IDEA = "User is ready for the blueprint. Context idea: a marketplace connecting {i} home bakers with office caterers"
+
+
+async def bench(label: str, routes: dict, total: int, concurrency: int) -> dict:
+    from app.agents.predictive.registry import PREDICTIVE_AGENTS
+    from app.agents.routing import escalations
+    from app.agents.startup_swarm import build_swarm_inputs, create_startup_swarm
+    from app.core.config import settings
+    from app.core.context import begin_request
+
+    settings.LLM_ROUTES = routes
+    swarm = create_startup_swarm("parallel")
+    traces = []
+    reasons_before = escalations.values()
+
+    async def call(i: int):
+        traces.append(begin_request(f"bench-{label}-{i}", budget=0))
+        await swarm.ainvoke(build_swarm_inputs(IDEA.format(i=f"{label}-{i}")))
+
+    latencies, _ = await run_load(call, total, concurrency)
+    runs = [run for trace in traces for run in trace.runs]
+    agent_runs = [run for run in runs if run.node in PREDICTIVE_AGENTS]
+    reasons = {}
+    for (_node, reason), count in escalations.values().items():
+        reasons[reason] = reasons.get(reason, 0) + count - reasons_before.get((_node, reason), 0)
+    escalated = sum(1 for run in agent_runs if run.escalations)
+    # The blueprint waits for the slowest agent, so one escalation sets the stage time
+    stages = [max(run.wall_seconds for run in trace.runs if run.node in PREDICTIVE_AGENTS) for trace in traces]
+    return {
+        "routing": label,
+        "agent p50 s": f"{percentile([run.wall_seconds for run in agent_runs], 50):.2f}",
+        "agents stage p50 s": f"{percentile(stages, 50):.2f}",
+        "blueprint p50 s": f"{percentile(latencies, 50):.2f}",
+        "blueprint p95 s": f"{percentile(latencies, 95):.2f}",
+        "LLM calls/bp": f"{sum(run.llm_calls for run in runs) / total:.1f}",
+        "cost/bp $": f"{sum(run.cost_usd for run in runs) / total:.5f}",
+        "escalated": f"{escalated / max(1, len(agent_runs)):.1%}",
+        "parse/invalid/confidence": "/".join(str(int(reasons.get(r, 0))) for r in ("parse", "invalid", "confidence")),
+    }
+
+
+async def main_async(args):
+    from app.agents.llm import close_llm_clients
+    from app.core.config import settings
+
+    settings.CACHE_ENABLED = False
+    settings.HEDGE_ENABLED = False  # duplicate calls would blur the cost comparison
+    configs = [
+        ("all large", {"default": "large"}),
+        ("small predictive", {"default": "small", "blueprint": "large", "discovery": "large"}),
+    ]
+    await bench("warm-up", configs[1][1], 2, 2)
+    rows = [await bench(label, routes, args.blueprints, args.concurrency) for label, routes in configs]
+    await close_llm_clients()
+    print_table(rows)
+    print(f"small model {settings.LLM_SMALL_MODEL}, large model {settings.LLM_MODEL}, "
+          f"confidence threshold {settings.ESCALATION_MIN_CONFIDENCE}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blueprints", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--token-rate", type=float, default=300.0)
+    parser.add_argument("--small-speedup", type=float, default=3.0)
+    parser.add_argument("--bad-rate", type=float, default=0.03, help="small-model scores that are unusable")
+    parser.add_argument("--unsure-rate", type=float, default=0.05, help="small-model scores with low confidence")
+    args = parser.parse_args()
+
+    stub_args = ["--latency", str(args.latency), "--jitter", str(args.jitter), "--token-rate", str(args.token_rate),
+                 "--small-speedup", str(args.small_speedup), "--bad-rate", str(args.bad_rate),
+                 "--unsure-rate", str(args.unsure_rate)]
+    with stub_server(*stub_args) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Portfolio screening benchmark: one /ai/batch request vs one /ai/chat per idea.
+
+Screens ``--ideas`` intake ideas (``--duplicates`` of them resubmitted) against
+the stub LLM through the ASGI app with an in-memory database:
+
+  chat        one blueprint /ai/chat per idea, ``--concurrency`` at a time
+  batch k=N   one /ai/batch request packing N ideas per agent request
+
+and reports ideas/minute, LLM requests, tokens and time to the first result.
+The app is served by an in-process uvicorn so NDJSON lines arrive as they are
+written. ``--rpm`` applies a provider request quota, which is where packing
+pays off most.
+
+    python -m benchmarks.bench_screening --ideas 100 --duplicates 0.1 --rpm 600
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from benchmarks.common import free_port, print_table, run_load, stub_server, use_stub
+
+NOUNS = ["bakeries", "clinics", "farmers", "tutors", "truck fleets", "tailors", "pharmacies", "gyms", "artisans",
+         "schools", "restaurants", "landlords", "freelancers", "NGOs", "retailers", "hostels", "salons", "garages"]
+KINDS = ["Marketplace for", "SaaS for", "Financing for", "Logistics for", "Analytics for", "Insurance for"]
+CITIES = ["Kochi", "Pune", "Jaipur", "Nairobi", "Lagos", "Manila", "Dhaka", "Lima"]
+
+
+def intake(count: int, duplicates: float, seed: int):
+    rng = random.Random(seed)
+    ideas = [f"{rng.choice(KINDS)} {rng.choice(NOUNS)} in {rng.choice(CITIES)} (#{i})" for i in range(count)]
+    for i in rng.sample(range(1, count), int(duplicates * count)):
+        ideas[i] = ideas[rng.randrange(i)].upper()  # resubmitted, differently cased
+    return ideas
+
+
+def blueprint_message(idea: str) -> str:
+    return f"User is ready for the blueprint. Context idea: {idea}. Here is the structured data:\n" \
+           "The Core Blueprint: SaaS | Details: subscription"
+
+
+def counters():
+    from app.agents.scheduler import llm_scheduler
+    from app.agents.tracing import node_tokens
+    return llm_scheduler.stats()["completed"], node_tokens.total()
+
+
+def drain_quota():
+    """Start a mode with an empty request bucket, so --rpm measures the steady rate and not the burst."""
+    from app.agents.scheduler import llm_scheduler
+    llm_scheduler.requests.level = 0.0
+    llm_scheduler.requests.updated = time.monotonic()
+
+
+def row(label: str, ideas: int, elapsed: float, first: float, before) -> dict:
+    calls, tokens = counters()
+    return {
+        "mode": label,
+        "ideas": ideas,
+        "seconds": f"{elapsed:.1f}",
+        "ideas/min": f"{ideas / elapsed * 60:.0f}",
+        "first result s": f"{first:.2f}",
+        "LLM requests": int(calls - before[0]),
+        "tokens": int(tokens - before[1]),
+    }
+
+
+async def bench_chat(client, ideas, concurrency: int) -> dict:
+    before, started, first = counters(), time.perf_counter(), []
+
+    async def call(i: int):
+        response = await client.post("/api/v1/ai/chat", json={"message": blueprint_message(ideas[i]), "background": False})
+        response.raise_for_status()
+        first.append(time.perf_counter() - started)
+
+    _, elapsed = await run_load(call, len(ideas), concurrency)
+    return row("chat per idea", len(ideas), elapsed, min(first), before)
+
+
+async def bench_batch(client, ideas, per_call: int) -> dict:
+    before, started, first, summary = counters(), time.perf_counter(), None, {}
+    async with client.stream("POST", "/api/v1/ai/batch", json={"ideas": ideas, "ideasPerCall": per_call}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            event = json.loads(line)
+            if event["type"] == "result" and first is None:
+                first = time.perf_counter() - started
+            elif event["type"] == "summary":
+                summary = event
+    result = row(f"batch k={per_call}", len(ideas), time.perf_counter() - started, first or 0.0, before)
+    result["saved"] = summary.get("saved")
+    return result
+
+
+async def main_async(args):
+    import httpx
+    from app.agents.cache import response_cache
+    from app.agents.llm import close_llm_clients
+    from app.core import db as db_module
+    from app.core.config import settings
+    from app.core.db import get_database
+    from app.main import app
+    from benchmarks.memory_db import MemoryDatabase
+
+    import uvicorn
+
+    settings.SEMANTIC_ENABLED = False
+    settings.SCREEN_CONCURRENCY = args.screen_concurrency
+    database = MemoryDatabase()
+    db_module.db = database
+    app.dependency_overrides[get_database] = database.dependency
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    ideas = intake(args.ideas, args.duplicates, args.seed)
+    rows = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        if not args.skip_chat:
+            drain_quota()
+            rows.append(await bench_chat(client, ideas, args.concurrency))
+        for per_call in args.per_call:
+            response_cache.clear()  # every mode starts cold
+            drain_quota()
+            rows.append(await bench_batch(client, ideas, per_call))
+    server.should_exit = True
+    await serving
+    await close_llm_clients()
+    for r in rows:
+        r.setdefault("saved", "-")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=100)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="fraction of resubmitted ideas")
+    parser.add_argument("--per-call", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--concurrency", type=int, default=8, help="ideas in flight for the chat mode")
+    parser.add_argument("--screen-concurrency", type=int, default=16, help="SCREEN_CONCURRENCY for the batch modes")
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-rate", type=float, default=400.0)
+    parser.add_argument("--rpm", type=int, default=0, help="provider requests/minute quota (0 = none)")
+    parser.add_argument("--skip-chat", action="store_true", help="only run the batch modes")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    with stub_server("--latency", str(args.latency), "--token-rate", str(args.token_rate)) as base_url:
+        use_stub(base_url)
+        os.environ["LLM_REQUESTS_PER_MINUTE"] = str(args.rpm)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
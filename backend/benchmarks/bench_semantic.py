@@ -0,0 +1,164 @@
+"""
+Semantic cache benchmark: lookup latency and hit rate as the index grows.
+
+The index is filled with ``--sizes`` synthetic blueprint requests. Then a
+fixed set of ideas is stored, and each is queried with four variants:
+
+  reworded     the same pitch with small edits (hyphens, articles, plurals)
+  paraphrase   the same idea in different words
+  different    a related but different business (must never match)
+  new answers  the reworded pitch with a different market answer
+
+For each size the script prints search latency (embedding + index scan) and
+how each variant resolved (serve / seed / miss, and how many agent scores
+were reused) at the configured SEMANTIC_* thresholds. No LLM or Mongo is
+involved; matches are resolved against an in-memory `analyses` collection.
+
+    python -m benchmarks.bench_semantic --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+from benchmarks.common import percentile, print_table
+
+TEMPLATE = (
+    "User is ready for the blueprint. Context idea: {idea}. Here is the structured data:\n"
+    "The Core Blueprint: {model} | Details: {details}\n"
+    "Market Domain: {market} | Details: early adopters in tier-1 cities\n"
+    "Builder Profile: Technical founder | Details: two engineers, one designer"
+)
+
+KINDS = ("reworded", "paraphrase", "different")
+
+# (original, reworded, paraphrase, different)
+IDEAS = [
+    ("Uber for dog walking", "An Uber for dog-walking", "On-demand dog walker app",
+     "Uber for laundry pickup"),
+    ("An AI tutor for rural secondary schools", "AI tutors for rural secondary schools",
+     "AI-powered tutoring for students in rural high schools", "An AI grading assistant for university professors"),
+    ("Subscription box of healthy snacks for office teams", "A subscription box with healthy snacks for office teams",
+     "Healthy snack subscription delivered to offices", "Subscription box of craft beer for home brewers"),
+    ("Marketplace connecting farmers directly with restaurants",
+     "A marketplace that connects farmers directly to restaurants",
+     "Farm-to-restaurant marketplace for fresh produce", "Marketplace connecting freelance chefs with households"),
+    ("Carbon accounting software for small manufacturers", "Carbon-accounting software for small manufacturers.",
+     "Emissions tracking SaaS for small manufacturing companies", "Accounting software for small restaurants"),
+    ("Peer-to-peer rental of camping gear", "Peer to peer rentals of camping gear",
+     "Rent camping equipment from people nearby", "Peer-to-peer rental of luxury cars"),
+    ("Telemedicine for pets in tier-2 cities", "Tele-medicine for pets in tier 2 cities",
+     "Online vet consultations for pet owners in smaller cities", "Telemedicine for elderly patients in tier-2 cities"),
+    ("Micro-insurance for gig delivery riders", "Micro insurance for gig delivery riders",
+     "Small, pay-per-shift insurance policies for delivery partners", "Micro-loans for gig delivery riders"),
+    ("B2B platform for restaurants to buy surplus bakery stock at a discount",
+     "A B2B platform where restaurants buy surplus bakery stock at a discount",
+     "Discounted leftover bread and pastries sold wholesale to restaurants",
+     "B2B platform for restaurants to hire temporary kitchen staff"),
+    ("Coworking spaces with childcare for young parents", "Co-working spaces with child care for young parents",
+     "Shared offices where parents can drop off their kids while they work", "Coworking spaces for musicians"),
+]
+
+MODELS = ["SaaS", "Marketplace", "D2C", "Subscription", "Hardware", "Services"]
+MARKETS = ["B2B", "B2C", "B2B2C", "Government"]
+_VERBS = ["Marketplace for", "SaaS for", "Mobile app for", "Subscription service for", "AI assistant for",
+          "Logistics network for", "Financing platform for", "Community platform for", "Analytics tool for"]
+_NOUNS = ["used textbooks", "solar panels", "wedding planners", "dental clinics", "coffee roasters", "truck drivers",
+          "language tutors", "handmade furniture", "sports coaches", "cold storage", "event tickets", "tailors",
+          "yoga studios", "electric scooters", "spice exporters", "street food vendors", "home nurses", "interior designers",
+          "recycled plastics", "pharmacies", "bike repair", "film students", "wool weavers", "tea estates"]
+_AUDIENCES = ["in Kerala", "for college students", "for small retailers", "for senior citizens", "in Southeast Asia",
+              "for remote teams", "for first-time founders", "in rural districts", "for hospitals", "for NGOs"]
+
+
+def blueprint_message(idea: str, i: int = 0, market: int = None) -> str:
+    market = i if market is None else market
+    return TEMPLATE.format(idea=idea, model=MODELS[i % len(MODELS)], details="recurring revenue",
+                           market=MARKETS[market % len(MARKETS)])
+
+
+def filler(count: int):
+    combos = itertools.product(_VERBS, _NOUNS, _AUDIENCES, range(count // 2000 + 1))
+    for i, (verb, noun, audience, batch) in zip(range(count), combos):
+        yield f"filler-{i}", blueprint_message(f"{verb} {noun} {audience} (variant {batch})", i)
+
+
+async def store_ideas(cache, db) -> list:
+    """Store each original idea as a finished blueprint; returns their `analyses` ids."""
+    from app.agents.incremental import ALL_AGENTS, record_fields
+
+    ids = []
+    for n, (original, *_variants) in enumerate(IDEAS):
+        message = blueprint_message(original, n)
+        analysis = {agent: {"score": 70, "insight": f"{agent} view of idea {n}"} for agent in ALL_AGENTS}
+        inserted = await db.analyses.insert_one({
+            "type": "blueprint", "data": {"businessOverview": {"name": f"Idea {n}"}},
+            **record_fields(message, {"analysis": analysis}, {}),
+        })
+        cache.index.add(cache.key(message), cache.vector(message), str(inserted.inserted_id))
+        ids.append(str(inserted.inserted_id))
+    return ids
+
+
+async def bench(size: int, samples: int):
+    from app.agents.semantic import MISS, SemanticCache, SemanticIndex
+    from benchmarks.memory_db import MemoryDatabase
+
+    cache = SemanticCache()
+    cache._embedder()
+    cache.index = SemanticIndex(cache.index.dim, size + len(IDEAS))
+    db = MemoryDatabase()
+    started = time.perf_counter()
+    for key, message in filler(size):
+        cache.index.add(key, cache.vector(message), key)
+    ids = await store_ideas(cache, db)
+    fill_seconds = time.perf_counter() - started
+
+    # (kind, idea number, text, market answer); "new answers" rewords the idea and changes the market answer
+    queries = [(kind, n, text, n) for n, (_, *variants) in enumerate(IDEAS)
+               for kind, text in zip(KINDS, variants)]
+    queries += [("new answers", n, reworded, n + 1) for n, (_, reworded, *_rest) in enumerate(IDEAS)]
+    outcomes = {kind: Counter() for kind in KINDS + ("new answers",)}
+    seeded = {kind: 0 for kind in outcomes}
+    latencies = []
+    for round_ in range(samples):
+        for kind, n, text, market in queries:
+            message = blueprint_message(text, n, market)
+            started = time.perf_counter()
+            ref, score = cache.index.search(cache.vector(message))
+            latencies.append(time.perf_counter() - started)
+            if round_:
+                continue
+            # A hit only counts if it found the right stored idea
+            match = await cache._resolve(db, message, (ref, score)) if ref == ids[n] else None
+            outcomes[kind][match.action if match else MISS] += 1
+            seeded[kind] += len(match.analysis) if match else 0
+            if kind == "different" and match:
+                print(f"  false match {score:.2f}: {IDEAS[n][0]!r} ~ {text!r}")
+
+    row = {
+        "entries": len(cache.index),
+        "fill s": f"{fill_seconds:.1f}",
+        "search p50 ms": f"{percentile(latencies, 50) * 1000:.2f}",
+        "search p99 ms": f"{percentile(latencies, 99) * 1000:.2f}",
+    }
+    for kind, counts in outcomes.items():
+        row[kind] = f"{counts['serve']}/{counts['seed']}/{counts['miss']} ({seeded[kind]} agents)"
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=5, help="query rounds per size, for latency")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    print(f"thresholds: serve >= {settings.SEMANTIC_SERVE_THRESHOLD}, seed >= {settings.SEMANTIC_SEED_THRESHOLD}, "
+          f"model {settings.SEMANTIC_MODEL or 'hashed'}; columns are serve/seed/miss out of {len(IDEAS)}")
+    print_table([asyncio.run(bench(size, args.samples)) for size in args.sizes])
+
+
+if __name__ == "__main__":
+    main()
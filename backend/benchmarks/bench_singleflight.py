@@ -0,0 +1,163 @@
+"""
+Single-flight benchmark: duplicate blueprint requests with and without coalescing.
+
+Three checks against the stub LLM and an in-memory database:
+
+  duplicates   ``--ideas`` ideas, each sent ``--copies`` times at once on the
+               same thread (double-clicks, client retries); LLM calls, saved
+               records and latency with SINGLEFLIGHT_ENABLED off and on
+  disconnect   three identical requests, the first client gives up after
+               ``--disconnect-after`` seconds; the other two must still get
+               the blueprint from the one run
+  streams      three identical /chat/stream requests at once: one run, and
+               every stream gets all `analysis` events and the blueprint
+  workers      two SingleFlight instances (two uvicorn workers) sharing the
+               `inflight` collection run the same key once; then a lease left
+               by a dead worker is taken over once it expires
+
+    python -m benchmarks.bench_singleflight --ideas 8 --copies 3
+"""
+import argparse
+import asyncio
+import datetime
+import time
+
+from benchmarks.common import percentile, print_table, run_load, stub_server, use_stub
+
+MESSAGE = ("User is ready for the blueprint. Context idea: {idea}. Here is the structured data:\n"
+           "The Core Blueprint: Marketplace | Details: commission per order")
+
+
+def llm_calls() -> float:
+    from app.agents.scheduler import llm_scheduler
+    return llm_scheduler.stats()["completed"]
+
+
+async def bench_duplicates(client, database, label: str, enabled: bool, ideas: int, copies: int) -> dict:
+    from app.core.config import settings
+
+    settings.SINGLEFLIGHT_ENABLED = enabled
+    before_calls, before_records = llm_calls(), len(database.analyses.docs)
+
+    async def call(i: int):
+        idea, thread = f"{label} home-cook lunch marketplace #{i // copies}", f"{label}-thread-{i // copies}"
+        response = await client.post("/api/v1/ai/chat", json={"message": MESSAGE.format(idea=idea), "threadId": thread,
+                                                               "background": False})
+        response.raise_for_status()
+
+    latencies, elapsed = await run_load(call, ideas * copies, ideas * copies)
+    return {
+        "single-flight": label,
+        "requests": ideas * copies,
+        "LLM calls": int(llm_calls() - before_calls),
+        "records saved": len(database.analyses.docs) - before_records,
+        "p50 s": f"{percentile(latencies, 50):.2f}",
+        "max s": f"{max(latencies):.2f}",
+    }
+
+
+async def check_disconnect(client, database, after: float):
+    from app.core.config import settings
+
+    settings.SINGLEFLIGHT_ENABLED = True
+    body = {"message": MESSAGE.format(idea="disconnect check"), "threadId": "disconnect", "background": False}
+    before_calls, before_records = llm_calls(), len(database.analyses.docs)
+    calls = [asyncio.create_task(client.post("/api/v1/ai/chat", json=body)) for _ in range(3)]
+    await asyncio.sleep(after)
+    calls[0].cancel()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    ok = [r for r in results[1:] if not isinstance(r, BaseException) and r.status_code == 200]
+    same = len({r.json()["response"] for r in ok}) == 1
+    print(f"disconnect: first client cancelled={isinstance(results[0], asyncio.CancelledError)}, "
+          f"others ok={len(ok)}/2, same blueprint={same}, LLM calls={int(llm_calls() - before_calls)}, "
+          f"records saved={len(database.analyses.docs) - before_records}")
+
+
+async def check_streams(client, database):
+    from app.core.config import settings
+
+    settings.SINGLEFLIGHT_ENABLED = True
+    body = {"message": MESSAGE.format(idea="stream check"), "threadId": "streams"}
+    before_calls, before_records = llm_calls(), len(database.analyses.docs)
+
+    async def stream():
+        events = []
+        async with client.stream("POST", "/api/v1/ai/chat/stream", json=body) as response:
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    events.append(line[len("event: "):])
+        return events
+
+    streams = await asyncio.gather(*(stream() for _ in range(3)))
+    print(f"streams: analysis events per stream={[s.count('analysis') for s in streams]}, "
+          f"blueprint={[s.count('blueprint') for s in streams]}, errors={sum(s.count('error') for s in streams)}, "
+          f"LLM calls={int(llm_calls() - before_calls)}, records saved={len(database.analyses.docs) - before_records}")
+
+
+async def check_workers(database, lease: float):
+    from app.agents.singleflight import COLLECTION, RUNNING, SingleFlight
+
+    runs = []
+
+    async def work():
+        runs.append(time.perf_counter())
+        await asyncio.sleep(1.0)
+        return {"blueprint": "shared"}
+
+    workers = [SingleFlight(lease_seconds=lease, poll_interval=0.1, result_seconds=15) for _ in range(2)]
+    results = await asyncio.gather(*(w.do("bench", "two-workers", work, database) for w in workers))
+    print(f"workers: runs={len(runs)} for 2 workers, both got the result={results[0] == results[1] == {'blueprint': 'shared'}}")
+
+    now = datetime.datetime.utcnow()
+    await database[COLLECTION].insert_one({
+        "_id": "bench:dead-worker", "owner": "dead", "status": RUNNING,
+        "lease_expires_at": now + datetime.timedelta(seconds=lease), "expires_at": now + datetime.timedelta(seconds=lease),
+    })
+    runs.clear()
+    started = time.perf_counter()
+    result = await workers[0].do("bench", "dead-worker", work, database)
+    print(f"dead worker: lease {lease:g}s, taken over after {runs[0] - started:.2f}s, result={result}")
+
+
+async def main_async(args):
+    import httpx
+    from app.agents.llm import close_llm_clients
+    from app.core import db as db_module
+    from app.core.config import settings
+    from app.core.db import get_database
+    from app.main import app
+    from benchmarks.memory_db import MemoryDatabase
+
+    settings.SEMANTIC_ENABLED = False
+    database = MemoryDatabase()
+    db_module.db = database
+    app.dependency_overrides[get_database] = database.dependency
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        rows = [
+            await bench_duplicates(client, database, "off", False, args.ideas, args.copies),
+            await bench_duplicates(client, database, "on", True, args.ideas, args.copies),
+        ]
+        print_table(rows)
+        await check_disconnect(client, database, args.disconnect_after)
+        await check_streams(client, database)
+    await check_workers(database, args.lease)
+    await close_llm_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=8)
+    parser.add_argument("--copies", type=int, default=3, help="identical requests per idea")
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-rate", type=float, default=400.0)
+    parser.add_argument("--disconnect-after", type=float, default=0.3)
+    parser.add_argument("--lease", type=float, default=1.5, help="SINGLEFLIGHT_LEASE_SECONDS for the worker checks")
+    args = parser.parse_args()
+
+    with stub_server("--latency", str(args.latency), "--token-rate", str(args.token_rate)) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Cold-start benchmark: import-time profile of ``app.main`` and time-to-healthy.
+
+  imports   ``python -X importtime -c "import app.main"`` in fresh interpreters;
+            median import time, the heaviest top-level packages, and a check
+            that the swarm layer (langchain_core, langgraph, langchain_groq,
+            the graph and checkpoint modules) is not imported with the app.
+            Exits 1 when a deferred module is imported or ``--max-import-ms``
+            is exceeded, so it can gate CI.
+  healthy   a uvicorn process per WARMUP_MODE: time from spawn until
+            GET /api/v1/health answers 200 and until it reports "warm", then
+            the latency of the first /ai/chat request. The database is in
+            memory with ``--connect-latency`` for the Mongo handshake unless
+            ``--mongo-uri`` points at a real server.
+
+    python -m benchmarks.bench_startup --runs 5 --max-import-ms 1200
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, free_port, print_table, stub_server, use_stub
+
+# Must not be imported by `import app.main`; app.agents.warmup loads them during lifespan startup
+DEFERRED = ("langchain_core", "langgraph", "langchain_groq", "app.agents.startup_swarm", "app.agents.checkpoint")
+
+SERVER = """
+import asyncio, sys
+import uvicorn
+import app.main
+from app.core import db as db_module
+
+if sys.argv[2] == "memory":
+    from benchmarks.memory_db import MemoryDatabase
+
+    async def connect_to_db():
+        await asyncio.sleep(float(sys.argv[3]))  # handshake + ping round trips
+        db_module.db = MemoryDatabase()
+
+    async def close_db_connection():
+        pass
+
+    app.main.connect_to_db, app.main.close_db_connection = connect_to_db, close_db_connection
+
+uvicorn.run(app.main.app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def import_profile(runs: int):
+    totals, packages, imported = [], defaultdict(list), set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                                cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        per_package = defaultdict(int)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            module = name.strip()
+            imported.add(module)
+            per_package[module.split(".")[0]] += int(self_us)
+            if module == "app.main":
+                totals.append(int(cumulative_us) / 1000)
+        for package, us in per_package.items():
+            packages[package].append(us / 1000)
+    return statistics.median(totals), {p: statistics.median(v) for p, v in packages.items()}, imported
+
+
+def poll_health(client: httpx.Client, url: str, started: float, want_warm: bool, timeout: float = 120.0):
+    """Seconds since `started` until /health answers 200 (and says warm, if `want_warm`); None on timeout."""
+    while time.perf_counter() - started < timeout:
+        try:
+            response = client.get(url)
+            if response.status_code == 200 and (not want_warm or response.json().get("warm")):
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def time_to_healthy(mode: str, args) -> dict:
+    port = free_port()
+    env = {**os.environ, "WARMUP_MODE": mode, "PYTHONPATH": BACKEND_DIR, "SEMANTIC_ENABLED": "false"}
+    database = "memory"
+    if args.mongo_uri:
+        env["MONGO_URI"], database = args.mongo_uri, "mongo"
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-c", SERVER, str(port), database, str(args.connect_latency)],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(timeout=60) as client:
+            healthy = poll_health(client, f"{base}/api/v1/health/", started, want_warm=False)
+            # The first request arrives the moment the replica is up, as it would behind an autoscaler
+            request_started = time.perf_counter()
+            client.post(f"{base}/api/v1/ai/chat", json={"message": f"cold start check ({mode})"}).raise_for_status()
+            first = time.perf_counter() - request_started
+            warm = poll_health(client, f"{base}/api/v1/health/", started, want_warm=True, timeout=5) if mode != "off" else None
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {
+        "WARMUP_MODE": mode,
+        "healthy s": f"{healthy:.2f}" if healthy else "-",
+        "warm s": f"{warm:.2f}" if warm else "-",
+        "first /chat s": f"{first:.2f}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters for the import profile")
+    parser.add_argument("--top", type=int, default=10, help="heaviest packages to list")
+    parser.add_argument("--max-import-ms", type=float, default=0, help="fail above this median import time (0: report only)")
+    parser.add_argument("--modes", nargs="+", default=["startup", "background", "off"])
+    parser.add_argument("--connect-latency", type=float, default=0.3, help="emulated Mongo connect + ping, seconds")
+    parser.add_argument("--mongo-uri", default="", help="measure against this MongoDB instead of the in-memory one")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub LLM latency")
+    args = parser.parse_args()
+
+    total_ms, packages, imported = import_profile(args.runs)
+    print(f"import app.main: median {total_ms:.0f} ms over {args.runs} runs")
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    print_table([{"package": package, "self ms": f"{ms:.0f}", "share": f"{ms / total_ms:.0%}"} for package, ms in heaviest])
+    leaked = [module for module in DEFERRED if module in imported]
+    print(f"deferred modules imported by app.main: {', '.join(leaked) or 'none'}")
+
+    with stub_server("--latency", str(args.latency)) as base_url:
+        use_stub(base_url)
+        print()
+        print_table([time_to_healthy(mode, args) for mode in args.modes])
+
+    failed = bool(leaked) or (args.max_import_ms and total_ms > args.max_import_ms)
+    if failed:
+        print(f"FAIL: {'deferred modules imported' if leaked else f'import time above {args.max_import_ms:.0f} ms'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
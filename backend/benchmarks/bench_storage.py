@@ -0,0 +1,267 @@
+"""
+Storage layout of `analyses` records: inline blueprint (old) against the
+compressed blueprint plus `analysis_scores` rows (app/agents/records.py).
+
+  size        BSON bytes per record, per history row and per score row, for
+              the old layout and each codec (zlib, zstd)
+  decode      CPU per read: a history row, a whole record (old: BSON decode;
+              new: decode plus decompression)
+  store       ``--records`` old-layout records (the original
+              {thread_id, type, data, created_at} shape) seeded into the in-memory
+              database (or MongoDB with ``--uri``), migrated with
+              ``records.migrate``, checked to hydrate back to the same
+              blueprints, then timed: a history page (summary and full) and
+              "ideas with pmf >= 80" over `analyses` vs `analysis_scores`.
+              The in-memory database scans both, so its latencies only show
+              the row query's larger collection; "docs examined" is what
+              MongoDB would read. With ``--uri`` the rows use the (agent,
+              score) index, explain() gives docs examined and collStats the
+              on-disk sizes
+
+Blueprints are synthetic, built from a bank of sentences with the length and
+shape of real Groq output. Real text repeats itself less, so expect a
+somewhat lower compression ratio on production data; run the migration with
+``--dry-run`` to measure it there.
+
+    python -m benchmarks.bench_storage --records 2000
+    python -m benchmarks.bench_storage --uri mongodb://localhost:27017 --records 50000
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import time
+
+import bson
+
+from benchmarks.common import percentile, print_table
+
+SENTENCES = [
+    "Office workers in dense IT parks want affordable home-style meals delivered on a predictable schedule",
+    "Recurring subscriptions smooth demand forecasting and let cooks plan procurement a week ahead",
+    "Route density is the main driver of delivery cost, so launch cluster by cluster rather than city-wide",
+    "Hygiene certification and transparent ratings build the trust that keeps renewal rates high",
+    "Corporate tie-ups with HR teams provide a low-cost acquisition channel with high intent",
+    "Margins depend on keeping cook retention high and wastage below five percent of prepared meals",
+    "Competitors compete on variety; a focused menu with consistent quality is a defensible position",
+    "Regulatory exposure is moderate: food safety licences are required for every partner kitchen",
+    "Unit economics turn positive once a route serves more than forty subscribers per delivery window",
+    "The app handles ordering, pausing, payments and feedback so that operations stay lean",
+    "Seasonal churn around holidays should be offset with flexible pause options rather than discounts",
+    "A referral programme among colleagues compounds growth inside the same office complex",
+]
+WORDS = ["pilot", "metro", "tier-2", "B2B", "campus", "weekly", "premium", "trial", "vendor", "partner",
+         "analytics", "retention", "pricing", "logistics", "onboarding", "quality", "dashboard", "payments"]
+
+
+def text(rng: random.Random, sentences: int) -> str:
+    parts = []
+    for _ in range(sentences):
+        words = rng.choice(SENTENCES).split()
+        words.insert(rng.randrange(len(words)), f"{rng.choice(WORDS)} ({rng.randint(2, 950)})")
+        parts.append(" ".join(words) + ".")
+    return " ".join(parts)
+
+
+def sample_record(rng: random.Random, i: int, agents, scoring_keys, created_at) -> dict:
+    """A blueprint record as the original /chat saved it: no `analysis`, the scores only in agentScoring."""
+    analysis = {name: {"score": rng.randint(20, 98), "insight": text(rng, 1)} for name in agents}
+    blueprint = {
+        "businessOverview": {"name": f"Venture {i}", "description": text(rng, 2), "targetAudience": text(rng, 1),
+                             "valueProposition": text(rng, 1)},
+        "agentScoring": {scoring_keys[name]: {"score": e["score"], "insight": e["insight"]} for name, e in analysis.items()},
+        "services": [{"title": f"Service {k}", "description": text(rng, 1), "pricingModel": rng.choice(WORDS)}
+                     for k in range(3)],
+        "revenueModel": [text(rng, 1) for _ in range(3)],
+        "costStructure": {"oneTimeSetup": [text(rng, 1) for _ in range(3)],
+                          "monthlyExpenses": [text(rng, 1) for _ in range(3)]},
+        "strategicRoadmap": [text(rng, 1) for _ in range(5)],
+        "risks": [text(rng, 1) for _ in range(4)],
+        "growthOpportunities": [text(rng, 1) for _ in range(4)],
+    }
+    return {
+        "thread_id": f"thread-{i % max(1, i // 10 + 1)}",
+        "type": "blueprint",
+        "data": blueprint,
+        "created_at": created_at,
+    }
+
+
+def summary(record: dict) -> dict:
+    from app.api.endpoints.ai import HISTORY_SUMMARY_FIELDS
+
+    row = {"_id": record.get("_id")}
+    for field in HISTORY_SUMMARY_FIELDS:
+        head, _, tail = field.partition(".")
+        if head in record:
+            row[head] = {tail: record[head].get(tail)} if tail else record[head]
+    return row
+
+
+def per_call(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def bench_layouts(samples) -> list:
+    from app.agents import records
+    from app.core.config import settings
+
+    rows = []
+    legacy = [bson.encode(r) for r in samples]
+    legacy_rows = [bson.encode(summary(r)) for r in samples]
+    rows.append({
+        "layout": "old (inline data)",
+        "record B": round(sum(map(len, legacy)) / len(legacy)),
+        "history row B": round(sum(map(len, legacy_rows)) / len(legacy_rows)),
+        "score rows B": "-",
+        "row decode us": f"{per_call(lambda: [bson.decode(b) for b in legacy_rows], 20) / len(samples) * 1e6:.1f}",
+        "record decode us": f"{per_call(lambda: [bson.decode(b) for b in legacy], 20) / len(samples) * 1e6:.1f}",
+    })
+    saved = settings.BLUEPRINT_CODEC
+    for codec in ("zlib", "zstd"):
+        settings.BLUEPRINT_CODEC = codec
+        packed = [records._prepare(dict(r)) for r in samples]
+        encoded = [bson.encode(r) for r in packed]
+        history = [bson.encode(summary(r)) for r in packed]
+        score_rows = [sum(len(bson.encode({"_id": bson.ObjectId(), **row})) for row in records.score_rows(r))
+                      for r in samples]
+        write = per_call(lambda: [records._prepare(dict(r)) for r in samples], 3) / len(samples)
+        rows.append({
+            "layout": f"new ({packed[0].get('codec', codec)}), write {write * 1e6:.0f} us",
+            "record B": round(sum(map(len, encoded)) / len(encoded)),
+            "history row B": round(sum(map(len, history)) / len(history)),
+            "score rows B": round(sum(score_rows) / len(score_rows)),
+            "row decode us": f"{per_call(lambda: [bson.decode(b) for b in history], 20) / len(samples) * 1e6:.1f}",
+            "record decode us": f"{per_call(lambda: [records.hydrate(bson.decode(b)) for b in encoded], 20) / len(samples) * 1e6:.1f}",
+        })
+    settings.BLUEPRINT_CODEC = saved
+    return rows
+
+
+async def timed(label: str, run, samples: int, examined="-") -> dict:
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        found = await run()
+        latencies.append(time.perf_counter() - started)
+    return {"query": label, "results": len(found), "docs examined": examined,
+            "p50 ms": f"{percentile(latencies, 50) * 1000:.2f}", "p95 ms": f"{percentile(latencies, 95) * 1000:.2f}"}
+
+
+async def examined(cursor, modeled: int):
+    """totalDocsExamined from explain(); the in-memory database has no planner, so `modeled` stands in."""
+    if not hasattr(cursor, "explain"):
+        return f"~{modeled}"
+    stats = (await cursor.explain()).get("executionStats", {})
+    return stats.get("totalDocsExamined", "?")
+
+
+async def collection_sizes(database) -> str:
+    try:
+        stats = [await database.command("collStats", name) for name in ("analyses", "analysis_scores")]
+    except Exception:
+        return ""
+    return ", ".join(f"{s['ns'].split('.')[-1]}: {s['size'] / 2**20:.1f} MiB data / {s['storageSize'] / 2**20:.1f} MiB on disk"
+                     for s in stats)
+
+
+async def bench_store(args, samples) -> None:
+    from app.agents import records
+    from app.api.endpoints.ai import HISTORY_SUMMARY_FIELDS
+    from app.core.db import ensure_indexes
+
+    client = None
+    if args.uri:
+        import motor.motor_asyncio
+
+        client = motor.motor_asyncio.AsyncIOMotorClient(args.uri)
+        await client.drop_database(args.database)
+        database = client[args.database]
+        await ensure_indexes(database)
+    else:
+        from benchmarks.memory_db import MemoryDatabase
+
+        database = MemoryDatabase()
+    await database.analyses.insert_many([dict(r) for r in samples])
+    thread = samples[len(samples) // 2]["thread_id"]
+    sort = [("created_at", -1), ("_id", -1)]
+
+    def history(projection):
+        return database.analyses.find({"thread_id": thread}, projection).sort(sort).limit(10).to_list(length=10)
+
+    async def history_full():
+        return [records.hydrate(r) for r in await history(None)]
+
+    def pmf_legacy():
+        return database.analyses.find({"data.agentScoring.pmfProbability.score": {"$gte": 80}},
+                                      {"data.businessOverview.name": 1, "data.agentScoring.pmfProbability": 1}) \
+            .sort("data.agentScoring.pmfProbability.score", -1).limit(50)
+
+    def pmf_rows():
+        return database[records.SCORES].find({"agent": "pmf", "score": {"$gte": 80}}) \
+            .sort([("score", -1), ("_id", -1)]).limit(50)
+
+    rows = [await timed("history page, summary (old)", lambda: history(HISTORY_SUMMARY_FIELDS), args.samples),
+            await timed("history page, full (old)", history_full, args.samples),
+            # No index on data.agentScoring.<agent>.score: a collection scan
+            await timed("pmf >= 80 over analyses (old)", lambda: pmf_legacy().to_list(length=50),
+                        max(3, args.samples // 10), await examined(pmf_legacy(), len(samples)))]
+    before = await collection_sizes(database) if client else ""
+
+    started = time.perf_counter()
+    counts = await records.migrate(database, batch=args.batch)
+    elapsed = time.perf_counter() - started
+    print(f"migration: {counts['records']} records, {counts['rows']} score rows in {elapsed:.1f}s; "
+          f"blueprint bytes {counts['bytes_before']} -> {counts['bytes_after']} "
+          f"({counts['bytes_after'] / max(1, counts['bytes_before']):.0%})")
+    again = await records.migrate(database, batch=args.batch)
+    migrated = {r["_id"]: r for r in await database.analyses.find({}).to_list(length=None)}
+    identical = sum(records.hydrate(migrated[r["_id"]])["data"] == r["data"] for r in samples)
+    scored = len(await database[records.SCORES].find({}).to_list(length=None))
+    expected = sum(len(r["data"]["agentScoring"]) for r in samples)
+    print(f"hydrated == original: {identical}/{len(samples)}; score rows {scored}/{expected}; "
+          f"second run migrated {again['records']} records")
+
+    rows += [await timed("history page, summary (new)", lambda: history(HISTORY_SUMMARY_FIELDS), args.samples),
+             await timed("history page, full (new)", history_full, args.samples),
+             # (agent, score) index range scan: only the rows returned are fetched
+             await timed("pmf >= 80 over analysis_scores (new)", lambda: pmf_rows().to_list(length=50),
+                         args.samples, await examined(pmf_rows(), 50))]
+    print_table(rows)
+    if client:
+        print(f"before: {before}")
+        print(f"after:  {await collection_sizes(database)}")
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=200, help="migration batch size")
+    parser.add_argument("--uri", default="", help="MongoDB to run the store phase against (default: in-memory)")
+    parser.add_argument("--database", default="startup_swarm_bench_storage")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from app.agents.predictive.registry import PREDICTIVE_AGENTS, SCORING_KEYS
+
+    rng = random.Random(args.seed)
+    start = datetime.datetime(2025, 1, 1)
+    samples = [sample_record(rng, i, PREDICTIVE_AGENTS, SCORING_KEYS, start + datetime.timedelta(minutes=i))
+               for i in range(args.records)]
+    for record in samples:
+        record["_id"] = bson.ObjectId()
+    print_table(bench_layouts(samples[:500]))
+    print()
+    asyncio.run(bench_store(args, samples))
+
+
+if __name__ == "__main__":
+    main()
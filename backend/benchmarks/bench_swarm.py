@@ -0,0 +1,96 @@
+"""
+Swarm throughput benchmark against the local stub LLM.
+
+Compares the legacy execution model (a fresh ChatGroq per node, blocking
+``invoke`` on LangGraph's thread executor) with the pooled async nodes
+(one shared client, ``ainvoke`` over a bounded keep-alive pool). Reports
+blueprints/sec and latency percentiles for each.
+
+    python -m benchmarks.bench_swarm --requests 64 --concurrency 16 --latency 0.3
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import percentile, print_table, run_load, stub_server, use_stub
+
+IDEA = "User is ready for the blueprint. Context idea: on-demand dog walking app for busy professionals."
+PREDICTIVE_NODES = [
+    "market", "competition", "execution", "pmf", "tech", "funding", "legal",
+    "gtm", "economics", "scalability", "impact", "supply_chain", "data_ai",
+]
+
+
+def build_legacy_swarm():
+    """Same topology as ``create_startup_swarm`` with the pre-pooling node shape."""
+    from langchain_core.messages import SystemMessage
+    from langchain_groq import ChatGroq
+    from langgraph.graph import StateGraph, START, END
+    from app.agents.state import AgentState
+    from app.core.config import settings
+
+    def fresh_llm():
+        return ChatGroq(api_key=settings.GROQ_API_KEY, model=settings.LLM_MODEL,
+                        temperature=0.1, base_url=settings.GROQ_BASE_URL)
+
+    def make_node(name):
+        def node(state):
+            prompt = f'You are the {name} agent.\nBusiness Idea: {state["business_idea"]}\nOutput JSON: {{"score": 1-100, "insight": "short insight"}}'
+            fresh_llm().invoke([SystemMessage(content=prompt)])
+            return {"analysis": {name: {"score": 50, "insight": "legacy"}}}
+        return node
+
+    def blueprint(state):
+        fresh_llm().invoke([SystemMessage(content=f"Generate a complete Business Blueprint.\nScores: {state['analysis']}")])
+        return {"blueprint": {}}
+
+    builder = StateGraph(AgentState)
+    builder.add_node("blueprint", blueprint)
+    for name in PREDICTIVE_NODES:
+        builder.add_node(name, make_node(name))
+        builder.add_edge(START, name)
+        builder.add_edge(name, "blueprint")
+    builder.add_edge("blueprint", END)
+    return builder.compile()
+
+
+async def bench(graph, label: str, total: int, concurrency: int) -> dict:
+    async def call(i: int):
+        await graph.ainvoke({"business_idea": f"{IDEA} #{i}", "messages": [], "analysis": {}, "blueprint": {}})
+
+    await call(-1)  # warm-up: imports, TLS-free connect, pool fill
+    latencies, elapsed = await run_load(call, total, concurrency)
+    return {
+        "mode": label,
+        "blueprints/s": f"{total / elapsed:.2f}",
+        "p50 s": f"{percentile(latencies, 50):.3f}",
+        "p95 s": f"{percentile(latencies, 95):.3f}",
+        "max s": f"{max(latencies):.3f}",
+    }
+
+
+async def main_async(args):
+    from app.agents.llm import close_llm_clients
+    from app.agents.startup_swarm import create_startup_swarm
+
+    rows = [
+        await bench(build_legacy_swarm(), "legacy (fresh client, threads)", args.requests, args.concurrency),
+        await bench(create_startup_swarm(), "pooled async", args.requests, args.concurrency),
+    ]
+    await close_llm_clients()
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with stub_server("--latency", str(args.latency)) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
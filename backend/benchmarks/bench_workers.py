@@ -0,0 +1,282 @@
+"""
+Multiple workers (gunicorn.conf.py) and the shared state backends
+(app/core/shared.py). Every worker serves the API with its own in-memory
+database (benchmarks/worker_app.py), so nothing is shared through Mongo.
+
+  throughput   ``--requests`` blueprints through POST /api/v1/ai/chat on each
+               worker count in ``--workers``, on new connections so the kernel
+               spreads them over the workers:
+                 io   against the stub LLM with ``--latency``; each worker's LLM
+                      connection pool (LLM_MAX_CONNECTIONS=``--pool``) is the
+                      limit, as the provider's latency is in production
+                 cpu  replaying a cassette at 0x speed (LLM_CASSETTE_MODE=replay):
+                      only the orchestration's CPU is left, which scales with
+                      cores, not with workers beyond them
+               and the seconds from launch until every worker reported warm
+  rate limit   the largest worker count at LLM_REQUESTS_PER_MINUTE=``--rpm``,
+               kept busy for ``--settle`` + ``--window`` seconds per backend;
+               LLM calls per minute reaching the stub in the window, after the
+               initial burst. With memory:// each worker spends its own budget
+  cache        ``--ideas`` blueprints, then the same ideas again on other
+               threads; LLM calls of the second pass per backend. With
+               memory:// only the worker that generated an idea has it cached
+  cold start   gunicorn (imports in the master, then fork) against
+               ``uvicorn --workers`` (every worker imports the app itself)
+
+Redis is a fakeredis TCP server in this process unless ``--redis`` points at a
+real one. With fewer cores than workers, the cpu rows cannot scale: compare
+them with the core count printed first.
+
+    python -m benchmarks.bench_workers --workers 1,2,4 --requests 48 --latency 0.5 --pool 1
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, free_port, print_table, run_load, stub_server, use_stub
+
+IDEA = ("User is ready for the blueprint. Context idea: {idea} #{n}. Here is the structured data:\n"
+        "The Core Blueprint: Subscription | Details: monthly plan, {n} seats")
+
+
+def message(i: int) -> str:
+    return IDEA.format(idea="meal-prep delivery for shift workers", n=i)
+
+
+async def warm_workers(base_url: str, workers: int, started: float, timeout: float = 180.0) -> float:
+    """Seconds since `started` until `workers` distinct workers answered /health; each is warm once it answers."""
+    seen = set()
+    async with httpx.AsyncClient(base_url=base_url, timeout=2.0,
+                                 limits=httpx.Limits(max_keepalive_connections=0)) as client:
+        async def poll():
+            with contextlib.suppress(httpx.HTTPError):
+                response = await client.get("/api/v1/health/")
+                if response.status_code == 200 and response.json().get("warm"):
+                    seen.add(response.json()["worker"])
+
+        while time.perf_counter() - started < timeout:
+            await asyncio.gather(*(poll() for _ in range(2 * workers)))
+            if len(seen) >= workers:
+                return time.perf_counter() - started
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"only {len(seen)} of {workers} workers became warm")
+
+
+@contextlib.contextmanager
+def serve(workers: int, env: dict, server: str = "gunicorn"):
+    """Run benchmarks.worker_app with `workers` processes; yields its URL and the seconds until all were warm."""
+    port = free_port()
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-w", str(workers),
+                   "-b", f"127.0.0.1:{port}", "--log-level", "warning", "benchmarks.worker_app:app"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "benchmarks.worker_app:app", "--workers", str(workers),
+                   "--port", str(port), "--log-level", "warning"]
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "LOG_LEVEL": "WARNING", "WARMUP_MODE": "startup", **env}
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        yield base_url, asyncio.run(warm_workers(base_url, workers, started))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=90)
+
+
+@contextlib.contextmanager
+def redis_server(url: str):
+    if url:
+        yield url
+        return
+    from fakeredis import TcpFakeServer
+
+    port = free_port()
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def stub_requests(stub_url: str) -> int:
+    return httpx.get(f"{stub_url}/stats").json()["requests"]
+
+
+async def blueprints(base_url: str, messages: list, concurrency: int, run: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=None,
+                                 limits=httpx.Limits(max_keepalive_connections=0)) as client:
+        async def call(i: int):
+            response = await client.post("/api/v1/ai/chat", json={"message": messages[i], "threadId": f"{run}-{i}",
+                                                                  "background": False})
+            response.raise_for_status()
+
+        return await run_load(call, len(messages), concurrency)
+
+
+def record_cassette(path: str, ideas: int):
+    """Blueprints for `ideas` messages through the swarm against the stub, recorded for the cpu rows."""
+    from benchmarks.bench_cassette import use_cassette
+
+    async def run():
+        from app.agents.llm import close_llm_clients
+        from app.agents.startup_swarm import build_swarm_inputs, create_startup_swarm
+
+        use_cassette("record", path)
+        swarm = create_startup_swarm()
+        for i in range(ideas):
+            await swarm.ainvoke(build_swarm_inputs(message(i), {}))
+        await close_llm_clients()
+
+    asyncio.run(run())
+
+
+def bench_throughput(args, stub_url: str, cassette: str) -> list:
+    rows, base = [], {}
+    modes = {
+        "io": {"LLM_MAX_CONNECTIONS": str(args.pool), "LLM_MAX_KEEPALIVE_CONNECTIONS": str(args.pool)},
+        "cpu": {"LLM_CASSETTE_MODE": "replay", "LLM_CASSETTE_PATH": cassette, "LLM_CASSETTE_LATENCY_SCALE": "0"},
+    }
+    for mode in args.modes:
+        for workers in args.workers:
+            with serve(workers, modes[mode]) as (base_url, ready):
+                messages = [message(i % args.ideas) for i in range(args.requests)]
+                asyncio.run(blueprints(base_url, messages[:workers], workers, "warm"))  # first-request costs
+                before = stub_requests(stub_url)
+                latencies, elapsed = asyncio.run(blueprints(base_url, messages, args.concurrency, f"{mode}{workers}"))
+                calls = stub_requests(stub_url) - before
+            throughput = args.requests / elapsed
+            base.setdefault(mode, throughput)
+            rows.append({
+                "mode": mode,
+                "workers": workers,
+                "ready s": f"{ready:.1f}",
+                "LLM calls": calls,
+                "blueprints/s": f"{throughput:.2f}",
+                "speedup": f"{throughput / base[mode]:.2f}x",
+                "ideal": f"{workers}x",
+                "p50 ms": f"{sorted(latencies)[len(latencies) // 2] * 1000:.0f}",
+            })
+    return rows
+
+
+async def keep_busy(base_url: str, concurrency: int, stop: asyncio.Event, run: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=None,
+                                 limits=httpx.Limits(max_keepalive_connections=0)) as client:
+        async def loop(k: int):
+            n = 0
+            while not stop.is_set():
+                n += 1
+                with contextlib.suppress(httpx.HTTPError):
+                    await client.post("/api/v1/ai/chat", json={"message": message(k * 100000 + n),
+                                                               "threadId": f"{run}-{k}-{n}", "background": False})
+
+        tasks = [asyncio.create_task(loop(k)) for k in range(concurrency)]
+        await stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def bench_rate_limit(args, stub_url: str, backends: dict) -> list:
+    workers, rows = max(args.workers), []
+    for name, url in backends.items():
+        env = {"SHARED_STATE_URL": url, "LLM_REQUESTS_PER_MINUTE": str(args.rpm), "LLM_TOKENS_PER_MINUTE": "0"}
+        with serve(workers, env) as (base_url, _):
+            async def measure():
+                stop = asyncio.Event()
+                load = asyncio.create_task(keep_busy(base_url, args.concurrency, stop, f"rpm-{name}"))
+                await asyncio.sleep(args.settle)
+                before = await asyncio.to_thread(stub_requests, stub_url)
+                await asyncio.sleep(args.window)
+                after = await asyncio.to_thread(stub_requests, stub_url)
+                stop.set()
+                await load
+                return (after - before) * 60 / args.window
+
+            per_minute = asyncio.run(measure())
+        limit = args.rpm * (workers if name == "memory" else 1)
+        rows.append({"backend": name, "workers": workers, "LLM_REQUESTS_PER_MINUTE": args.rpm,
+                     "LLM calls/min": f"{per_minute:.0f}", "expected": limit,
+                     "vs limit": f"{per_minute / args.rpm:.2f}x"})
+    return rows
+
+
+def bench_cache(args, stub_url: str, backends: dict) -> list:
+    workers, rows = max(args.workers), []
+    env = {"CACHE_ENABLED": "true", "CACHE_MONGO_ENABLED": "false"}
+    for name, url in backends.items():
+        with serve(workers, {**env, "SHARED_STATE_URL": url}) as (base_url, _):
+            messages = [message(10_000 + i) for i in range(args.ideas)]
+            before = stub_requests(stub_url)
+            asyncio.run(blueprints(base_url, messages, args.concurrency, f"cache-a-{name}"))
+            first = stub_requests(stub_url) - before
+            _, elapsed = asyncio.run(blueprints(base_url, messages, args.concurrency, f"cache-b-{name}"))
+            second = stub_requests(stub_url) - before - first
+        rows.append({"backend": name, "workers": workers, "ideas": args.ideas, "pass 1 LLM calls": first,
+                     "pass 2 LLM calls": second, "pass 2 hit rate": f"{1 - second / max(1, first):.0%}",
+                     "pass 2 s": f"{elapsed:.2f}"})
+    return rows
+
+
+def bench_cold_start(args) -> list:
+    workers, rows = max(args.workers), []
+    for server in ("uvicorn", "gunicorn"):
+        with serve(workers, {}, server) as (_, ready):
+            rows.append({"server": server, "workers": workers, "all warm s": f"{ready:.1f}"})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--modes", default="io,cpu", help="throughput modes: io, cpu")
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ideas", type=int, default=8, help="distinct ideas (cassette size, cache phase)")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM latency")
+    parser.add_argument("--pool", type=int, default=1, help="LLM_MAX_CONNECTIONS per worker in io mode")
+    parser.add_argument("--rpm", type=int, default=120, help="LLM_REQUESTS_PER_MINUTE for the rate-limit phase")
+    parser.add_argument("--settle", type=float, default=8.0, help="seconds to spend the initial burst")
+    parser.add_argument("--window", type=float, default=15.0, help="seconds the call rate is measured over")
+    parser.add_argument("--redis", default="", help="Redis URL (default: a fakeredis TCP server)")
+    parser.add_argument("--skip", default="", help="comma-separated phases to skip: throughput,rate,cache,cold")
+    args = parser.parse_args()
+    args.workers = [int(n) for n in args.workers.split(",")]
+    args.modes = [m for m in args.modes.split(",") if m]
+    skip = set(args.skip.split(","))
+
+    os.environ.update({"CACHE_ENABLED": "false", "SEMANTIC_ENABLED": "false", "SINGLEFLIGHT_ENABLED": "false"})
+    print(f"cores: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as directory, \
+            stub_server("--latency", str(args.latency)) as stub_url, redis_server(args.redis) as redis_url:
+        use_stub(stub_url)
+        cassette = os.path.join(directory, "llm.jsonl")
+        backends = {"memory": "memory://", "sqlite": f"sqlite:///{directory}/state.db", "redis": redis_url}
+        if "throughput" not in skip:
+            if "cpu" in args.modes:
+                record_cassette(cassette, args.ideas)
+            print_table(bench_throughput(args, stub_url, cassette))
+            print()
+        if "rate" not in skip:
+            print_table(bench_rate_limit(args, stub_url, backends))
+            print()
+        if "cache" not in skip:
+            print_table(bench_cache(args, stub_url, backends))
+            print()
+        if "cold" not in skip:
+            print_table(bench_cold_start(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Load test for ``POST /api/v1/ai/chat`` without Groq or MongoDB.
+
+The FastAPI app is driven in-process over ASGI, with the LLM pointed at the
+local stub (``benchmarks/stub_llm.py``) and the database replaced by
+``benchmarks/memory_db.py``. For each path (discovery, blueprint) and each
+concurrency level it reports requests/sec, latency percentiles, error count,
+event-loop lag (how late a 10 ms ticker wakes up) and process memory.
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 64 \\
+        --latency 0.3 --jitter 0.1 --token-rate 400 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import gc
+import resource
+import time
+from typing import List
+
+from benchmarks.common import percentile, print_table, run_load, stub_server, use_stub
+
+DISCOVERY_MESSAGE = "I want to build {idea}"
+BLUEPRINT_MESSAGE = (
+    "User is ready for the blueprint. Context idea: {idea}\n"
+    "Here is the structured data:\n"
+    "The Core Blueprint: {idea}\n"
+    "Market Domain: Urban professionals in tier-1 cities\n"
+    "Builder Profile: Two technical founders\n"
+)
+IDEAS = [
+    "an on-demand dog walking app for busy professionals",
+    "a B2B marketplace for surplus restaurant produce",
+    "an AI tutor for rural secondary schools",
+    "a subscription repair service for home appliances",
+    "a carbon accounting tool for small manufacturers",
+]
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop runs a periodic callback."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+    def __enter__(self):
+        self.samples = []
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+def message_for(path: str, i: int, unique: bool) -> str:
+    idea = IDEAS[i % len(IDEAS)]
+    if unique:
+        idea = f"{idea} (variant {i})"
+    template = BLUEPRINT_MESSAGE if path == "blueprint" else DISCOVERY_MESSAGE
+    return template.format(idea=idea)
+
+
+async def bench_level(client, path: str, concurrency: int, total: int, unique: bool, offset: int) -> dict:
+    errors = 0
+
+    async def call(i: int):
+        nonlocal errors
+        response = await client.post("/api/v1/ai/chat", json={
+            "message": message_for(path, offset + i, unique),
+            "threadId": f"load-{path}-{offset + i}",
+        })
+        if response.status_code != 200:
+            errors += 1
+
+    gc.collect()
+    rss_before = rss_mb()
+    with LoopLagMonitor() as lag:
+        latencies, elapsed = await run_load(call, total, concurrency)
+    return {
+        "path": path,
+        "conc": concurrency,
+        "req/s": f"{total / elapsed:.2f}",
+        "p50 s": f"{percentile(latencies, 50):.3f}",
+        "p95 s": f"{percentile(latencies, 95):.3f}",
+        "p99 s": f"{percentile(latencies, 99):.3f}",
+        "errors": errors,
+        "lag p99 ms": f"{percentile(lag.samples, 99) * 1000:.1f}",
+        "lag max ms": f"{max(lag.samples, default=0.0) * 1000:.1f}",
+        "rss MB": f"{rss_mb():.0f}",
+        "rss +MB": f"{rss_mb() - rss_before:+.0f}",
+    }
+
+
+async def main_async(args):
+    import httpx
+    from app.agents.llm import close_llm_clients
+    from app.core import db as db_module
+    from app.core.db import get_database
+    from app.main import app
+    from benchmarks.memory_db import MemoryDatabase
+
+    database = MemoryDatabase(latency=args.db_latency)
+    db_module.db = database
+    app.dependency_overrides[get_database] = database.dependency
+
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        offset = 0
+        for path in args.paths.split(","):
+            await bench_level(client, path, 1, 1, unique=True, offset=-1 - offset)  # warm-up
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                rows.append(await bench_level(client, path, concurrency, args.requests, not args.repeat, offset))
+                offset += args.requests
+    await close_llm_clients()
+
+    print_table(rows)
+    print(f"\nDB operations: {next(database.operations)}  "
+          f"analyses: {len(database.analyses.docs)}  chats: {len(database.chats.docs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", default="discovery,blueprint", help="comma-separated: discovery, blueprint")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="requests per path and concurrency level")
+    parser.add_argument("--repeat", action="store_true", help="cycle a few ideas (cache hits) instead of unique ones")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="seconds per emulated Mongo round trip")
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub_args = ["--latency", str(args.latency), "--jitter", str(args.jitter),
+                 "--token-rate", str(args.token_rate), "--error-rate", str(args.error_rate)]
+    with stub_server(*stub_args) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
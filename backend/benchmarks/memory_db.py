@@ -0,0 +1,295 @@
+"""
+In-memory stand-in for the Motor database used by the API, for load tests.
+
+Implements the subset of the async collection API the backend calls
+(insert/find/update/delete with simple equality, ``$exists``, ``$in``, ``$nin``, ``$or``
+and comparison filters, sort/skip/limit, projections, ``$set``/``$unset``,
+unique ``_id``). Documents are copied on
+the way in and out like a real driver would. An optional per-operation
+``latency`` emulates a network round trip to Mongo; setting ``down`` makes
+every operation fail like an unreachable server.
+
+    from benchmarks.memory_db import MemoryDatabase
+    app.dependency_overrides[get_database] = MemoryDatabase().dependency
+"""
+import asyncio
+import copy
+import itertools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import AutoReconnect, BulkWriteError, DuplicateKeyError
+
+_MISSING = object()
+
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _match_value(value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        return value is not _MISSING and value == condition
+    for op, arg in condition.items():
+        if op == "$exists":
+            if (value is not _MISSING) != bool(arg):
+                return False
+        elif op == "$in":
+            if value is _MISSING or value not in arg:
+                return False
+        elif op == "$nin":
+            if value is not _MISSING and value in arg:
+                return False
+        elif op == "$ne":
+            if value is not _MISSING and value == arg:
+                return False
+        elif op in ("$lt", "$lte", "$gt", "$gte"):
+            if value is _MISSING or value is None:
+                return False
+            if not {"$lt": value < arg, "$lte": value <= arg, "$gt": value > arg, "$gte": value >= arg}[op]:
+                return False
+        else:
+            raise NotImplementedError(f"MemoryDatabase does not support {op}")
+    return True
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+        elif not _match_value(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include = [k for k, v in projection.items() if v and k != "_id"]
+    if include:
+        projected = {"_id": doc["_id"]} if projection.get("_id", 1) and "_id" in doc else {}
+        for path in include:
+            value = _get(doc, path)
+            if value is _MISSING:
+                continue
+            *parents, leaf = path.split(".")
+            target = projected
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = value
+        return projected
+    return {k: v for k, v in doc.items() if k not in {k for k, v in projection.items() if not v}}
+
+
+def _sort_key(spec: List[Tuple[str, int]]):
+    def key(doc):
+        parts = []
+        for field, direction in spec:
+            value = _get(doc, field)
+            present = value is not _MISSING and value is not None
+            parts.append(_Ordered((present, value if present else 0), direction))
+        return parts
+    return key
+
+
+class _Ordered:
+    __slots__ = ("value", "direction")
+
+    def __init__(self, value, direction: int):
+        self.value, self.direction = value, direction
+
+    def __lt__(self, other: "_Ordered") -> bool:
+        return self.value < other.value if self.direction >= 0 else self.value > other.value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+
+def _normalize_sort(key_or_list, direction=None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    return list(key_or_list or [])
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query, projection):
+        self._collection, self._query, self._projection = collection, query, projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None) -> "MemoryCursor":
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        docs = [d for d in self._collection.docs if matches(d, self._query)]
+        if self._sort:
+            docs.sort(key=_sort_key(self._sort))
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self._collection.database.round_trip()
+        docs = self._results()
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database, self.name = database, name
+        self.docs: List[Dict[str, Any]] = []
+
+    async def create_index(self, *args, **kwargs) -> str:
+        return "memory_index"
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await self.database.round_trip()
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        elif any(doc["_id"] == document["_id"] for doc in self.docs):  # caller-chosen ids only; ObjectIds are unique
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} _id: {document['_id']!r}")
+        self.docs.append(copy.deepcopy(document))
+        return _Result(inserted_id=document["_id"])
+
+    async def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True):
+        await self.database.round_trip()
+        ids, errors = [], []
+        existing = {doc["_id"] for doc in self.docs}
+        for index, document in enumerate(documents):
+            document.setdefault("_id", ObjectId())
+            if document["_id"] in existing:
+                errors.append({"index": index, "code": 11000, "errmsg": f"E11000 duplicate key _id: {document['_id']!r}"})
+                if ordered:
+                    break
+                continue
+            existing.add(document["_id"])
+            self.docs.append(copy.deepcopy(document))
+            ids.append(document["_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids)})
+        return _Result(inserted_ids=ids)
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None,
+             sort=None, limit: int = 0, skip: int = 0) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None,
+                       sort=None) -> Optional[Dict[str, Any]]:
+        docs = await self.find(filter, projection, sort=sort, limit=1).to_list()
+        return docs[0] if docs else None
+
+    async def count_documents(self, filter: Dict[str, Any]) -> int:
+        await self.database.round_trip()
+        return sum(1 for d in self.docs if matches(d, filter))
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        await self.database.round_trip()
+        return self._update(filter, update, upsert)
+
+    async def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any], sort=None,
+                                  return_document=ReturnDocument.BEFORE, upsert: bool = False):
+        await self.database.round_trip()
+        candidates = [doc for doc in self.docs if matches(doc, filter)]
+        if sort:
+            candidates.sort(key=_sort_key(_normalize_sort(sort)))
+        if not candidates:
+            return None
+        doc = candidates[0]
+        before = copy.deepcopy(doc)
+        self._apply(doc, update)
+        return copy.deepcopy(doc) if return_document == ReturnDocument.AFTER else before
+
+    @staticmethod
+    def _apply(doc: Dict[str, Any], update: Dict[str, Any]):
+        doc.update(copy.deepcopy(update.get("$set", {})))
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+
+    def _update(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool):
+        for doc in self.docs:
+            if matches(doc, filter):
+                self._apply(doc, update)
+                return _Result(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = {k: v for k, v in filter.items() if not isinstance(v, dict)}
+            doc.update(copy.deepcopy(update.get("$set", {})))
+            doc.update(copy.deepcopy(update.get("$setOnInsert", {})))
+            doc.setdefault("_id", ObjectId())
+            self.docs.append(doc)
+            return _Result(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return _Result(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        """UpdateOne requests only (what the checkpointer sends), in one round trip."""
+        await self.database.round_trip()
+        for request in requests:
+            self._update(request._filter, request._doc, bool(request._upsert))
+        return _Result(acknowledged=True)
+
+    async def delete_many(self, filter: Dict[str, Any]):
+        await self.database.round_trip()
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, filter)]
+        return _Result(deleted_count=before - len(self.docs))
+
+
+class MemoryDatabase:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.down = False
+        self.operations = itertools.count()
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    async def round_trip(self):
+        next(self.operations)
+        await asyncio.sleep(self.latency)
+        if self.down:
+            raise AutoReconnect("memory database is down")
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def dependency(self):
+        """Drop-in for ``app.core.db.get_database`` via ``app.dependency_overrides``."""
+        yield self
@@ -0,0 +1,181 @@
+"""
+Token report for the swarm's prompts: the previous inline f-string prompts
+against `app.agents.prompts`, for a sample idea and analysis.
+
+Per prompt: input tokens before and after, and of the new prompt, the static
+prefix (system message, identical on every call of that prompt) and the
+variable part. Then the input tokens of one blueprint in parallel mode
+(13 agents + blueprint) and in batched mode, and how many of them are a
+prefix a provider-side prompt cache can reuse. ``--fail-above`` fails the run
+(exit 1) when a blueprint's input tokens exceed it, so prompt growth can gate CI.
+
+Tokens are counted with tiktoken (``--encoding``, an approximation of the
+Llama tokenizers) when it is installed and the encoding is available,
+otherwise estimated at ~4 characters per token like the LLM scheduler does.
+
+    python -m benchmarks.prompt_report --encoding cl100k_base
+"""
+import argparse
+import sys
+
+# A blueprint request as the client sends it (client/src/app/architect/page.tsx)
+IDEA = ("User is ready for the blueprint. Context idea: Tiffin subscription for office workers in Pune: home cooks "
+        "prepare lunches, we handle ordering, delivery routes and payments through an app. Here is the structured data:\n"
+        "The Core Blueprint: Subscription | Details: monthly plans from INR 2,500, weekly trial packs\n"
+        "Market Domain: B2C food delivery | Details: IT parks in Hinjewadi and Kharadi first\n"
+        "Defensibility Moat: Network of home cooks | Details: exclusive contracts and hygiene certification\n"
+        "Builder Profile: Two founders | Details: one ops lead from a delivery startup, one full-stack developer\n"
+        "Traction Pulse: Pilot | Details: 120 paying subscribers after six weeks, 70% renewal")
+INSIGHT = "Demand is steady among office workers, but margins depend on route density and cook retention."
+IDEAS = ["Tiffin subscription for office workers in Pune", "Refurbished lab equipment marketplace for university labs",
+         "AI bookkeeping for freelancers", "Community solar subscriptions for apartment blocks", "Pet-sitting network for busy professionals"]
+
+
+def legacy_score(rubric: str, idea: str) -> str:
+    return f"""
+    {rubric}
+    Business Idea: {idea}
+    Output JSON: {{"score": 1-100, "insight": "short insight", "confidence": 0-1}}
+    """
+
+
+def legacy_packed(rubric: str, ideas) -> str:
+    keys = [str(i) for i in range(1, len(ideas) + 1)]
+    listed = "\n".join(f"[{key}] {idea}" for key, idea in zip(keys, ideas))
+    return f"""
+    {rubric}
+    Evaluate each business idea below on its own, strictly through this rubric.
+
+    {listed}
+
+    IDEA KEYS: {", ".join(keys)}
+    Output ONLY a JSON object with exactly these keys, each mapping to {{"score": 1-100, "insight": "short insight", "confidence": 0-1}}.
+    """
+
+
+def legacy_panel(agents, idea: str) -> str:
+    rubrics = "\n\n".join(f"[{name}]\n{agent.RUBRIC}" for name, agent in agents.items())
+    return f"""
+    You are a panel of startup analysis agents. Evaluate the business idea once per agent below, each strictly through its own rubric.
+
+    {rubrics}
+
+    Business Idea: {idea}
+
+    AGENT KEYS: {", ".join(agents)}
+    Output ONLY a JSON object with exactly these keys, each mapping to {{"score": 1-100, "insight": "short insight", "confidence": 0-1}}.
+    """
+
+
+def legacy_blueprint(idea: str, analysis: dict) -> str:
+    keys = ",\n".join(f'        "{key}": {{{{ "score": number, "insight": "string" }}}}'
+                      for key in ("marketResearch", "competitionIntel", "executionRisk", "pmfProbability",
+                                  "techFeasibility", "fundingReadiness", "legalCompliance", "gtmStrategy",
+                                  "unitEconomics", "scalabilityInfra", "impactSustainability", "supplyChainOps",
+                                  "dataAiRisk"))
+    template = f"""
+    You are the Lead Startup Architect. Using the analysis from your agents, generate a complete Business Blueprint.
+    Idea: {{idea}}
+    Scores: {{scores}}
+
+
+    OUTPUT ONLY VALID JSON matching this schema:
+    {{{{
+      "businessOverview": {{{{ "name": "string", "description": "string", "targetAudience": "string", "valueProposition": "string" }}}},
+      "agentScoring": {{{{
+{keys}
+      }}}},
+      "services": [ {{{{ "title": "string", "description": "string", "pricingModel": "string" }}}} ],
+      "revenueModel": ["string"],
+      "costStructure": {{{{ "oneTimeSetup": ["string"], "monthlyExpenses": ["string"] }}}},
+      "strategicRoadmap": ["string"],
+      "risks": ["string"],
+      "growthOpportunities": ["string"]
+    }}}}
+    """
+    return template.format(idea=idea, scores=analysis)
+
+
+def counter(encoding: str):
+    try:
+        import tiktoken
+
+        encoder = tiktoken.get_encoding(encoding)
+        return lambda text: len(encoder.encode(text)), f"tiktoken {encoding}"
+    except Exception as e:  # not installed, or the encoding cannot be downloaded
+        print(f"tiktoken unavailable ({type(e).__name__}), estimating ~4 characters per token")
+        return lambda text: max(1, len(text) // 4), "~4 chars/token"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--encoding", default="cl100k_base")
+    parser.add_argument("--fail-above", type=int, default=0, help="max input tokens per parallel-mode blueprint")
+    args = parser.parse_args()
+
+    from app.agents import prompts
+    from app.agents.predictive.registry import PREDICTIVE_AGENTS, SCORING_KEYS
+    from app.agents.relevance import relevance_text
+    from benchmarks.common import print_table
+
+    count, method = counter(args.encoding)
+    analysis = {name: {"score": 60 + i, "insight": INSIGHT, "confidence": 0.8} for i, name in enumerate(PREDICTIVE_AGENTS)}
+    agent = PREDICTIVE_AGENTS["market"]
+
+    def tokens(messages) -> tuple:
+        return count(messages[0].content), count(messages[1].content)
+
+    cases = [
+        ("agent (market)", legacy_score(agent.RUBRIC, IDEA), prompts.score_messages(agent.RUBRIC, IDEA)),
+        ("screening, 5 ideas", legacy_packed(agent.RUBRIC, IDEAS),
+         prompts.packed_score_messages(agent.RUBRIC, IDEAS, [str(i) for i in range(1, 6)])),
+        ("batched panel", legacy_panel(PREDICTIVE_AGENTS, IDEA),
+         prompts.panel_messages({name: a.RUBRIC for name, a in PREDICTIVE_AGENTS.items()}, IDEA)),
+        ("blueprint", legacy_blueprint(IDEA, analysis), prompts.blueprint_messages(IDEA, analysis, SCORING_KEYS)),
+        ("relevance (llm)", None, prompts.relevance_messages(relevance_text(IDEA))),
+    ]
+    rows = []
+    for name, legacy, messages in cases:
+        static, variable = tokens(messages)
+        before = count(legacy) if legacy is not None else None
+        rows.append({
+            "prompt": name,
+            "before": before if before is not None else "-",
+            "after": static + variable,
+            "change": f"{(static + variable) / before - 1:+.0%}" if before else "-",
+            "static prefix": static,
+            "variable": variable,
+        })
+    print(f"tokens per prompt ({method})")
+    print_table(rows)
+
+    # One blueprint: 13 agent calls + the blueprint call (parallel), or the panel + blueprint (batched)
+    legacy_agents = sum(count(legacy_score(a.RUBRIC, IDEA)) for a in PREDICTIVE_AGENTS.values())
+    new_agents = [tokens(prompts.score_messages(a.RUBRIC, IDEA)) for a in PREDICTIVE_AGENTS.values()]
+    blueprint_static, blueprint_variable = tokens(prompts.blueprint_messages(IDEA, analysis, SCORING_KEYS))
+    panel_static, panel_variable = tokens(prompts.panel_messages(
+        {name: a.RUBRIC for name, a in PREDICTIVE_AGENTS.items()}, IDEA))
+    parallel_before = legacy_agents + count(legacy_blueprint(IDEA, analysis))
+    parallel_after = sum(s + v for s, v in new_agents) + blueprint_static + blueprint_variable
+    parallel_prefix = sum(s for s, _ in new_agents) + blueprint_static
+    batched_before = count(legacy_panel(PREDICTIVE_AGENTS, IDEA)) + count(legacy_blueprint(IDEA, analysis))
+    batched_after = panel_static + panel_variable + blueprint_static + blueprint_variable
+    print()
+    print("input tokens per blueprint")
+    print_table([
+        {"mode": "parallel", "before": parallel_before, "after": parallel_after,
+         "change": f"{parallel_after / parallel_before - 1:+.0%}",
+         "cacheable prefix": f"{parallel_prefix} ({parallel_prefix / parallel_after:.0%})"},
+        {"mode": "batched", "before": batched_before, "after": batched_after,
+         "change": f"{batched_after / batched_before - 1:+.0%}",
+         "cacheable prefix": f"{panel_static + blueprint_static} ({(panel_static + blueprint_static) / batched_after:.0%})"},
+    ])
+    print(f"shared by all 13 agent prompts: {count(prompts.PREDICTIVE_PREAMBLE)} tokens of preamble")
+
+    if args.fail_above and parallel_after > args.fail_above:
+        print(f"FAIL: {parallel_after} input tokens per blueprint, above {args.fail_above}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Local OpenAI/Groq-compatible stub LLM server for benchmarks.
+
+Serves ``POST /openai/v1/chat/completions`` (the path the Groq SDK calls) with
+deterministic JSON answers shaped like the swarm expects. Latency is
+``latency`` +/- ``jitter`` plus the completion length at ``token-rate``
+tokens/sec (streamed responses are paced chunk by chunk), and ``error-rate``
+of the requests fail with a 429 or 500 so retry paths get exercised;
+``tail-rate`` of them are stragglers taking ``tail-latency`` seconds.
+Requests for ``small-model`` are ``small-speedup`` times faster; of their
+agent scores, ``bad-rate`` come back malformed or out of range and
+``unsure-rate`` report a low confidence, so routing escalations get
+exercised. A blueprint leaves out agents reported missing (``missing-scores``:
+omit, null or a placeholder). ``GET /stats`` reports how many completions were requested. Point
+the backend at it with ``GROQ_BASE_URL``.
+
+    python -m benchmarks.stub_llm --port 8765 --latency 0.3 --jitter 0.1 --token-rate 400 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+AGENT_SCORING_KEYS = [
+    "marketResearch", "competitionIntel", "executionRisk", "pmfProbability",
+    "techFeasibility", "fundingReadiness", "legalCompliance", "gtmStrategy",
+    "unitEconomics", "scalabilityInfra", "impactSustainability",
+    "supplyChainOps", "dataAiRisk",
+]
+
+
+class StubConfig:
+    latency: float = 0.3
+    jitter: float = 0.0
+    token_rate: float = 0.0  # completion tokens per second; 0 = instant
+    error_rate: float = 0.0
+    tail_rate: float = 0.0  # fraction of requests that take tail_latency instead
+    tail_latency: float = 5.0
+    small_model: str = "llama-3.1-8b-instant"
+    small_speedup: float = 3.0
+    bad_rate: float = 0.0  # small-model scores that are malformed or out of range
+    unsure_rate: float = 0.0  # small-model scores with a low confidence
+    missing_scores: str = "omit"  # blueprint entry for an agent reported missing: omit | null | placeholder
+    rng: random.Random = random.Random(0)
+    requests: int = 0  # completions served, for GET /stats
+
+
+config = StubConfig()
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)
+
+
+def _score(text: str, small: bool = False) -> dict:
+    seed = _seed(text)
+    score = {"score": 40 + seed % 55, "insight": f"Stub insight #{seed % 997}.", "confidence": 0.7 + seed % 30 / 100}
+    if small and config.rng.random() < config.bad_rate:
+        score["score"] = 150
+    elif small and config.rng.random() < config.unsure_rate:
+        score["confidence"] = 0.3
+    return score
+
+
+def _blueprint_scores(prompt: str) -> dict:
+    """agentScoring for a blueprint; agents the prompt reports missing are treated per ``missing-scores``."""
+    missing = set(re.findall(r'"(\w+)":\{"status":"missing"\}', prompt))
+    scores = {}
+    for key in AGENT_SCORING_KEYS:
+        if key not in missing:
+            scores[key] = _score(prompt + key)
+        elif config.missing_scores == "null":
+            scores[key] = {"score": None, "insight": "Not available"}
+        elif config.missing_scores == "placeholder":
+            scores[key] = {"score": 1, "insight": "Not available"}
+    return scores
+
+
+def build_content(prompt: str, small: bool = False) -> str:
+    """Deterministic answer for a prompt, shaped after what the caller asks for."""
+    if "Business Blueprint" in prompt:
+        return json.dumps({
+            "businessOverview": {
+                "name": "Stub Venture",
+                "description": "Deterministic stub blueprint.",
+                "targetAudience": "Benchmarks",
+                "valueProposition": "Repeatable numbers",
+            },
+            "agentScoring": _blueprint_scores(prompt),
+            "services": [{"title": "Core", "description": "Stub service", "pricingModel": "Subscription"}],
+            "revenueModel": ["Subscriptions"],
+            "costStructure": {"oneTimeSetup": ["MVP build"], "monthlyExpenses": ["Hosting"]},
+            "strategicRoadmap": ["Validate", "Launch", "Scale"],
+            "risks": ["Stub risk"],
+            "growthOpportunities": ["Stub opportunity"],
+        })
+    if '{"agents":' in prompt:
+        optional = ["tech", "legal", "scalability", "impact", "supply_chain", "data_ai"]
+        return json.dumps({"agents": [name for i, name in enumerate(optional) if _seed(prompt) >> i & 1]})
+    if small and '"score"' in prompt and config.rng.random() < config.bad_rate / 2:
+        return 'Sure! Here is the evaluation: {"score": 71, "insight": "Solid niche'  # truncated, no JSON
+    keys = re.search(r"(?:AGENT|IDEA) KEYS: ([\w, ]+)", prompt)
+    if keys:
+        return json.dumps({key: _score(prompt + key, small) for key in keys.group(1).replace(" ", "").split(",")})
+    if '"score"' in prompt:
+        return json.dumps(_score(prompt, small))
+    return "Stub first impression. Architect tip: keep it simple."
+
+
+def _delay(speedup: float = 1.0) -> float:
+    if config.tail_rate and config.rng.random() < config.tail_rate:
+        return config.tail_latency
+    return max(0.0, config.latency + config.rng.uniform(-config.jitter, config.jitter)) / speedup
+
+
+def _generation_time(content: str, speedup: float = 1.0) -> float:
+    return (max(1, len(content) // 4) / (config.token_rate * speedup)) if config.token_rate > 0 else 0.0
+
+
+def _error_response():
+    if config.rng.random() < 0.5:
+        return JSONResponse({"error": {"message": "Rate limit reached (stub)", "type": "tokens"}},
+                            status_code=429, headers={"retry-after": "1"})
+    return JSONResponse({"error": {"message": "Internal error (stub)", "type": "server_error"}}, status_code=500)
+
+
+def _usage(prompt: str, content: str) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+async def chat_completions(request: Request):
+    try:
+        body = await request.json()
+    except ClientDisconnect:  # caller gave up (hedge lost or deadline hit) before sending the body
+        return Response(status_code=499)
+    config.requests += 1
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    model = body.get("model", "stub")
+    small = model == config.small_model
+    speedup = config.small_speedup if small else 1.0
+    content = build_content(prompt, small)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    await asyncio.sleep(_delay(speedup))
+    if config.error_rate and config.rng.random() < config.error_rate:
+        return _error_response()
+
+    if body.get("stream"):
+        async def events():
+            step = 16
+            pause = _generation_time(content[:step], speedup)
+            for i in range(0, len(content), step):
+                if pause:
+                    await asyncio.sleep(pause)
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"id": completion_id, "usage": _usage(prompt, content)},
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(_generation_time(content, speedup))
+    return JSONResponse({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(prompt, content),
+    })
+
+
+async def stats(request: Request):
+    return JSONResponse({"requests": config.requests})
+
+
+app = Starlette(routes=[Route("/openai/v1/chat/completions", chat_completions, methods=["POST"]),
+                        Route("/stats", stats)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds added to every completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency varies uniformly by +/- this many seconds")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="completion tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/500")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of requests that are stragglers")
+    parser.add_argument("--tail-latency", type=float, default=5.0, help="seconds a straggler takes")
+    parser.add_argument("--small-model", default=StubConfig.small_model, help="model name treated as the small tier")
+    parser.add_argument("--small-speedup", type=float, default=3.0, help="how much faster the small model answers")
+    parser.add_argument("--bad-rate", type=float, default=0.0, help="fraction of small-model scores that are unusable")
+    parser.add_argument("--unsure-rate", type=float, default=0.0, help="fraction of small-model scores with low confidence")
+    parser.add_argument("--missing-scores", choices=["omit", "null", "placeholder"], default="omit",
+                        help="blueprint agentScoring for agents reported missing")
+    parser.add_argument("--seed", type=int, default=0, help="seed for jitter and injected errors")
+    args = parser.parse_args()
+    config.latency = args.latency
+    config.jitter = args.jitter
+    config.token_rate = args.token_rate
+    config.error_rate = args.error_rate
+    config.tail_rate = args.tail_rate
+    config.tail_latency = args.tail_latency
+    config.small_model = args.small_model
+    config.small_speedup = args.small_speedup
+    config.bad_rate = args.bad_rate
+    config.unsure_rate = args.unsure_rate
+    config.missing_scores = args.missing_scores
+    config.rng = random.Random(args.seed)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Write-behind persistence: response latency, and what survives outages and crashes.
+
+  latency      ``--requests`` discovery chats against the stub LLM and an
+               in-memory Mongo with ``--db-latency`` per round trip, with
+               WRITE_BEHIND_ENABLED off and on: response p50/p95, DB round
+               trips, and records saved once the buffer is flushed
+  outage       Mongo goes down: requests still succeed, their documents go to
+               the spill file and are replayed once Mongo is back; with the
+               spill file full too, requests wait and then fail (backpressure)
+  shutdown     a graceful shutdown writes everything queued, to Mongo or, if
+               Mongo is down, to the spill file
+  crash        a worker is SIGKILLed with documents spilled and documents still
+               in memory; the next worker replays the spilled ones, the
+               in-memory ones are the lost-write window
+
+    python -m benchmarks.verify_write_behind --requests 96 --db-latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import BACKEND_DIR, percentile, print_table, run_load, stub_server, use_stub
+
+CRASH_WORKER = """
+import asyncio, sys
+from benchmarks.memory_db import MemoryDatabase
+from app.core.write_behind import WriteBehind
+
+async def main(path, spilled, unflushed):
+    database = MemoryDatabase()
+    database.down = True
+    buffer = WriteBehind(batch_size=10, flush_interval=0.05, max_pending=1000, put_timeout=1.0, retries=0,
+                         spill_path=path, spill_max_bytes=10 ** 7)
+    await buffer.start(database)
+    for i in range(spilled):
+        await buffer.insert(database.analyses, {"n": i})
+    while buffer.pending:
+        await asyncio.sleep(0.05)
+    buffer.flush_interval = 3600  # what is inserted from here on stays in memory
+    await asyncio.sleep(0.2)
+    for i in range(unflushed):
+        await buffer.insert(database.analyses, {"n": spilled + i})
+    print("ready", flush=True)
+    await asyncio.sleep(3600)
+
+asyncio.run(main(sys.argv[1], int(sys.argv[2]), int(sys.argv[3])))
+"""
+
+
+def make_buffer(path: str, **overrides):
+    from app.core.write_behind import WriteBehind
+
+    options = dict(batch_size=20, flush_interval=0.05, max_pending=1000, put_timeout=0.3, retries=1,
+                   spill_path=path, spill_max_bytes=10 ** 7)
+    options.update(overrides)
+    return WriteBehind(**options)
+
+
+async def wait_until(condition, timeout: float = 10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.02)
+
+
+def spill_lines(buffer) -> int:
+    if not os.path.exists(buffer.own_spill):
+        return 0
+    with open(buffer.own_spill) as f:
+        return sum(1 for _ in f)
+
+
+async def bench_latency(client, database, enabled: bool, total: int, concurrency: int) -> dict:
+    from app.core.config import settings
+    from app.core.write_behind import write_behind
+
+    settings.WRITE_BEHIND_ENABLED = enabled
+    await write_behind.start(database)
+    before_ops, before_docs = next(database.operations), len(database.chats.docs)
+
+    async def call(i: int):
+        response = await client.post("/api/v1/ai/chat", json={"message": f"idea #{i} ({enabled}): tutoring for adults",
+                                                               "threadId": f"wb-{enabled}-{i}"})
+        response.raise_for_status()
+
+    latencies, _ = await run_load(call, total, concurrency)
+    await write_behind.shutdown(timeout=10)
+    round_trips = next(database.operations) - before_ops - 1
+    return {
+        "write-behind": "on" if enabled else "off",
+        "requests": total,
+        "p50 ms": f"{percentile(latencies, 50) * 1000:.0f}",
+        "p95 ms": f"{percentile(latencies, 95) * 1000:.0f}",
+        "DB round trips": round_trips,
+        "records saved": len(database.chats.docs) - before_docs,
+    }
+
+
+async def check_outage(directory: str):
+    from app.core.write_behind import WriteBehindFull
+    from benchmarks.memory_db import MemoryDatabase
+
+    database = MemoryDatabase()
+    buffer = make_buffer(os.path.join(directory, "outage.jsonl"))
+    await buffer.start(database)
+    database.down = True
+    started = time.perf_counter()
+    for i in range(100):
+        await buffer.insert(database.analyses, {"n": i})
+    queued = time.perf_counter() - started
+    await wait_until(lambda: buffer.pending == 0)
+    spilled = spill_lines(buffer)
+    database.down = False
+    await wait_until(lambda: buffer.spill_bytes() == 0)
+    unique = len({doc["_id"] for doc in database.analyses.docs})
+    print(f"outage: 100 inserts queued in {queued * 1000:.1f} ms while down, spilled={spilled}, "
+          f"after recovery in Mongo={unique} (docs={len(database.analyses.docs)}), spill file empty={buffer.spill_bytes() == 0}")
+    await buffer.shutdown(timeout=5)
+
+    database = MemoryDatabase()
+    buffer = make_buffer(os.path.join(directory, "full.jsonl"), max_pending=20, spill_max_bytes=2000)
+    await buffer.start(database)
+    database.down = True
+    accepted, rejected_after = 0, None
+    for i in range(200):
+        started = time.perf_counter()
+        try:
+            await buffer.insert(database.analyses, {"n": i, "pad": "x" * 40})
+            accepted += 1
+        except WriteBehindFull:
+            rejected_after = time.perf_counter() - started
+            break
+    database.down = False
+    await wait_until(lambda: buffer.pending == 0 and buffer.spill_bytes() == 0)
+    print(f"backpressure: spill capped at 2000 bytes, max pending 20: accepted={accepted}, then an insert "
+          f"waited {rejected_after or 0:.2f}s and failed; after recovery in Mongo={len(database.analyses.docs)}/{accepted}")
+    await buffer.shutdown(timeout=5)
+
+
+async def check_shutdown(directory: str):
+    from benchmarks.memory_db import MemoryDatabase
+
+    for down in (False, True):
+        database = MemoryDatabase()
+        buffer = make_buffer(os.path.join(directory, f"shutdown-{down}.jsonl"), batch_size=100, flush_interval=3600)
+        await buffer.start(database)
+        for i in range(30):
+            await buffer.insert(database.analyses, {"n": i})
+        database.down = down
+        await buffer.shutdown(timeout=2)
+        print(f"shutdown with Mongo {'down' if down else 'up'}: queued=30, in Mongo={len(database.analyses.docs)}, "
+              f"in spill file={spill_lines(buffer)}, lost={30 - len(database.analyses.docs) - spill_lines(buffer)}")
+        if os.path.exists(buffer.own_spill):
+            os.remove(buffer.own_spill)
+
+
+async def check_crash(directory: str, spilled: int, unflushed: int):
+    from benchmarks.memory_db import MemoryDatabase
+
+    path = os.path.join(directory, "crash.jsonl")
+    worker = subprocess.Popen([sys.executable, "-c", CRASH_WORKER, path, str(spilled), str(unflushed)],
+                              cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True,
+                              env={**os.environ, "PYTHONPATH": BACKEND_DIR})
+    for line in worker.stdout:
+        if line.strip() == "ready":
+            break
+    worker.send_signal(signal.SIGKILL)
+    worker.wait()
+
+    database = MemoryDatabase()
+    buffer = make_buffer(path)
+    await buffer.start(database)
+    await wait_until(lambda: len(database.analyses.docs) >= spilled, timeout=5)
+    recovered = len(database.analyses.docs)
+    print(f"crash: worker acknowledged {spilled + unflushed} writes and was SIGKILLed with {spilled} spilled and "
+          f"{unflushed} in memory; replayed by the next worker={recovered}, lost={spilled + unflushed - recovered}")
+    await buffer.shutdown(timeout=5)
+
+
+async def main_async(args):
+    import httpx
+    from app.agents.llm import close_llm_clients
+    from app.core import db as db_module
+    from app.core.config import settings
+    from app.core.db import get_database
+    from app.main import app
+    from benchmarks.memory_db import MemoryDatabase
+
+    settings.SINGLEFLIGHT_ENABLED = False
+    settings.CACHE_ENABLED = False
+    database = MemoryDatabase(latency=args.db_latency)
+    db_module.db = database
+    app.dependency_overrides[get_database] = database.dependency
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        rows = [await bench_latency(client, database, enabled, args.requests, args.concurrency) for enabled in (False, True)]
+    await close_llm_clients()
+    print_table(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        await check_outage(directory)
+        await check_shutdown(directory)
+        await check_crash(directory, args.spilled, args.unflushed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=96)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--db-latency", type=float, default=0.05, help="seconds per Mongo round trip")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub LLM latency")
+    parser.add_argument("--spilled", type=int, default=50, help="crash check: documents on disk at the kill")
+    parser.add_argument("--unflushed", type=int, default=7, help="crash check: documents in memory at the kill")
+    args = parser.parse_args()
+
+    with stub_server("--latency", str(args.latency)) as base_url:
+        use_stub(base_url)
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
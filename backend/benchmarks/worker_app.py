@@ -0,0 +1,22 @@
+"""
+The API with an in-memory database in each worker, for multi-worker runs
+without MongoDB (benchmarks/bench_workers.py):
+
+    gunicorn -c gunicorn.conf.py benchmarks.worker_app:app
+    python -m uvicorn benchmarks.worker_app:app --workers 4
+"""
+from app import main
+from app.core import db as db_module
+from benchmarks.memory_db import MemoryDatabase
+
+
+async def connect_to_db():
+    db_module.db = MemoryDatabase()
+
+
+async def close_db_connection():
+    pass
+
+
+main.connect_to_db, main.close_db_connection = connect_to_db, close_db_connection
+app = main.app
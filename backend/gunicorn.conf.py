@@ -0,0 +1,28 @@
+"""
+Production multi-worker server:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the app and the swarm layer once, then forks the workers
+(preload_app). Workers start with those modules loaded and share their
+memory copy-on-write. Point SHARED_STATE_URL at SQLite (one host) or Redis so
+that the workers share the response cache, the LLM rate limits and job
+status; see app/core/shared.py.
+"""
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Each worker listens on its own SO_REUSEPORT socket and the kernel spreads connections over them.
+# On one shared socket, the worker that wakes first accepts every pending connection.
+reuse_port = True
+# Shutdown waits for JOB_SHUTDOWN_TIMEOUT, then WRITE_BEHIND_SHUTDOWN_TIMEOUT
+graceful_timeout = 40
+
+
+def on_starting(server):
+    from app.agents.warmup import preload
+
+    preload()
@@ -161,7 +161,7 @@ export default function ArchitectPage() {
                 </div>
                 <div className="text-right">
                     <span className="block text-xs font-bold text-gray-400 uppercase tracking-widest">Score</span>
-                    <span className="text-2xl font-black text-gray-900">{score}%</span>
+                    <span className="text-2xl font-black text-gray-900">{score == null ? "—" : `${score}%`}</span>
                 </div>
             </div>
             <div>
@@ -169,7 +169,7 @@ export default function ArchitectPage() {
                 <p className="text-xs text-gray-500 font-medium leading-relaxed line-clamp-2">{insight}</p>
             </div>
             <div className="w-full bg-gray-100 h-1.5 rounded-full overflow-hidden">
-                <div className={`h-full ${color} transition-all duration-1000`} style={{ width: `${score}%` }} />
+                <div className={`h-full ${color} transition-all duration-1000`} style={{ width: `${score ?? 0}%` }} />
             </div>
         </div>
     );